@@ -0,0 +1,78 @@
+"""
+Configuração das conexões SQLite usada em settings.DATABASES.
+
+Cada conexão nova executa os PRAGMAs de SQLITE (WAL, busy_timeout,
+synchronous, mmap e cache) e as transações começam com BEGIN IMMEDIATE: o
+escritor pega o lock de escrita no início e espera o busy_timeout, em vez de
+falhar com "database is locked" ao tentar promover uma leitura para escrita
+no meio da transação. As conexões são reaproveitadas entre requests
+(CONN_MAX_AGE) e verificadas antes do reuso (CONN_HEALTH_CHECKS).
+
+Os valores podem ser sobrescritos por variáveis de ambiente SQLITE_<CHAVE>
+(ex.: SQLITE_BUSY_TIMEOUT=10000). SQLITE_REPLICA_NAME aponta a réplica de
+leitura para outro arquivo.
+"""
+import os
+
+DEFAULTS = {
+    'JOURNAL_MODE': 'WAL',            # leitores não bloqueiam o escritor (e vice-versa)
+    'SYNCHRONOUS': 'NORMAL',          # seguro com WAL; só o último commit pode se perder numa queda de energia
+    'BUSY_TIMEOUT': 5000,             # ms esperando o lock antes de "database is locked"
+    'MMAP_SIZE': 256 * 1024 * 1024,   # bytes do arquivo lidos via mmap
+    'CACHE_SIZE': -32000,             # negativo = KiB (~32 MB) de cache de páginas por conexão
+    'TEMP_STORE': 'MEMORY',
+    'TRANSACTION_MODE': 'IMMEDIATE',
+    'CONN_MAX_AGE': 600,              # segundos; None = conexão permanente, 0 = uma por request
+    'CONN_HEALTH_CHECKS': True,
+}
+
+PRAGMAS = ('JOURNAL_MODE', 'SYNCHRONOUS', 'BUSY_TIMEOUT', 'MMAP_SIZE', 'CACHE_SIZE', 'TEMP_STORE')
+
+
+def sqlite_options(overrides=None):
+    options = {**DEFAULTS, **(overrides or {})}
+    for key, default in DEFAULTS.items():
+        value = os.environ.get(f'SQLITE_{key}')
+        if value is None:
+            continue
+        if isinstance(default, bool):
+            options[key] = value.lower() in ('1', 'true', 'yes')
+        elif isinstance(default, int):
+            options[key] = int(value)
+        else:
+            options[key] = value
+    return options
+
+
+def sqlite_pragmas(options):
+    """
+    Comandos executados em cada conexão nova, na ordem (journal_mode primeiro).
+    """
+    return [f'PRAGMA {key.lower()}={options[key]}' for key in PRAGMAS if options.get(key) is not None]
+
+
+def sqlite_database(name, overrides=None):
+    """
+    Entrada de settings.DATABASES para o arquivo `name`.
+    """
+    options = sqlite_options(overrides)
+    return {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': name,
+        'CONN_MAX_AGE': options['CONN_MAX_AGE'],
+        'CONN_HEALTH_CHECKS': options['CONN_HEALTH_CHECKS'],
+        'OPTIONS': {
+            'init_command': ';'.join(sqlite_pragmas(options)),
+            'transaction_mode': options['TRANSACTION_MODE'],
+        },
+    }
+
+
+def replica_database(primary_name, overrides=None):
+    """
+    Entrada da réplica de leitura (ver core/db_router.py): o arquivo de
+    SQLITE_REPLICA_NAME ou, sem ela, o próprio arquivo do default (o roteador
+    então não separa as leituras). Nos testes é um espelho do default.
+    """
+    name = os.environ.get('SQLITE_REPLICA_NAME') or primary_name
+    return {**sqlite_database(name, overrides), 'TEST': {'MIRROR': 'default'}}
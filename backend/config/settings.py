@@ -10,11 +10,18 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+import tempfile
 from pathlib import Path
 
+from .database import replica_database, sqlite_database
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Caches em disco compartilhados entre os processos: fora da árvore do código
+CACHE_DIR = Path(os.environ.get('DJANGO_CACHE_DIR') or Path(tempfile.gettempdir()) / 'cbm-cache')
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
@@ -49,11 +56,14 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Antes dos demais: comprime o corpo já final (ver core/compression.py)
+    'core.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.db_router.ReadYourWritesMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -81,11 +91,33 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Conexões SQLite com WAL, busy_timeout e BEGIN IMMEDIATE. Os valores padrão
+# ficam em config/database.py (DEFAULTS); aqui só o que este deploy muda, ex.:
+# {'BUSY_TIMEOUT': 10000}. Cada chave também pode vir da variável SQLITE_<CHAVE>.
+SQLITE = {}
+
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': sqlite_database(BASE_DIR / 'db.sqlite3', SQLITE),
+    # Réplica de leitura: SQLITE_REPLICA_NAME=db_replica.sqlite3 para testar localmente com
+    # um segundo arquivo (atualizado por `manage.py sync_replica`); também pode ser um Postgres
+    'replica': replica_database(BASE_DIR / 'db.sqlite3', SQLITE),
+}
+
+# Listagens, relatórios e exportações leem da réplica; escritas e quem acabou
+# de escrever ficam no default (ver core/db_router.py)
+DATABASE_ROUTERS = ['core.db_router.ReadReplicaRouter']
+DATABASE_ROUTING = {
+    'ENABLED': True,
+    'REPLICA_ALIAS': 'replica',
+    'PIN_SECONDS': 5,             # leituras no default depois de uma escrita do mesmo usuário
+    'CACHE_ALIAS': 'routing',     # o pin precisa valer em todos os processos (não o LocMemCache)
+}
+
+# Novas tentativas de escritas que falham com "database is locked" (ver core/retry.py)
+DATABASE_RETRY = {
+    'ATTEMPTS': 5,
+    'BASE_DELAY': 0.05,               # segundos; dobra a cada tentativa, com jitter
+    'MAX_DELAY': 1.0,
 }
 
 
@@ -138,7 +170,7 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'core.authentication.CachedTokenAuthentication',
     ],   
 }
 
@@ -151,5 +183,101 @@ DJOSER = {
     },
 }
 
+# Fila local de jobs em background (core/jobs.py), consumida por `manage.py run_jobs`.
+# Com BACKGROUND_JOBS_EAGER = True os jobs rodam no próprio processo após o commit
+# (útil em desenvolvimento, sem worker rodando).
+BACKGROUND_JOBS_EAGER = False
+# Processos usados para renderizar QR codes em lote (None = nº de CPUs)
+QR_RENDER_WORKERS = None
+
+# QR codes servidos sob demanda em /api/equipment/<pk>/qr/ (ver core/qr.py)
+QR_CODE = {
+    'BOX_SIZE': 10,
+    'BORDER': 4,
+    'ERROR_CORRECTION': 'M',      # L, M, Q ou H
+    'MEMORY_CACHE_SIZE': 256,     # PNGs mantidos em memória por processo
+    'CACHE_DIR': 'qr_cache',      # relativo ao MEDIA_ROOT
+    'MAX_AGE': 60 * 60 * 24,      # Cache-Control em segundos
+}
+
+# Uploads vão direto para um arquivo temporário em disco, em blocos,
+# em vez de ficarem na memória do processo.
+FILE_UPLOAD_HANDLERS = ['django.core.files.uploadhandler.TemporaryFileUploadHandler']
+
+# Anexos dos status (ver core/images.py)
+TASK_IMAGE = {
+    'MAX_UPLOAD_SIZE': 15 * 1024 * 1024,
+    'ORIGINAL_MAX_SIDE': 2048,
+    'MEDIUM_MAX_SIDE': 1024,
+    'THUMBNAIL_MAX_SIDE': 256,
+    'JPEG_QUALITY': 85,
+}
+
+# Cache de respostas dos dados de referência (ver core/response_cache.py).
+# Em arquivo para ser compartilhado entre os processos do servidor; com um
+# processo só, 'django.core.cache.backends.locmem.LocMemCache' também serve.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR / 'responses',
+        'TIMEOUT': 60 * 60 * 24,
+    },
+    # Token -> id do usuário, e grupos/permissões dele (ver core/auth_cache.py).
+    # Precisa ser compartilhado entre processos para que logout/invalidações valham em todos.
+    'auth': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR / 'auth',
+    },
+    # Usuários presos ao banco principal depois de uma escrita (ver core/db_router.py)
+    'routing': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR / 'routing',
+    },
+}
+RESPONSE_CACHE = {
+    'ENABLED': True,
+    'ALIAS': 'responses',
+}
+AUTH_CACHE = {
+    'ENABLED': True,
+    'ALIAS': 'auth',
+    'TIMEOUT': 60,                # segundos; as invalidações por sinal valem antes disso
+}
+
+# Eventos em tempo real em /api/events/ (ver core/events.py). Precisa do
+# servidor ASGI (config/asgi.py) iniciado por startup.sh; sob WSGI a view responde 503
+EVENTS = {
+    'POLL_INTERVAL': 2,           # segundos entre leituras de eventos de outros processos
+    'HEARTBEAT_INTERVAL': 15,     # comentário "ping" para manter a conexão aberta
+    'QUEUE_SIZE': 100,            # eventos pendentes por conexão antes de pedir resync
+    'TICKET_SECONDS': 30,         # validade do ticket de uso único que abre o stream
+    'TICKET_CACHE_ALIAS': 'auth',
+}
+
+# Notificações geradas pelos eventos de chamados (ver core/notifications.py)
+NOTIFICATIONS = {
+    'COALESCE_SECONDS': 60,       # não lidas do mesmo chamado mais novas que isso são atualizadas
+}
+
+# Sincronização incremental em /api/sync/ (ver core/views/sync.py)
+SYNC = {
+    'CURSOR_LAG_SECONDS': 2,      # margem para transações que ainda não commitaram
+    'TOMBSTONE_DAYS': 30,         # cursores mais antigos recebem snapshot completo
+}
+
+# Compressão das respostas da API (gzip; br e zstd se brotli/zstandard estiverem instalados)
+COMPRESSION = {
+    'ENABLED': True,
+    'MIN_SIZE': 1024,             # bytes; respostas menores saem sem compressão
+}
+
+# Listagens de tarefas, equipamentos e notificações via values() + orjson (ver core/fast_read.py)
+FAST_READ = {
+    'ENABLED': True,
+}
+
 # Adiciona o protocolo HTTPS ao domínio do Azure
 CSRF_TRUSTED_ORIGINS = ['https://cbm-back-f3erdef8czfvhzgu.centralus-01.azurewebsites.net']
\ No newline at end of file
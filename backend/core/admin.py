@@ -32,4 +32,6 @@ admin.site.register(Equipment)
 admin.site.register(Task)
 admin.site.register(TaskStatus)
 admin.site.register(TaskStatusImage)
-admin.site.register(Notification)
\ No newline at end of file
+admin.site.register(Notification)
+admin.site.register(TaskDailyMetric)
+admin.site.register(BackgroundJob)
\ No newline at end of file
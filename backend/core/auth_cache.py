@@ -0,0 +1,135 @@
+"""
+Cache curto (entre requests) da autenticação: token -> id do usuário, e
+usuário -> grupos e permissões já calculados.
+
+Nada sensível vai para o cache: nem a chave do token (a chave da entrada é
+o hash dela) nem a senha (o campo fica diferido no usuário remontado). Num
+acerto o usuário é montado a partir dos campos guardados, sem query, e
+recebe os caches internos do ModelBackend (_perm_cache, ...) e
+is_technician, então a autenticação e as checagens de permissão e de papel
+do request não vão ao banco. Dentro de um request, o próprio objeto
+request.user é o cache.
+
+Invalidação (ver signals.py): excluir um token apaga a entrada dele; salvar
+ou excluir um usuário, ou mudar os grupos/permissões dele, apaga a entrada do
+usuário. Mudanças em grupos ou nas permissões de um grupo afetam vários
+usuários e trocam a "geração" usada nas chaves, descartando todas de uma vez.
+Cada invalidação é repetida no commit: um request concorrente pode ter
+guardado, antes dele, os dados ainda não alterados.
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, transaction
+from rest_framework.authtoken.models import Token
+
+DEFAULT_SETTINGS = {
+    'ENABLED': True,
+    'ALIAS': 'auth',
+    'TIMEOUT': 60,
+}
+
+
+def auth_cache_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'AUTH_CACHE', {})}
+
+
+def get_cache():
+    return caches[auth_cache_settings()['ALIAS']]
+
+
+def generation():
+    cache = get_cache()
+    value = cache.get('auth:generation')
+    if value is None:
+        cache.add('auth:generation', 1, timeout=None)
+        value = cache.get('auth:generation', 1)
+    return value
+
+
+def token_key(key):
+    # O token em si não vira nome de chave/arquivo
+    return f'auth:token:{hashlib.sha256(key.encode()).hexdigest()}'
+
+
+def user_key(user_id):
+    return f'auth:user:{generation()}:{user_id}'
+
+
+def get_token(key):
+    """
+    (usuário, token) a partir do cache, ou None se algo não estiver lá (ou o
+    usuário não puder mais entrar): aí a autenticação vai ao banco.
+    """
+    cache = get_cache()
+    entry = cache.get(token_key(key))
+    if entry is None:
+        return None
+    authorization = cache.get(user_key(entry['user_id']))
+    if authorization is None:
+        return None
+    fields = authorization.pop('fields')
+    if not fields['is_active']:
+        return None
+    user = get_user_model().from_db(DEFAULT_DB_ALIAS, list(fields), list(fields.values()))
+    # Mesmos atributos que o ModelBackend e a cached_property preenchem
+    user.__dict__.update(authorization)
+    return user, Token(key=key, user=user, created=entry['created'])
+
+
+def user_fields(user):
+    """
+    Campos do usuário, menos a senha, para remontá-lo com Model.from_db.
+    """
+    return {field.attname: getattr(user, field.attname)
+            for field in user._meta.concrete_fields if field.attname != 'password'}
+
+
+def authorization_data(user):
+    """
+    Campos, grupos e permissões do usuário, como o ModelBackend os guarda no objeto.
+    """
+    user.get_all_permissions()
+    return {
+        'fields': user_fields(user),
+        '_user_perm_cache': user._user_perm_cache,
+        '_group_perm_cache': user._group_perm_cache,
+        '_perm_cache': user._perm_cache,
+        'is_technician': user.is_technician,
+    }
+
+
+def store_token(token):
+    timeout = auth_cache_settings()['TIMEOUT']
+    cache = get_cache()
+    cache.set(user_key(token.user_id), authorization_data(token.user), timeout)
+    cache.set(token_key(token.key), {'user_id': token.user_id, 'created': token.created}, timeout)
+
+
+def now_and_on_commit(func, *args):
+    func(*args)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: func(*args))
+
+
+def forget_token(key):
+    now_and_on_commit(get_cache().delete, token_key(key))
+
+
+def forget_users(user_ids):
+    now_and_on_commit(lambda: get_cache().delete_many([user_key(user_id) for user_id in user_ids]))
+
+
+def bump_generation():
+    now_and_on_commit(increment_generation)
+
+
+def increment_generation():
+    cache = get_cache()
+    cache.add('auth:generation', 1, timeout=None)
+    try:
+        cache.incr('auth:generation')
+    except ValueError:
+        cache.set('auth:generation', 2, timeout=None)
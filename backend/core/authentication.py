@@ -0,0 +1,22 @@
+from rest_framework.authentication import TokenAuthentication
+
+from . import auth_cache
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication que resolve token -> usuário pelo cache de core/auth_cache.py,
+    indo ao banco só na primeira vez (ou depois de uma invalidação).
+    """
+
+    def authenticate_credentials(self, key):
+        if not auth_cache.auth_cache_settings()['ENABLED']:
+            return super().authenticate_credentials(key)
+
+        cached = auth_cache.get_token(key)
+        if cached is not None:
+            return cached
+
+        user, token = super().authenticate_credentials(key)
+        auth_cache.store_token(token)
+        return user, token
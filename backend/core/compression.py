@@ -0,0 +1,225 @@
+"""
+Compressão das respostas da API (JSON, CSV e NDJSON) por negociação do
+Accept-Encoding: zstd, br ou gzip, na ordem de preferência do servidor
+entre os aceitos pelo cliente.
+
+- Respostas normais só são comprimidas acima de COMPRESSION['MIN_SIZE'].
+- Respostas em streaming (exportações) são comprimidas pedaço a pedaço,
+  sem juntar o corpo em memória.
+- Respostas que já trazem as versões comprimidas (cache de respostas, ver
+  ResponseCacheMixin) não passam pelo compressor: o corpo vem pronto.
+
+O gzip usa o zlib da biblioteca padrão; br e zstd dependem dos pacotes
+brotli e zstandard e só são oferecidos quando estão instalados. Eventos em
+tempo real (text/event-stream) e arquivos binários (PNG, PDF) não são
+comprimidos.
+"""
+import re
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependência opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dependência opcional
+    zstandard = None
+
+DEFAULT_SETTINGS = {
+    'ENABLED': True,
+    'MIN_SIZE': 1024,             # bytes; abaixo disso o cabeçalho gzip não compensa
+    'CONTENT_TYPES': ('application/json', 'text/csv', 'application/x-ndjson'),
+    'LEVELS': {'zstd': 3, 'br': 5, 'gzip': 6},
+}
+
+ACCEPT_ENCODING = re.compile(r'\s*([^\s;,]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?')
+
+
+def compression_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'COMPRESSION', {})}
+
+
+class GzipCodec:
+    name = 'gzip'
+
+    def __init__(self, level):
+        self.level = level
+
+    def compressobj(self):
+        # wbits=31: cabeçalho e rodapé gzip (mtime zerado, saída determinística)
+        return zlib.compressobj(self.level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        compressor = self.compressobj()
+        return compressor.compress(data) + compressor.flush()
+
+
+class BrotliCodec(GzipCodec):
+    name = 'br'
+
+    def compressobj(self):
+        return BrotliStream(brotli.Compressor(quality=self.level))
+
+    def compress(self, data):
+        return brotli.compress(data, quality=self.level)
+
+
+class BrotliStream:
+    """
+    Compressor do brotli com a interface compress()/flush() do zlib.
+    """
+
+    def __init__(self, compressor):
+        self.compressor = compressor
+
+    def compress(self, data):
+        return self.compressor.process(data)
+
+    def flush(self):
+        return self.compressor.finish()
+
+
+class ZstdCodec(GzipCodec):
+    name = 'zstd'
+
+    def compressobj(self):
+        return zstandard.ZstdCompressor(level=self.level).compressobj()
+
+    def compress(self, data):
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+
+def available_codecs():
+    """
+    Codecs instalados, na ordem de preferência do servidor.
+    """
+    levels = compression_settings()['LEVELS']
+    codecs = []
+    if zstandard is not None:
+        codecs.append(ZstdCodec(levels['zstd']))
+    if brotli is not None:
+        codecs.append(BrotliCodec(levels['br']))
+    codecs.append(GzipCodec(levels['gzip']))
+    return codecs
+
+
+def parse_accept_encoding(header):
+    """
+    "gzip;q=0.5, br" -> {'gzip': 0.5, 'br': 1.0}
+    """
+    accepted = {}
+    for item in header.split(','):
+        match = ACCEPT_ENCODING.match(item)
+        if not match or not match.group(1):
+            continue
+        try:
+            quality = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            continue
+        accepted[match.group(1).lower()] = quality
+    return accepted
+
+
+def negotiate(header, codecs=None):
+    """
+    Codec a usar para o Accept-Encoding do cliente, ou None (sem compressão).
+    Vence a maior qualidade; no empate, a ordem de preferência do servidor.
+    """
+    if not header:
+        return None
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get('*', 0.0)
+    best, best_quality = None, 0.0
+    for codec in codecs if codecs is not None else available_codecs():
+        quality = accepted.get(codec.name, wildcard)
+        if quality > best_quality:
+            best, best_quality = codec, quality
+    return best
+
+
+def is_compressible(content_type):
+    media_type = (content_type or '').split(';')[0].strip().lower()
+    return media_type in compression_settings()['CONTENT_TYPES']
+
+
+def compress_variants(content, content_type):
+    """
+    Corpo comprimido em cada codec disponível ({nome: bytes}), para guardar
+    junto da resposta no cache. Vazio se a resposta não seria comprimida.
+    """
+    config = compression_settings()
+    if not config['ENABLED'] or not is_compressible(content_type) or len(content) < config['MIN_SIZE']:
+        return {}
+    return {codec.name: codec.compress(content) for codec in available_codecs()}
+
+
+def compress_stream(codec, chunks):
+    compressor = codec.compressobj()
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def compress_async_stream(codec, chunks):
+    compressor = codec.compressobj()
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class CompressionMiddleware:
+    """
+    Comprime as respostas da API conforme o Accept-Encoding (ver topo do módulo).
+    Fica no começo de MIDDLEWARE para comprimir o corpo já final.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        config = compression_settings()
+        if (not config['ENABLED'] or response.has_header('Content-Encoding')
+                or not is_compressible(response.get('Content-Type'))):
+            return response
+
+        # A resposta varia com o Accept-Encoding mesmo quando sai sem compressão
+        patch_vary_headers(response, ['Accept-Encoding'])
+        if response.streaming:
+            codec = negotiate(request.headers.get('Accept-Encoding', ''))
+            if codec is None:
+                return response
+            if response.is_async:
+                response.streaming_content = compress_async_stream(codec, response.streaming_content)
+            else:
+                response.streaming_content = compress_stream(codec, response.streaming_content)
+            del response['Content-Length']
+            return self.mark_encoded(response, codec)
+
+        if len(response.content) < config['MIN_SIZE']:
+            return response
+        codec = negotiate(request.headers.get('Accept-Encoding', ''))
+        if codec is None:
+            return response
+        precompressed = getattr(response, 'precompressed', None) or {}
+        content = precompressed.get(codec.name)
+        response.content = content if content is not None else codec.compress(response.content)
+        response['Content-Length'] = str(len(response.content))
+        return self.mark_encoded(response, codec)
+
+    def mark_encoded(self, response, codec):
+        # Os bytes mudam com a codificação: o ETag forte vira fraco (como no GZipMiddleware do Django)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = codec.name
+        return response
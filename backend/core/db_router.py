@@ -0,0 +1,132 @@
+"""
+Roteamento de leituras para a réplica (alias DATABASE_ROUTING['REPLICA_ALIAS']).
+
+- Escritas e migrações vão sempre para o default.
+- Leituras só vão para a réplica dentro de use_replica(): as views que
+  aceitam dados com atraso de replicação (listagens, relatórios,
+  exportações) ligam isso por ação (ReplicaReadMixin.replica_actions).
+  Fora disso tudo continua no default.
+- Depois de uma escrita bem-sucedida o usuário fica "preso" ao default por
+  PIN_SECONDS (ReadYourWritesMiddleware), para que ele veja a própria
+  alteração mesmo que a réplica ainda não tenha recebido.
+
+A réplica é configurada em settings.DATABASES (ver config/database.py):
+localmente, um segundo arquivo SQLite atualizado com `manage.py
+sync_replica`, ou um Postgres apontado para a réplica. Se o alias não existe
+ou aponta para o mesmo banco do default (o caso dos testes, em que a
+réplica é um TEST MIRROR), não há roteamento.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+
+DEFAULT_SETTINGS = {
+    'ENABLED': True,
+    'REPLICA_ALIAS': 'replica',
+    'PIN_SECONDS': 5,
+    # Precisa ser compartilhado entre os processos para o pin valer em todos
+    # (o LocMemCache é do processo); settings usa um cache em arquivo
+    'CACHE_ALIAS': 'default',
+}
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Alias das leituras na requisição atual (None: regra padrão do Django, o default)
+read_alias = ContextVar('read_alias', default=None)
+
+
+def routing_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'DATABASE_ROUTING', {})}
+
+
+def replica_alias():
+    """
+    Alias da réplica, ou None se o roteamento está desligado ou não há réplica distinta do default.
+    """
+    config = routing_settings()
+    alias = config['REPLICA_ALIAS']
+    if not config['ENABLED'] or alias not in connections.settings:
+        return None
+    primary, replica = connections.settings[DEFAULT_DB_ALIAS], connections.settings[alias]
+    if all(replica.get(key) == primary.get(key) for key in ('ENGINE', 'NAME', 'HOST', 'PORT')):
+        return None
+    return alias
+
+
+@contextmanager
+def use_database(alias):
+    token = read_alias.set(alias)
+    try:
+        yield alias
+    finally:
+        read_alias.reset(token)
+
+
+def use_replica():
+    return use_database(replica_alias())
+
+
+def iterate_on(alias, iterable):
+    """
+    Consome `iterable` (ex.: o corpo de um StreamingHttpResponse) lendo de
+    `alias`: as queries de uma exportação rodam depois que a view retornou.
+    """
+    iterator = iter(iterable)
+    sentinel = object()
+    while True:
+        with use_database(alias):
+            chunk = next(iterator, sentinel)
+        if chunk is sentinel:
+            return
+        yield chunk
+
+
+def pin_key(user_id):
+    return f'db-pin:{user_id}'
+
+
+def pin_to_primary(user):
+    seconds = routing_settings()['PIN_SECONDS']
+    if user is not None and user.is_authenticated and seconds:
+        caches[routing_settings()['CACHE_ALIAS']].set(pin_key(user.pk), True, seconds)
+
+
+def is_pinned(user):
+    if user is None or not user.is_authenticated:
+        return False
+    return bool(caches[routing_settings()['CACHE_ALIAS']].get(pin_key(user.pk)))
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplica e default têm os mesmos dados: objetos de um podem referenciar os do outro
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == routing_settings()['REPLICA_ALIAS']:
+            return False
+        return None
+
+
+class ReadYourWritesMiddleware:
+    """
+    Prende ao default, por PIN_SECONDS, o usuário que acabou de escrever.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_to_primary(getattr(request, 'user', None))
+        return response
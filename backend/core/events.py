@@ -0,0 +1,255 @@
+"""
+Eventos em tempo real (Server-Sent Events) para notificações e mudanças de status.
+
+Cada conexão SSE é uma fila asyncio no broker do processo; nenhuma thread
+por cliente, então milhares de conexões ociosas custam só memória.
+
+Os eventos chegam ao broker por dois caminhos:
+- sinais (signals.py): publicação imediata depois do commit, no próprio processo;
+- poller: uma única tarefa por processo, enquanto houver conexões, lê do
+  banco as linhas novas (escritas por outros processos/workers) a cada
+  EVENTS['POLL_INTERVAL'] segundos.
+O broker descarta eventos já entregues, então o que vem pelos dois caminhos
+não chega duplicado.
+
+O EventSource do navegador não envia headers: o cliente troca o token da API
+(POST /api/events/ticket/) por um ticket de uso único, válido por
+EVENTS['TICKET_SECONDS'], e abre o stream com ?ticket=. O token em si nunca
+vai na URL (e, com ela, para logs de acesso e histórico do navegador).
+"""
+import asyncio
+import hashlib
+import json
+import secrets
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Notification, Task, TaskStatus
+
+DEFAULT_SETTINGS = {
+    'POLL_INTERVAL': 2,
+    'HEARTBEAT_INTERVAL': 15,
+    'QUEUE_SIZE': 100,
+    'SEEN_SIZE': 10000,
+    'TICKET_SECONDS': 30,
+    # Compartilhado entre processos: o ticket é emitido num e usado em outro
+    'TICKET_CACHE_ALIAS': 'auth',
+}
+
+
+def events_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'EVENTS', {})}
+
+
+def ticket_key(ticket):
+    return f'events:ticket:{hashlib.sha256(ticket.encode()).hexdigest()}'
+
+
+def issue_ticket(user):
+    """
+    Ticket de uso único para abrir o stream como `user`.
+    """
+    config = events_settings()
+    ticket = secrets.token_urlsafe(32)
+    caches[config['TICKET_CACHE_ALIAS']].set(
+        ticket_key(ticket), (user.pk, user.is_superuser or user.is_technician), config['TICKET_SECONDS'])
+    return ticket
+
+
+def redeem_ticket(ticket):
+    """
+    (id do usuário, vê todos os chamados) do ticket, ou None se ele não existe,
+    expirou ou já foi usado.
+    """
+    cache = caches[events_settings()['TICKET_CACHE_ALIAS']]
+    key = ticket_key(ticket)
+    value = cache.get(key)
+    # Só quem de fato apagou a entrada usa o ticket (duas conexões com o mesmo ticket: uma perde)
+    if value is None or not cache.delete(key):
+        return None
+    return value
+
+
+@dataclass
+class Event:
+    kind: str
+    id: int
+    data: dict
+    # Destinatários diretos; technicians=True entrega também a quem vê tudo
+    user_ids: set = field(default_factory=set)
+    technicians: bool = False
+
+    def encode(self):
+        payload = json.dumps(self.data, cls=DjangoJSONEncoder, ensure_ascii=False)
+        return f'id: {self.kind}:{self.id}\nevent: {self.kind}\ndata: {payload}\n\n'
+
+
+def notification_event(notification):
+    return Event(
+        kind='notification',
+        id=notification.pk,
+        data={
+            'id': notification.pk,
+            'text': notification.text,
+            'task_FK': notification.task_FK_id,
+            'creation_date': notification.creation_date,
+        },
+        user_ids={notification.user_FK_id},
+    )
+
+
+def task_status_event(status, responsible_ids):
+    """
+    Vai para quem enxerga a tarefa: criador, responsáveis e técnicos.
+    """
+    task = status.task_FK
+    return Event(
+        kind='task_status',
+        id=status.pk,
+        data={
+            'id': status.pk,
+            'task_FK': task.pk,
+            'task_name': task.name,
+            'status': status.status,
+            'status_date': status.status_date,
+            'user_FK': status.user_FK_id,
+        },
+        user_ids={task.creator_FK_id, *responsible_ids},
+        technicians=True,
+    )
+
+
+def task_status_events(statuses):
+    statuses = list(statuses)
+    through = Task.responsibles_FK.through
+    responsibles = {}
+    for task_id, user_id in through.objects.filter(
+            task_id__in={status.task_FK_id for status in statuses}).values_list('task_id', 'customuser_id'):
+        responsibles.setdefault(task_id, set()).add(user_id)
+    return [task_status_event(status, responsibles.get(status.task_FK_id, ())) for status in statuses]
+
+
+class Subscriber:
+    def __init__(self, loop, user_id, sees_all):
+        self.loop = loop
+        self.user_id = user_id
+        self.sees_all = sees_all
+        self.queue = asyncio.Queue(maxsize=events_settings()['QUEUE_SIZE'])
+        # Fila cheia (cliente lento): avisa para ressincronizar por /api/sync/
+        self.overflowed = False
+
+    def wants(self, event):
+        return self.user_id in event.user_ids or (event.technicians and self.sees_all)
+
+    def put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class EventBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._seen = OrderedDict()
+        self._cursors = None
+        self._poller = None
+
+    def subscribe(self, user_id, sees_all):
+        loop = asyncio.get_running_loop()
+        subscriber = Subscriber(loop, user_id, sees_all)
+        with self._lock:
+            self._subscribers.add(subscriber)
+            if self._poller is None or self._poller.done() or self._poller.get_loop() is not loop:
+                self._poller = loop.create_task(self._poll())
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, events):
+        """
+        Entrega os eventos às conexões interessadas. Pode ser chamado de
+        qualquer thread (sinais de views síncronas) ou do próprio loop.
+        """
+        limit = events_settings()['SEEN_SIZE']
+        with self._lock:
+            fresh = []
+            for event in events:
+                key = (event.kind, event.id)
+                if key in self._seen:
+                    continue
+                self._seen[key] = True
+                fresh.append(event)
+            while len(self._seen) > limit:
+                self._seen.popitem(last=False)
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            for event in fresh:
+                if subscriber.wants(event):
+                    subscriber.loop.call_soon_threadsafe(subscriber.put, event)
+
+    def fetch_new(self):
+        """
+        Linhas criadas desde a última leitura do poller (inclusive por outros processos).
+        """
+        if self._cursors is None:
+            # Na primeira leitura só marca o ponto de partida
+            self._cursors = {
+                'notification': Notification.objects.order_by('-pk').values_list('pk', flat=True).first() or 0,
+                'task_status': TaskStatus.objects.order_by('-pk').values_list('pk', flat=True).first() or 0,
+            }
+            return []
+
+        notifications = list(Notification.objects.filter(pk__gt=self._cursors['notification']).order_by('pk'))
+        statuses = list(TaskStatus.objects.filter(pk__gt=self._cursors['task_status'])
+                        .select_related('task_FK').order_by('pk'))
+        if notifications:
+            self._cursors['notification'] = notifications[-1].pk
+        if statuses:
+            self._cursors['task_status'] = statuses[-1].pk
+        return [notification_event(item) for item in notifications] + task_status_events(statuses)
+
+    async def _poll(self):
+        while True:
+            with self._lock:
+                if not self._subscribers:
+                    # Sem conexões o poller para; o próximo subscribe recomeça do ponto atual
+                    self._cursors = None
+                    return
+            self.publish(await sync_to_async(self.fetch_new)())
+            await asyncio.sleep(events_settings()['POLL_INTERVAL'])
+
+    async def stream(self, user_id, sees_all):
+        """
+        Gera o corpo da resposta SSE até o cliente desconectar.
+        """
+        heartbeat = events_settings()['HEARTBEAT_INTERVAL']
+        subscriber = self.subscribe(user_id, sees_all)
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    # Comentário SSE: mantém a conexão viva em proxies
+                    yield ': ping\n\n'
+                    continue
+                if subscriber.overflowed:
+                    subscriber.overflowed = False
+                    yield 'event: resync\ndata: {}\n\n'
+                yield event.encode()
+        finally:
+            self.unsubscribe(subscriber)
+
+
+broker = EventBroker()
@@ -0,0 +1,124 @@
+"""
+Exportação de tarefas com histórico de status e equipamentos, em CSV ou NDJSON.
+
+As tarefas são lidas com iterator(chunk_size=...): o prefetch das relações é
+feito bloco a bloco, então a memória usada não depende do total exportado.
+Os geradores devolvem pedaços de texto prontos para StreamingHttpResponse ou
+para gravar num arquivo.
+"""
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+
+from .models import Equipment, TaskStatus
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+DEFAULT_CHUNK_SIZE = 500
+
+# CSV: uma linha por status do histórico (tarefas sem histórico saem numa linha só)
+CSV_COLUMNS = [
+    'task_id', 'name', 'description', 'urgency_level', 'creator', 'creation_date',
+    'suggested_date', 'current_status', 'equipments', 'environments',
+    'status_id', 'status', 'status_date', 'status_user', 'comment',
+]
+
+
+def export_queryset(queryset):
+    return queryset.select_related('creator_FK').prefetch_related(
+        Prefetch('equipments_FK',
+                 queryset=Equipment.objects.select_related('environment_FK', 'category_FK').order_by('pk')),
+        Prefetch('TaskStatus_task_FK',
+                 queryset=TaskStatus.objects.select_related('user_FK').order_by('status_date', 'id')),
+        'responsibles_FK',
+    )
+
+
+def iter_tasks(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    return export_queryset(queryset).iterator(chunk_size=chunk_size)
+
+
+def isoformat(value):
+    return value.isoformat() if value else ''
+
+
+def task_record(task):
+    creator = task.creator_FK
+    return {
+        'id': task.pk,
+        'name': task.name,
+        'description': task.description,
+        'urgency_level': task.urgency_level,
+        'creator': {'id': creator.pk, 'name': creator.name, 'email': creator.email} if creator else None,
+        'creation_date': task.creation_date,
+        'suggested_date': task.suggested_date,
+        'current_status': task.current_status,
+        'last_status_date': task.last_status_date,
+        'responsibles': [user.pk for user in task.responsibles_FK.all()],
+        'equipments': [
+            {
+                'id': equipment.pk,
+                'code': equipment.code,
+                'name': equipment.name,
+                'environment': equipment.environment_FK.name if equipment.environment_FK else None,
+                'category': equipment.category_FK.name if equipment.category_FK else None,
+            }
+            for equipment in task.equipments_FK.all()
+        ],
+        'history': [
+            {
+                'id': status.pk,
+                'status': status.status,
+                'status_date': status.status_date,
+                'user': status.user_FK.email if status.user_FK else None,
+                'comment': status.comment,
+            }
+            for status in task.TaskStatus_task_FK.all()
+        ],
+    }
+
+
+class Echo:
+    """
+    Arquivo "falso" para o csv.writer: write() devolve a linha em vez de guardá-la.
+    """
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(tasks):
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_COLUMNS)
+    for task in tasks:
+        record = task_record(task)
+        base = [
+            record['id'], record['name'], record['description'], record['urgency_level'],
+            record['creator']['email'] if record['creator'] else '',
+            isoformat(record['creation_date']), isoformat(record['suggested_date']),
+            record['current_status'],
+            ';'.join(equipment['code'] for equipment in record['equipments']),
+            ';'.join(sorted({equipment['environment'] for equipment in record['equipments']
+                             if equipment['environment']})),
+        ]
+        history = record['history'] or [None]
+        yield ''.join(writer.writerow(base + (
+            [status['id'], status['status'], isoformat(status['status_date']),
+             status['user'] or '', status['comment'] or '']
+            if status else [''] * 5
+        )) for status in history)
+
+
+def stream_ndjson(tasks):
+    for task in tasks:
+        yield json.dumps(task_record(task), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+def stream_export(queryset, output, chunk_size=DEFAULT_CHUNK_SIZE):
+    writer = stream_csv if output == 'csv' else stream_ndjson
+    return writer(iter_tasks(queryset, chunk_size))
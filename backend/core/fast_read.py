@@ -0,0 +1,286 @@
+"""
+Caminho rápido de leitura para as listagens (tarefas, equipamentos e
+notificações), sem o to_representation campo a campo do DRF.
+
+O "plano" de um serializer é compilado uma vez a partir dos próprios campos
+dele (nomes, ordem, origem e tipo) e diz quais colunas pedir com values() e
+como montar cada chave da saída. As relações aninhadas são carregadas em lote
+(uma query por relação, como os prefetch) e renderizadas com o plano do
+serializer aninhado. Valores que precisam de conversão (datas, arquivos) usam
+o to_representation do próprio campo, então o resultado é o mesmo do
+serializer; os testes comparam os bytes das duas saídas.
+
+Campos que o plano não sabe montar levantam UnsupportedField na compilação:
+a view então segue pelo serializer normal.
+"""
+from functools import lru_cache
+from operator import itemgetter
+
+from django.conf import settings
+from django.db.models import ForeignKey, ManyToManyField, ManyToOneRel
+from rest_framework import fields as drf_fields
+from rest_framework import relations, serializers
+
+DEFAULT_SETTINGS = {
+    'ENABLED': True,
+}
+
+# Campos cujo valor vindo do banco já é a representação final
+IDENTITY_FIELDS = (drf_fields.CharField, drf_fields.ChoiceField, drf_fields.IntegerField, drf_fields.BooleanField,
+                   drf_fields.ReadOnlyField)
+
+
+def fast_read_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'FAST_READ', {})}
+
+
+class UnsupportedField(Exception):
+    pass
+
+
+class Relation:
+    """
+    Relação aninhada de um plano: carrega e renderiza os valores de `key`
+    para um lote de linhas e guarda o resultado na própria linha.
+    """
+
+    def __init__(self, key, kind, model_field, plan=None, ordering=('pk',), slug=None):
+        self.key = key
+        self.kind = kind  # 'forward', 'many_to_many' ou 'reverse'
+        self.model_field = model_field
+        self.plan = plan
+        self.ordering = ordering
+        self.slug = slug
+
+    def target_model(self):
+        return self.model_field.related_model
+
+    def load_targets(self, pks, bound):
+        """
+        {pk: representação} dos objetos relacionados.
+        """
+        model = self.target_model()
+        queryset = model._default_manager.filter(pk__in=pks)
+        if self.slug:
+            return dict(queryset.values_list('pk', self.slug))
+        return bound.child(self.plan).render_by_pk(queryset)
+
+    def attach(self, rows, bound):
+        if self.kind == 'forward':
+            column = self.model_field.name
+            pks = {row[column] for row in rows} - {None}
+            targets = self.load_targets(pks, bound) if pks else {}
+            for row in rows:
+                row[self.key] = targets.get(row[column])
+
+        elif self.kind == 'many_to_many':
+            through = self.model_field.remote_field.through
+            source = f'{self.model_field.m2m_field_name()}_id'
+            target = f'{self.model_field.m2m_reverse_field_name()}_id'
+            links = {}
+            for source_pk, target_pk in (through.objects.filter(**{f'{source}__in': [row['pk'] for row in rows]})
+                                         .order_by(target).values_list(source, target)):
+                links.setdefault(source_pk, []).append(target_pk)
+            wanted = {pk for pks in links.values() for pk in pks}
+            targets = self.load_targets(wanted, bound) if wanted else {}
+            for row in rows:
+                row[self.key] = [targets[pk] for pk in links.get(row['pk'], ())]
+
+        else:  # reverse
+            column = self.model_field.field.name
+            children = bound.child(self.plan)
+            queryset = (self.model_field.related_model._default_manager
+                        .filter(**{f'{column}__in': [row['pk'] for row in rows]}).order_by(*self.ordering))
+            grouped = {}
+            for child_row, rendered in children.render_rows(queryset, extra=(column,)):
+                grouped.setdefault(child_row[column], []).append(rendered)
+            for row in rows:
+                row[self.key] = grouped.get(row['pk'], [])
+
+
+class Plan:
+    """
+    Plano compilado de um serializer: colunas do values(), relações e, para
+    cada chave da saída, como obter o valor da linha.
+    """
+
+    def __init__(self, serializer_class):
+        serializer = serializer_class()
+        if type(serializer).to_representation is not serializers.Serializer.to_representation:
+            raise UnsupportedField(f'{serializer_class.__name__}.to_representation')
+        self.model = serializer.Meta.model
+        self.columns = ['pk']
+        self.relations = []
+        # (chave, coluna, conversor|None, precisa do contexto)
+        self.entries = []
+        orderings = getattr(serializer_class, 'nested_ordering', {})
+
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            self.compile_field(serializer, name, field, orderings.get(name, ('pk',)))
+
+    def model_field(self, source):
+        try:
+            return self.model._meta.get_field(source)
+        except Exception:
+            raise UnsupportedField(f'{self.model.__name__}.{source}')
+
+    def compile_field(self, serializer, name, field, ordering):
+        source = field.source
+
+        if isinstance(field, serializers.ListSerializer):
+            model_field = self.model_field(source)
+            kind = 'reverse' if isinstance(model_field, ManyToOneRel) else 'many_to_many'
+            if kind == 'many_to_many' and not isinstance(model_field, ManyToManyField):
+                raise UnsupportedField(name)
+            self.relations.append(Relation(name, kind, model_field, compile_plan(type(field.child)), ordering))
+            self.entries.append((name, name, None, False))
+
+        elif isinstance(field, serializers.BaseSerializer):
+            model_field = self.model_field(source)
+            if not isinstance(model_field, ForeignKey):
+                raise UnsupportedField(name)
+            self.columns.append(model_field.name)
+            self.relations.append(Relation(name, 'forward', model_field, compile_plan(type(field))))
+            self.entries.append((name, name, None, False))
+
+        elif isinstance(field, relations.ManyRelatedField):
+            child = field.child_relation
+            model_field = self.model_field(source)
+            if not isinstance(model_field, ManyToManyField):
+                raise UnsupportedField(name)
+            if isinstance(child, relations.SlugRelatedField):
+                self.relations.append(Relation(name, 'many_to_many', model_field, slug=child.slug_field))
+            elif isinstance(child, relations.PrimaryKeyRelatedField) and child.pk_field is None:
+                self.relations.append(Relation(name, 'many_to_many', model_field, slug='pk'))
+            else:
+                raise UnsupportedField(name)
+            self.entries.append((name, name, None, False))
+
+        elif isinstance(field, relations.PrimaryKeyRelatedField) and field.pk_field is None:
+            model_field = self.model_field(source)
+            if not isinstance(model_field, ForeignKey):
+                raise UnsupportedField(name)
+            self.columns.append(model_field.name)
+            self.entries.append((name, model_field.name, None, False))
+
+        elif isinstance(field, drf_fields.SerializerMethodField):
+            # O serializer fornece compile_<campo>(): (colunas, função(linha, contexto))
+            compiler = getattr(serializer, f'compile_{name}', None)
+            if compiler is None:
+                raise UnsupportedField(name)
+            columns, function = compiler()
+            self.columns += [column for column in columns if column not in self.columns]
+            self.entries.append((name, None, function, True))
+
+        elif isinstance(field, drf_fields.FileField):
+            self.columns.append(self.model_field(source).attname)
+            self.entries.append((name, source, file_url, True))
+
+        elif isinstance(field, drf_fields.ModelField) or '.' in source or source == '*':
+            raise UnsupportedField(name)
+
+        else:
+            column = 'pk' if source == self.model._meta.pk.name else self.model_field(source).attname
+            if column not in self.columns:
+                self.columns.append(column)
+            convert = None if isinstance(field, IDENTITY_FIELDS) else field.to_representation
+            self.entries.append((name, column, convert, False))
+
+
+def file_url(name, context):
+    """
+    Mesmo resultado do FileField do DRF para o nome guardado no banco.
+    """
+    if not name:
+        return None
+    url = context['storage'].url(name)
+    return context['absolute'](url)
+
+
+@lru_cache(maxsize=None)
+def compile_plan(serializer_class):
+    return Plan(serializer_class)
+
+
+class BoundPlan:
+    """
+    Plano ligado a um request: monta as funções de cada chave e renderiza linhas.
+    """
+
+    def __init__(self, plan, request, cache=None):
+        self.plan = plan
+        self.request = request
+        # Planos aninhados ligados ao mesmo request (um por serializer)
+        self.cache = cache if cache is not None else {}
+        context = {'request': request, 'absolute': absolute_url(request)}
+        self.getters = []
+        for key, column, convert, needs_context in plan.entries:
+            if convert is None:
+                self.getters.append((key, itemgetter(column)))
+            elif column is None:
+                self.getters.append((key, bind_row_function(convert, context)))
+            else:
+                if needs_context:
+                    field_context = {**context, 'storage': plan.model._meta.get_field(column).storage}
+                    self.getters.append((key, bind_value_function(column, convert, field_context)))
+                else:
+                    self.getters.append((key, bind_value_function(column, call_without_context(convert), None)))
+
+    def child(self, plan):
+        if plan not in self.cache:
+            self.cache[plan] = BoundPlan(plan, self.request, self.cache)
+        return self.cache[plan]
+
+    def values(self, queryset, extra=()):
+        """
+        values() com as colunas do plano e as anotações do queryset (usadas na ordenação/cursor).
+        """
+        queryset = queryset.prefetch_related(None)
+        names = dict.fromkeys([*self.plan.columns, *extra, *queryset.query.annotations])
+        return queryset.values(*names)
+
+    def render(self, rows):
+        rows = list(rows)
+        for relation in self.plan.relations:
+            if rows:
+                relation.attach(rows, self)
+        getters = self.getters
+        return [{key: getter(row) for key, getter in getters} for row in rows]
+
+    def render_rows(self, queryset, extra=()):
+        rows = list(self.values(queryset, extra))
+        return zip(rows, self.render(rows))
+
+    def render_by_pk(self, queryset):
+        return {row['pk']: rendered for row, rendered in self.render_rows(queryset)}
+
+
+def bind_value_function(column, convert, context):
+    def get(row):
+        value = row[column]
+        # Como o Serializer do DRF: None não passa pelo to_representation
+        return None if value is None else convert(value, context)
+    return get
+
+
+def call_without_context(convert):
+    return lambda value, _: convert(value)
+
+
+def bind_row_function(function, context):
+    return lambda row: function(row, context)
+
+
+def absolute_url(request):
+    """
+    Equivalente ao request.build_absolute_uri(url) do DRF para URLs de arquivos/rotas.
+    """
+    if request is None:
+        return lambda url: url
+    return request.build_absolute_uri
+
+
+def bind(serializer_class, request):
+    return BoundPlan(compile_plan(serializer_class), request)
@@ -0,0 +1,71 @@
+"""
+Seleção de campos da resposta por query string, usada pelos serializers
+(SparseFieldsMixin) e pelos querysets de leitura (TaskQuerySet.for_read):
+
+?fields=id,name,creator_FK.name   só esses campos; o ponto desce nos aninhados
+?expand=creator_FK,equipments_FK  só essas relações vêm embutidas; as outras
+                                  voltam como id (ou lista de ids)
+
+Sem os parâmetros a saída é a completa de sempre. Vale só para leitura
+(GET/HEAD): na escrita os campos são os do serializer.
+"""
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def parse_field_tree(value):
+    """
+    "id,creator_FK.name,creator_FK.email" -> {'id': {}, 'creator_FK': {'name': {}, 'email': {}}}
+    """
+    tree = {}
+    for path in value.split(','):
+        node = tree
+        for part in filter(None, (part.strip() for part in path.split('.'))):
+            node = node.setdefault(part, {})
+    return tree
+
+
+class FieldSelection:
+    """
+    Campos pedidos e relações embutidas de um nível do payload.
+    None em fields/expand significa "sem restrição".
+    """
+
+    def __init__(self, fields=None, expand=None):
+        self.fields = fields
+        self.expand = expand
+
+    @classmethod
+    def from_request(cls, request):
+        if request is None or request.method not in SAFE_METHODS:
+            return cls()
+        params = request.query_params
+        return cls(
+            parse_field_tree(params['fields']) if 'fields' in params else None,
+            parse_field_tree(params['expand']) if 'expand' in params else None,
+        )
+
+    @property
+    def is_default(self):
+        return self.fields is None and self.expand is None
+
+    def includes(self, name):
+        return self.fields is None or name in self.fields
+
+    def expands(self, name):
+        # Pedir subcampos (creator_FK.name) também embute a relação
+        return self.expand is None or name in self.expand or bool(self.fields and self.fields.get(name))
+
+    def nested(self, name):
+        """
+        Seleção do nível de baixo (para o serializer aninhado em `name`).
+        """
+        fields = (self.fields.get(name) or None) if self.fields is not None else None
+        expand = self.expand.get(name, {}) if self.expand is not None else None
+        return FieldSelection(fields, expand)
+
+    def loads(self, name):
+        """
+        A relação aparece embutida na resposta (precisa carregar os objetos).
+        """
+        return self.includes(name) and self.expands(name)
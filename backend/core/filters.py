@@ -0,0 +1,119 @@
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+
+from .models import Task
+
+
+def parse_id_list(value, param):
+    """
+    Converte "1,2,3" em [1, 2, 3], devolvendo 400 se algum valor não for inteiro.
+    """
+    try:
+        return [int(item) for item in value.split(',') if item.strip()]
+    except ValueError:
+        raise ValidationError({param: 'Informe ids inteiros separados por vírgula.'})
+
+
+def filter_tasks(queryset, params):
+    """
+    Filtros de tarefa por parâmetros (QueryDict ou dict), compartilhados entre
+    /api/task/, a exportação e o comando export_tasks:
+    ?urgency=HIGH,LOW  ?status=OPEN  ?environment=1  ?equipment=2  ?creator=3  ?responsible=4
+    Todos aceitam vários valores separados por vírgula.
+    """
+    through_equipment = Task.equipments_FK.through
+    through_responsible = Task.responsibles_FK.through
+
+    if params.get('urgency'):
+        queryset = queryset.filter(urgency_level__in=params['urgency'].split(','))
+
+    if params.get('status'):
+        queryset = queryset.filter(current_status__in=params['status'].split(','))
+
+    # Filtros por relações M2M usam subquery para não duplicar linhas
+    if params.get('environment'):
+        ids = parse_id_list(params['environment'], 'environment')
+        queryset = queryset.filter(pk__in=through_equipment.objects.filter(
+            equipment__environment_FK__in=ids).values('task_id'))
+
+    if params.get('equipment'):
+        ids = parse_id_list(params['equipment'], 'equipment')
+        queryset = queryset.filter(pk__in=through_equipment.objects.filter(
+            equipment_id__in=ids).values('task_id'))
+
+    if params.get('creator'):
+        queryset = queryset.filter(creator_FK__in=parse_id_list(params['creator'], 'creator'))
+
+    if params.get('responsible'):
+        ids = parse_id_list(params['responsible'], 'responsible')
+        queryset = queryset.filter(pk__in=through_responsible.objects.filter(
+            customuser_id__in=ids).values('task_id'))
+
+    return queryset
+
+
+class TaskFilterBackend(BaseFilterBackend):
+    """
+    Filtros do servidor para /api/task/ (ver filter_tasks).
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        return filter_tasks(queryset, request.query_params)
+
+
+class TaskOrderingFilter(OrderingFilter):
+    """
+    Ordenação do servidor com os mesmos nomes de coluna usados no Dashboard:
+    ?ordering=date | status | environment | asset | creation_date (prefixo "-" inverte).
+    """
+    ordering_aliases = {
+        'creation_date': 'creation_date',
+        'date': 'last_status_date',
+        'status': 'current_status',
+        'environment': 'environment_name',
+        'asset': 'asset_name',
+    }
+
+    def get_ordering(self, request, queryset, view):
+        params = request.query_params.get(self.ordering_param)
+        if not params:
+            return self.get_default_ordering(view)
+
+        ordering = []
+        for term in params.split(','):
+            term = term.strip()
+            field = self.ordering_aliases.get(term.lstrip('-'))
+            if field:
+                ordering.append(f"-{field}" if term.startswith('-') else field)
+
+        if not ordering:
+            return self.get_default_ordering(view)
+        # Desempate estável para a paginação por cursor
+        return ordering + ['-id']
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if not ordering:
+            return queryset
+        return self.annotate_sort_keys(queryset, ordering).order_by(*ordering)
+
+    def annotate_sort_keys(self, queryset, ordering):
+        """
+        Anota apenas as chaves de ordenação pedidas. Status e data são colunas
+        da própria tarefa; equipamento e ambiente consideram o primeiro
+        equipamento da tarefa, como no Dashboard.
+        """
+        fields = {term.lstrip('-') for term in ordering}
+        first_equipment = Task.equipments_FK.through.objects.filter(
+            task_id=OuterRef('pk')).order_by('equipment_id')
+
+        # Valores nulos quebram a posição do cursor, então usamos Coalesce
+        if 'environment_name' in fields:
+            queryset = queryset.annotate(environment_name=Coalesce(
+                Subquery(first_equipment.values('equipment__environment_FK__name')[:1]), Value('')))
+        if 'asset_name' in fields:
+            queryset = queryset.annotate(asset_name=Coalesce(
+                Subquery(first_equipment.values('equipment__name')[:1]), Value('')))
+        return queryset
@@ -0,0 +1,55 @@
+"""
+Pipeline das imagens anexadas aos status (TaskStatusImage).
+
+Cada upload é reencodado em JPEG sem metadados EXIF (já com a rotação do EXIF
+aplicada) e ganha duas variantes menores: "medium" e "thumbnail".
+Só depende do Pillow; quem grava os arquivos é o job em core/jobs.py.
+"""
+import io
+
+from django.conf import settings
+from PIL import Image, ImageOps
+
+DEFAULT_SETTINGS = {
+    'MAX_UPLOAD_SIZE': 15 * 1024 * 1024,
+    'ORIGINAL_MAX_SIDE': 2048,
+    'MEDIUM_MAX_SIDE': 1024,
+    'THUMBNAIL_MAX_SIDE': 256,
+    'JPEG_QUALITY': 85,
+}
+
+
+def image_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'TASK_IMAGE', {})}
+
+
+def encode_jpeg(image, max_side, quality):
+    copy = image.copy()
+    copy.thumbnail((max_side, max_side), Image.LANCZOS)
+    buf = io.BytesIO()
+    # Sem o parâmetro exif o Pillow não grava nenhum metadado
+    copy.save(buf, format='JPEG', quality=quality, optimize=True, progressive=True)
+    return buf.getvalue()
+
+
+def process_image(source):
+    """
+    Lê um arquivo de imagem e devolve {'original', 'medium', 'thumbnail'} em bytes JPEG.
+    Levanta PIL.UnidentifiedImageError se o arquivo não for uma imagem.
+    """
+    config = image_settings()
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode != 'RGB':
+            # Transparência vira fundo branco, já que JPEG não tem canal alfa
+            background = Image.new('RGB', image.size, 'white')
+            rgba = image.convert('RGBA')
+            background.paste(rgba, mask=rgba.getchannel('A'))
+            image = background
+
+        quality = config['JPEG_QUALITY']
+        return {
+            'original': encode_jpeg(image, config['ORIGINAL_MAX_SIDE'], quality),
+            'medium': encode_jpeg(image, config['MEDIUM_MAX_SIDE'], quality),
+            'thumbnail': encode_jpeg(image, config['THUMBNAIL_MAX_SIDE'], quality),
+        }
@@ -0,0 +1,195 @@
+"""
+Fila local de jobs em background, guardada no próprio banco (BackgroundJob).
+
+Não depende de broker externo: o comando `run_jobs` consome a fila em lotes.
+Cada `kind` tem um handler que recebe a lista de object_ids do lote.
+"""
+import logging
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from PIL import Image, UnidentifiedImageError
+
+from .images import process_image
+from .models import BackgroundJob, Equipment, TaskStatusImage
+from .models.background_job import JOB_STATUS
+from .models.task import touch_task_statuses
+from .qr import qr_cache, qr_options
+from .retry import retry_on_lock
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+
+MAX_ATTEMPTS = 3
+
+
+def job_handler(kind):
+    """
+    Registra a função que processa um lote de object_ids do tipo `kind`.
+    """
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+@retry_on_lock
+def enqueue(kind, object_ids):
+    """
+    Enfileira um job por objeto com um único INSERT. Com BACKGROUND_JOBS_EAGER
+    o lote é processado no próprio processo logo após o commit.
+    """
+    jobs = BackgroundJob.objects.bulk_create(
+        BackgroundJob(kind=kind, object_id=object_id) for object_id in object_ids
+    )
+    if jobs and getattr(settings, 'BACKGROUND_JOBS_EAGER', False):
+        transaction.on_commit(lambda: run_pending(kinds=[kind]))
+    return jobs
+
+
+@retry_on_lock
+def claim(kind, limit):
+    """
+    Marca até `limit` jobs pendentes como RUNNING e devolve os que este worker pegou.
+    O UPDATE só pega jobs ainda PENDING e grava uma marca única deste claim;
+    a leitura é feita pela marca, então um job que outro worker pegou antes
+    (o UPDATE não encontrou a linha como PENDING) não volta para este.
+    """
+    token = uuid.uuid4().hex
+    with transaction.atomic():
+        ids = list(
+            BackgroundJob.objects.filter(kind=kind, status=JOB_STATUS.PENDING)
+            .order_by('id').values_list('id', flat=True)[:limit]
+        )
+        BackgroundJob.objects.filter(pk__in=ids, status=JOB_STATUS.PENDING).update(
+            status=JOB_STATUS.RUNNING, started_date=timezone.now(), claim_token=token
+        )
+    return list(BackgroundJob.objects.filter(claim_token=token, status=JOB_STATUS.RUNNING).order_by('id'))
+
+
+def run_pending(batch_size=100, kinds=None):
+    """
+    Processa um lote de cada tipo de job pendente. Devolve quantos jobs rodaram.
+    """
+    processed = 0
+    for kind in kinds or list(HANDLERS):
+        jobs = claim(kind, batch_size)
+        if not jobs:
+            continue
+
+        object_ids = sorted({job.object_id for job in jobs})
+        try:
+            HANDLERS[kind](object_ids)
+        except Exception as exc:
+            logger.exception('Falha ao processar jobs %s %s', kind, object_ids)
+            for job in jobs:
+                job.attempts += 1
+                job.error = str(exc)
+                job.status = JOB_STATUS.FAILED if job.attempts >= MAX_ATTEMPTS else JOB_STATUS.PENDING
+            save_failed(jobs)
+        else:
+            mark_done(jobs)
+        processed += len(jobs)
+    return processed
+
+
+@retry_on_lock
+def save_failed(jobs):
+    BackgroundJob.objects.bulk_update(jobs, ['attempts', 'error', 'status'])
+
+
+@retry_on_lock
+def mark_done(jobs):
+    BackgroundJob.objects.filter(pk__in=[job.pk for job in jobs]).update(
+        status=JOB_STATUS.DONE, finished_date=timezone.now(), error=''
+    )
+
+
+@retry_on_lock
+def requeue_stale(older_than=timedelta(minutes=10)):
+    """
+    Devolve para a fila jobs RUNNING abandonados por um worker que morreu.
+    """
+    return BackgroundJob.objects.filter(
+        status=JOB_STATUS.RUNNING, started_date__lt=timezone.now() - older_than
+    ).update(status=JOB_STATUS.PENDING)
+
+
+# --- Handlers ---
+
+def equipment_qr_data(equipment_id):
+    # URL absoluta do detalhe do equipamento, ex.: http://127.0.0.1:8000/api/equipment/2/
+    base = getattr(settings, 'SITE_URL', 'http://127.0.0.1:8000')
+    return f"{base}{reverse('equipment-detail', kwargs={'pk': equipment_id})}"
+
+
+@job_handler('equipment_qr')
+def generate_equipment_qrs(equipment_ids, workers=None):
+    """
+    Pré-gera no cache de disco os QR codes de um lote de equipamentos,
+    renderizando em paralelo só os que ainda não existem.
+    """
+    ids = Equipment.objects.filter(pk__in=equipment_ids).values_list('pk', flat=True)
+    workers = workers or getattr(settings, 'QR_RENDER_WORKERS', None)
+    return qr_cache.warm([equipment_qr_data(pk) for pk in ids], qr_options(), workers)
+
+
+@job_handler('task_status_image')
+def process_task_status_images(image_ids):
+    """
+    Reencoda os anexos (sem EXIF, lado máximo limitado) e gera medium/thumbnail.
+    Arquivos que não são imagem (ou que não dá para processar, como imagens
+    gigantes) ficam como foram enviados; a falha de um anexo não afeta os
+    outros do lote.
+    """
+    images = list(TaskStatusImage.objects.filter(pk__in=image_ids, processed=False))
+    replaced = []
+    for item in images:
+        item.processed = True
+        original = item.image.name
+        if process_task_status_image(item):
+            replaced.append(original)
+
+    TaskStatusImage.objects.bulk_update(images, ['image', 'medium', 'thumbnail', 'processed'])
+    touch_task_statuses({item.task_status_FK_id for item in images})
+    # Só apaga os originais depois que o banco já aponta para os novos arquivos
+    for name in replaced:
+        TaskStatusImage.image.field.storage.delete(name)
+    return len(images)
+
+
+def process_task_status_image(item):
+    """
+    Gera as variantes de um anexo. Em caso de falha apaga o que já foi gravado,
+    mantém o arquivo enviado e devolve False.
+    """
+    fields = ('image', 'medium', 'thumbnail')
+    names = {field: getattr(item, field).name for field in fields}
+    try:
+        with item.image.open('rb') as source:
+            variants = process_image(source)
+        name = f'{Path(item.image.name).stem}.jpg'
+        for field, variant in zip(fields, ('original', 'medium', 'thumbnail')):
+            getattr(item, field).save(name, ContentFile(variants[variant]), save=False)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        logger.warning('Anexo %s não é uma imagem válida; mantido sem variantes.', item.pk)
+    except Exception:
+        logger.exception('Falha ao gerar as variantes do anexo %s; mantido sem variantes.', item.pk)
+    else:
+        return True
+
+    storage = TaskStatusImage.image.field.storage
+    for field, previous in names.items():
+        written = getattr(item, field).name
+        if written and written != previous:
+            storage.delete(written)
+        setattr(item, field, previous)
+    return False
@@ -0,0 +1,178 @@
+"""
+Folhas de etiquetas com QR code (PDF de várias páginas ou PNG por página).
+
+As páginas são montadas e entregues uma de cada vez, então a memória usada não
+depende da quantidade de etiquetas. As etiquetas de cada página são renderizadas
+em paralelo num pool de processos. Como em core/qr.py, a renderização não importa
+models: trabalha com tuplas (nome, código, texto do QR) montadas por equipment_labels.
+"""
+import io
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from PIL import Image, ImageDraw, ImageFont
+
+from .qr import PARALLEL_THRESHOLD, render_qr_png
+
+# Folha A4 a 150 dpi
+DPI = 150
+PAGE_SIZE = (1240, 1754)
+MARGIN = 60
+COLUMNS = 3
+ROWS = 5
+LABELS_PER_PAGE = COLUMNS * ROWS
+POINTS_PER_PIXEL = 72 / DPI
+
+
+def label_size():
+    width = (PAGE_SIZE[0] - 2 * MARGIN) // COLUMNS
+    height = (PAGE_SIZE[1] - 2 * MARGIN) // ROWS
+    return width, height
+
+
+def load_font(size):
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        # Pillow sem FreeType: só há a fonte bitmap de tamanho fixo
+        return ImageFont.load_default()
+
+
+def fit_text(draw, text, font, width):
+    """
+    Corta o texto com reticências até caber na largura da etiqueta.
+    """
+    if draw.textlength(text, font=font) <= width:
+        return text
+    while text and draw.textlength(f'{text}…', font=font) > width:
+        text = text[:-1]
+    return f'{text}…'
+
+
+def render_label(label):
+    """
+    Uma etiqueta em tons de cinza: QR em cima, nome e código embaixo.
+    """
+    name, code, data = label
+    width, height = label_size()
+    tile = Image.new('L', (width, height), 255)
+    draw = ImageDraw.Draw(tile)
+
+    text_height = 70
+    qr_side = min(width, height - text_height) - 20
+    qr = Image.open(io.BytesIO(render_qr_png(data, box_size=10, border=2))).convert('L')
+    tile.paste(qr.resize((qr_side, qr_side), Image.NEAREST), ((width - qr_side) // 2, 10))
+
+    text_width = width - 20
+    name_font, code_font = load_font(24), load_font(20)
+    name = fit_text(draw, name, name_font, text_width)
+    code = fit_text(draw, code, code_font, text_width)
+    draw.text((width // 2, qr_side + 20), name, font=name_font, fill=0, anchor='mt')
+    draw.text((width // 2, qr_side + 50), code, font=code_font, fill=0, anchor='mt')
+    draw.rectangle((0, 0, width - 1, height - 1), outline=200)
+    return tile
+
+
+def equipment_labels(equipments, chunk_size=500):
+    """
+    Tuplas (nome, código, texto do QR) lidas do banco em blocos, sem carregar tudo.
+    """
+    from .jobs import equipment_qr_data
+
+    for pk, name, code in equipments.values_list('pk', 'name', 'code').iterator(chunk_size=chunk_size):
+        yield name, code, equipment_qr_data(pk)
+
+
+def iter_pages(labels, workers=None):
+    """
+    Gera as páginas (Image) em sequência, LABELS_PER_PAGE etiquetas por vez.
+    """
+    labels = iter(labels)
+    workers = workers or os.cpu_count() or 1
+    width, height = label_size()
+    executor = None
+    try:
+        while True:
+            chunk = list(islice(labels, LABELS_PER_PAGE))
+            if not chunk:
+                return
+            if workers > 1 and len(chunk) >= PARALLEL_THRESHOLD // 2:
+                # O pool só sobe quando há uma página cheia o bastante para compensar
+                executor = executor or ProcessPoolExecutor(max_workers=workers)
+                tiles = executor.map(render_label, chunk)
+            else:
+                tiles = map(render_label, chunk)
+
+            page = Image.new('L', PAGE_SIZE, 255)
+            for index, tile in enumerate(tiles):
+                row, column = divmod(index, COLUMNS)
+                page.paste(tile, (MARGIN + column * width, MARGIN + row * height))
+            yield page
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+
+
+def page_png(page):
+    buf = io.BytesIO()
+    page.save(buf, format='PNG', dpi=(DPI, DPI))
+    return buf.getvalue()
+
+
+def stream_pdf(pages):
+    """
+    Escreve um PDF página a página, devolvendo pedaços de bytes.
+
+    Cada página vira uma imagem em tons de cinza comprimida com Flate; a tabela
+    xref e a árvore de páginas são escritas no fim, quando já se conhece tudo.
+    Objetos 1 e 2 são reservados para o catálogo e a árvore de páginas.
+    """
+    offsets = {}
+    position = 0
+    page_ids = []
+    next_id = 3
+
+    def emit(object_id, body):
+        nonlocal position
+        offsets[object_id] = position
+        chunk = f'{object_id} 0 obj\n'.encode() + body + b'\nendobj\n'
+        position += len(chunk)
+        return chunk
+
+    header = b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n'
+    position += len(header)
+    yield header
+
+    for page in pages:
+        image_id, content_id, page_id = next_id, next_id + 1, next_id + 2
+        next_id += 3
+        width, height = page.size
+        width_pt, height_pt = width * POINTS_PER_PIXEL, height * POINTS_PER_PIXEL
+
+        pixels = zlib.compress(page.tobytes())
+        yield emit(image_id, (
+            f'<< /Type /XObject /Subtype /Image /Width {width} /Height {height} '
+            f'/ColorSpace /DeviceGray /BitsPerComponent 8 /Filter /FlateDecode '
+            f'/Length {len(pixels)} >>\nstream\n'
+        ).encode() + pixels + b'\nendstream')
+
+        content = f'q {width_pt:.2f} 0 0 {height_pt:.2f} 0 0 cm /Im0 Do Q'.encode()
+        yield emit(content_id, f'<< /Length {len(content)} >>\nstream\n'.encode() + content + b'\nendstream')
+
+        yield emit(page_id, (
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width_pt:.2f} {height_pt:.2f}] '
+            f'/Resources << /XObject << /Im0 {image_id} 0 R >> >> /Contents {content_id} 0 R >>'
+        ).encode())
+        page_ids.append(page_id)
+
+    kids = ' '.join(f'{page_id} 0 R' for page_id in page_ids)
+    yield emit(2, f'<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>'.encode())
+    yield emit(1, b'<< /Type /Catalog /Pages 2 0 R >>')
+
+    xref = [f'xref\n0 {next_id}\n', '0000000000 65535 f \n']
+    for object_id in range(1, next_id):
+        xref.append(f'{offsets[object_id]:010d} 00000 n \n')
+    xref.append(f'trailer\n<< /Size {next_id} /Root 1 0 R >>\nstartxref\n{position}\n%%EOF\n')
+    yield ''.join(xref).encode()
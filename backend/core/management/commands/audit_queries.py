@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.query_audit import audit, catalogue
+
+
+class Command(BaseCommand):
+    help = 'Roda EXPLAIN QUERY PLAN nas queries principais e aponta leituras da tabela inteira.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help='Só estas queries do catálogo (padrão: todas).')
+        parser.add_argument('--verbose-plan', action='store_true', help='Mostra o plano completo de cada query.')
+        parser.add_argument('--fail-on-scan', action='store_true',
+                            help='Termina com erro se alguma query ler a tabela inteira (para CI).')
+
+    def handle(self, *args, **options):
+        unknown = set(options['names']) - set(catalogue())
+        if unknown:
+            raise CommandError(f"Queries desconhecidas: {', '.join(sorted(unknown))}.")
+        try:
+            reports = audit(options['names'])
+        except NotImplementedError as error:
+            raise CommandError(str(error))
+
+        flagged = []
+        for report in reports:
+            if report.full_scans:
+                flagged.append(report.name)
+                self.stdout.write(self.style.ERROR(f"{report.name}: SCAN em {', '.join(report.full_scans)}"))
+            elif report.temp_sorts:
+                self.stdout.write(self.style.WARNING(f'{report.name}: ordenação sem índice (temp b-tree)'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{report.name}: ok'))
+            if options['verbose_plan']:
+                for line in report.plan:
+                    self.stdout.write(f'    {line}')
+
+        if flagged and options['fail_on_scan']:
+            raise CommandError(f"{len(flagged)} query(ies) com leitura completa: {', '.join(flagged)}.")
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.sqlite_benchmark import PROFILES, run_benchmark
+
+
+class Command(BaseCommand):
+    help = ('Mede a vazão do SQLite com leituras e escritas concorrentes, na configuração padrão do Django '
+            'e na de settings.SQLITE (arquivos temporários; o banco do projeto não é usado).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('profiles', nargs='*', default=list(PROFILES), help='default e/ou tuned (padrão: ambos).')
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=5.0)
+        parser.add_argument('--write-ratio', type=float, default=0.3, help='Fração das operações que escrevem.')
+        parser.add_argument('--rows', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        unknown = set(options['profiles']) - set(PROFILES)
+        if unknown:
+            raise CommandError(f"Perfis desconhecidos: {', '.join(sorted(unknown))}.")
+
+        results = []
+        for profile in options['profiles']:
+            result = run_benchmark(profile, options['threads'], options['seconds'],
+                                   options['write_ratio'], options['rows'])
+            results.append(result)
+            self.stdout.write(
+                f'{profile:>8}: {result.operations_per_second:8.0f} ops/s  '
+                f'{result.writes_per_second:7.0f} escritas/s  p95 escrita {result.write_p95_ms:7.1f} ms  '
+                f'erros de lock {result.errors}  novas tentativas {result.retries}'
+            )
+
+        if len(results) == 2 and results[0].operations_per_second:
+            ratio = results[1].operations_per_second / results[0].operations_per_second
+            self.stdout.write(self.style.SUCCESS(f'{results[1].profile} / {results[0].profile}: {ratio:.1f}x'))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from core.exports import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, stream_export
+from core.filters import filter_tasks
+from core.models import Task
+
+FILTERS = ['urgency', 'status', 'environment', 'equipment', 'creator', 'responsible']
+
+
+class Command(BaseCommand):
+    help = 'Exporta as tarefas com histórico de status e equipamentos em CSV ou NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--output', help='Arquivo de saída (padrão: stdout).')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        for name in FILTERS:
+            parser.add_argument(f'--{name}', help='Valores separados por vírgula, como em /api/task/.')
+
+    def handle(self, *args, **options):
+        params = {name: options[name] for name in FILTERS if options[name]}
+        try:
+            tasks = filter_tasks(Task.objects.order_by('pk'), params)
+        except ValidationError as exc:
+            raise CommandError(exc.detail)
+
+        chunks = stream_export(tasks, options['format'], options['chunk_size'])
+        if not options['output']:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+
+        with open(options['output'], 'w', encoding='utf-8', newline='') as file:
+            for chunk in chunks:
+                file.write(chunk)
+        self.stderr.write(self.style.SUCCESS(f"Exportação salva em {options['output']}."))
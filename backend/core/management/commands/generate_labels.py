@@ -0,0 +1,44 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.labels import equipment_labels, iter_pages, page_png, stream_pdf
+from core.models import Equipment
+
+
+class Command(BaseCommand):
+    help = 'Gera a folha de etiquetas com QR code dos equipamentos de um ambiente e/ou categoria.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--environment', type=int)
+        parser.add_argument('--category', type=int)
+        parser.add_argument('--format', choices=['pdf', 'png'], default='pdf')
+        parser.add_argument('--output', required=True,
+                            help='Arquivo .pdf, ou diretório onde salvar as páginas PNG.')
+        parser.add_argument('--workers', type=int, default=None)
+
+    def handle(self, *args, **options):
+        if not options['environment'] and not options['category']:
+            raise CommandError('Informe --environment e/ou --category.')
+
+        equipments = Equipment.objects.order_by('environment_FK', 'category_FK', 'pk')
+        if options['environment']:
+            equipments = equipments.filter(environment_FK=options['environment'])
+        if options['category']:
+            equipments = equipments.filter(category_FK=options['category'])
+
+        pages = iter_pages(equipment_labels(equipments), options['workers'])
+        output = Path(options['output'])
+
+        if options['format'] == 'pdf':
+            with output.open('wb') as file:
+                for chunk in stream_pdf(pages):
+                    file.write(chunk)
+            self.stdout.write(self.style.SUCCESS(f'Etiquetas salvas em {output}.'))
+            return
+
+        output.mkdir(parents=True, exist_ok=True)
+        count = 0
+        for count, page in enumerate(pages, start=1):
+            (output / f'etiquetas_{count:03d}.png').write_bytes(page_png(page))
+        self.stdout.write(self.style.SUCCESS(f'{count} página(s) salvas em {output}.'))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from core.jobs import generate_equipment_qrs
+from core.models import Equipment
+
+
+class Command(BaseCommand):
+    help = 'Pré-gera em lote, no cache de disco, os QR codes que ainda faltam para os equipamentos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Processos de renderização (padrão: QR_RENDER_WORKERS ou nº de CPUs).')
+
+    def handle(self, *args, **options):
+        ids = list(Equipment.objects.order_by('pk').values_list('pk', flat=True))
+
+        rendered = 0
+        size = options['batch_size']
+        for offset in range(0, len(ids), size):
+            rendered += generate_equipment_qrs(ids[offset:offset + size], workers=options['workers'])
+            self.stdout.write(f'{min(offset + size, len(ids))}/{len(ids)} equipamento(s) verificado(s).')
+
+        self.stdout.write(self.style.SUCCESS(f'{rendered} QR code(s) gerado(s).'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from core.models import SyncTombstone
+from core.views.sync import sync_settings
+
+
+class Command(BaseCommand):
+    help = 'Remove as lápides de exclusão antigas usadas por /api/sync/.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help="Padrão: SYNC['TOMBSTONE_DAYS'].")
+
+    def handle(self, *args, **options):
+        days = options['days'] or sync_settings()['TOMBSTONE_DAYS']
+        removed = SyncTombstone.objects.prune(days)
+        self.stdout.write(self.style.SUCCESS(f'{removed} lápide(s) removida(s).'))
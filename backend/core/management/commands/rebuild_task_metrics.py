@@ -0,0 +1,32 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Task, TaskDailyMetric
+
+
+class Command(BaseCommand):
+    help = 'Recalcula (backfill) o rollup diário TaskDailyMetric a partir de Task/TaskStatus.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=date.fromisoformat, help='Primeiro dia (AAAA-MM-DD).')
+        parser.add_argument('--end', type=date.fromisoformat, help='Último dia (AAAA-MM-DD).')
+
+    def handle(self, *args, **options):
+        start, end = options['start'], options['end']
+        if start and end and start > end:
+            raise CommandError('--start deve ser anterior a --end.')
+
+        days = TaskDailyMetric.objects.days_for_tasks(Task.objects.values('pk'))
+        days = {day for day in days if (not start or day >= start) and (not end or day <= end)}
+
+        # Dias que não têm mais eventos também precisam ser limpos
+        stale = TaskDailyMetric.objects.exclude(day__in=days)
+        if start:
+            stale = stale.filter(day__gte=start)
+        if end:
+            stale = stale.filter(day__lte=end)
+        stale.delete()
+
+        TaskDailyMetric.objects.rebuild_days(days)
+        self.stdout.write(self.style.SUCCESS(f'{len(days)} dia(s) recalculado(s).'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Task
+
+
+class Command(BaseCommand):
+    help = 'Recalcula Task.current_status e Task.last_status_date a partir do histórico de status.'
+
+    def handle(self, *args, **options):
+        updated = Task.objects.all().refresh_status_cache()
+        self.stdout.write(self.style.SUCCESS(f'{updated} tarefa(s) atualizada(s).'))
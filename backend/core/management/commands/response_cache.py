@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from core import response_cache
+import core.views  # noqa: F401 (registra as views com cache)
+
+
+class Command(BaseCommand):
+    help = 'Mostra os acertos/faltas do cache de respostas, ou limpa o cache.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset-stats', action='store_true', help='Zera os contadores.')
+        parser.add_argument('--clear', action='store_true', help='Apaga todas as respostas guardadas.')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            response_cache.get_cache().clear()
+            self.stdout.write(self.style.SUCCESS('Cache de respostas limpo.'))
+            return
+
+        for name, counters in response_cache.stats().items():
+            total = counters['hits'] + counters['misses']
+            ratio = f"{100 * counters['hits'] / total:.1f}%" if total else '-'
+            self.stdout.write(f"{name}: {counters['hits']} acertos, {counters['misses']} faltas ({ratio})")
+
+        if options['reset_stats']:
+            response_cache.reset_stats()
+            self.stdout.write(self.style.SUCCESS('Contadores zerados.'))
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import jobs
+
+
+class Command(BaseCommand):
+    help = 'Worker da fila local de jobs em background (QR codes, imagens...).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--interval', type=float, default=2.0,
+                            help='Segundos de espera quando a fila está vazia.')
+        parser.add_argument('--once', action='store_true',
+                            help='Processa o que estiver pendente e sai.')
+
+    def handle(self, *args, **options):
+        requeued = jobs.requeue_stale()
+        if requeued:
+            self.stdout.write(f'{requeued} job(s) abandonado(s) voltaram para a fila.')
+
+        while True:
+            processed = jobs.run_pending(batch_size=options['batch_size'])
+            if processed:
+                self.stdout.write(f'{processed} job(s) processado(s).')
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
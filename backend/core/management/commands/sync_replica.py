@@ -0,0 +1,40 @@
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.db_router import replica_alias
+
+
+class Command(BaseCommand):
+    help = ('Copia o banco default para o arquivo da réplica de leitura (SQLite local, ver core/db_router.py). '
+            'Com --interval repete a cópia, simulando uma réplica com atraso.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0,
+                            help='Segundos entre cópias; 0 copia uma vez e sai.')
+
+    def handle(self, *args, **options):
+        alias = replica_alias()
+        if alias is None:
+            raise CommandError('Não há réplica distinta do default (defina SQLITE_REPLICA_NAME).')
+        primary, replica = connections[DEFAULT_DB_ALIAS], connections[alias]
+        if primary.vendor != 'sqlite' or replica.vendor != 'sqlite':
+            raise CommandError('A cópia só vale para SQLite; outros bancos usam a replicação do próprio servidor.')
+
+        while True:
+            self.copy(primary, replica.settings_dict['NAME'])
+            self.stdout.write(self.style.SUCCESS(f"Réplica atualizada: {replica.settings_dict['NAME']}"))
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
+
+    def copy(self, primary, target):
+        primary.ensure_connection()
+        # backup() copia um snapshot consistente, mesmo com escritas acontecendo no default
+        destination = sqlite3.connect(target)
+        try:
+            primary.connection.backup(destination)
+        finally:
+            destination.close()
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:30
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_current_status(apps, schema_editor):
+    Task = apps.get_model('core', 'Task')
+    TaskStatus = apps.get_model('core', 'TaskStatus')
+    latest = TaskStatus.objects.filter(task_FK=OuterRef('pk')).order_by('-status_date', '-id')
+    Task.objects.update(
+        current_status=Coalesce(Subquery(latest.values('status')[:1]), Value('OPEN')),
+        last_status_date=Coalesce(Subquery(latest.values('status_date')[:1]), F('creation_date')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_equipment_qr_code_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='current_status',
+            field=models.CharField(choices=[('OPEN', 'Open'), ('WAITING_RESPONSIBLE', 'Waiting Responsible'), ('ONGOING', 'Ongoing'), ('DONE', 'Done'), ('FINISHED', 'Finished'), ('CANCELLED', 'Cancelled')], db_index=True, default='OPEN', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='last_status_date',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(backfill_current_status, migrations.RunPython.noop),
+    ]
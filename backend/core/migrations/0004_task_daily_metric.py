@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_task_current_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskDailyMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(db_index=True)),
+                ('urgency_level', models.CharField(max_length=50)),
+                ('tasks_created', models.PositiveIntegerField(default=0)),
+                ('opened', models.PositiveIntegerField(default=0)),
+                ('closed', models.PositiveIntegerField(default=0)),
+                ('status_open', models.PositiveIntegerField(default=0)),
+                ('status_waiting_responsible', models.PositiveIntegerField(default=0)),
+                ('status_ongoing', models.PositiveIntegerField(default=0)),
+                ('status_done', models.PositiveIntegerField(default=0)),
+                ('status_finished', models.PositiveIntegerField(default=0)),
+                ('status_cancelled', models.PositiveIntegerField(default=0)),
+                ('resolved_count', models.PositiveIntegerField(default=0)),
+                ('resolution_seconds', models.PositiveBigIntegerField(default=0)),
+                ('environment_FK', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='TaskDailyMetric_environment_FK', to='core.environment')),
+            ],
+        ),
+    ]
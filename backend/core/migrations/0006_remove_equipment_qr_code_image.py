@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:35
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_background_job'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='equipment',
+            name='qr_code_image',
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_remove_equipment_qr_code_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskstatusimage',
+            name='medium',
+            field=models.FileField(blank=True, null=True, upload_to='task_images/medium'),
+        ),
+        migrations.AddField(
+            model_name='taskstatusimage',
+            name='processed',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='taskstatusimage',
+            name='thumbnail',
+            field=models.FileField(blank=True, null=True, upload_to='task_images/thumbnails'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:02
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def deduplicate_equipment_codes(apps, schema_editor):
+    """
+    Antes da restrição de unicidade: o primeiro equipamento de cada código
+    repetido fica com ele, os demais recebem o sufixo "-<id>".
+    """
+    Equipment = apps.get_model('core', 'Equipment')
+    repeated = (Equipment.objects.values('code').annotate(total=Count('id'))
+                .filter(total__gt=1).values_list('code', flat=True))
+    for code in list(repeated):
+        for equipment in Equipment.objects.filter(code=code).order_by('id')[1:]:
+            equipment.code = f'{code[:50 - len(str(equipment.pk)) - 1]}-{equipment.pk}'
+            equipment.save(update_fields=['code'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_notification_user_read_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate_equipment_codes, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='equipment',
+            name='code',
+            field=models.CharField(max_length=50, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['-creation_date', '-id'], name='core_task_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['creator_FK', '-creation_date', '-id'], name='core_task_creator_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskstatus',
+            index=models.Index(fields=['task_FK', 'status_date', 'id'], name='core_status_task_date_idx'),
+        ),
+    ]
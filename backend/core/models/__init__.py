@@ -5,8 +5,12 @@ from .task import *
 from .task_status import *
 from .custom_user import *
 from .notification import *
+from .task_metric import *
+from .background_job import *
+from .sync_tombstone import *
 __all__ = [
     'Category', 'Environment', 'Equipment', 
     'Task', 'TaskStatus', 'TaskStatusImage', 
-    'CustomUser', 'Notification'
+    'CustomUser', 'Notification', 'TaskDailyMetric',
+    'BackgroundJob', 'SyncTombstone'
 ]
\ No newline at end of file
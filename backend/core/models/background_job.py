@@ -0,0 +1,35 @@
+from django.db import models
+
+
+class JOB_STATUS(models.TextChoices):
+    PENDING = 'PENDING'
+    RUNNING = 'RUNNING'
+    DONE = 'DONE'
+    FAILED = 'FAILED'
+
+
+class BackgroundJob(models.Model):
+    """
+    Item da fila local de processamento em background (ver core/jobs.py).
+    Cada job aponta para uma linha (object_id) que o handler do `kind` processa.
+    """
+    kind = models.CharField(max_length=50)
+    object_id = models.PositiveBigIntegerField()
+    status = models.CharField(max_length=20,
+                              choices=JOB_STATUS.choices,
+                              default=JOB_STATUS.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    creation_date = models.DateTimeField(auto_now_add=True)
+    started_date = models.DateTimeField(null=True, blank=True)
+    finished_date = models.DateTimeField(null=True, blank=True)
+    # Marca do claim() que pegou o job: o worker lê de volta só os que ele marcou
+    claim_token = models.CharField(max_length=32, blank=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'kind', 'id'], name='core_job_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind}:{self.object_id} ({self.status})'
@@ -1,7 +1,12 @@
 from django.db import models
+from django.utils.functional import cached_property
 from django.contrib.auth.models import BaseUserManager, AbstractBaseUser, PermissionsMixin
 
 
+# Nomes aceitos para o grupo de técnicos (ajuste para o nome EXATO do grupo no Admin)
+TECHNICIAN_GROUPS = ['Técnico', 'Tecnico', 'Técnico(a)']
+
+
 class CustomUserManager(BaseUserManager):
     def create_user(self, email, password, nif, **extra_fields):
         if None in (email,password,nif):
@@ -30,11 +35,19 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     is_staff = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
     creation_date = models.DateTimeField(auto_now_add=True)
+    # Usado no ETag das respostas que incluem este model
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['name','nif']
 
     objects = CustomUserManager()
 
+    @cached_property
+    def is_technician(self):
+        # Calculado uma vez por objeto; o usuário autenticado já chega com ele
+        # preenchido pelo cache de autenticação (core/auth_cache.py)
+        return any(group.name in TECHNICIAN_GROUPS for group in self.groups.all())
+
     def __str__(self):
         return self.email
\ No newline at end of file
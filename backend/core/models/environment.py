@@ -5,6 +5,8 @@ class Environment(models.Model):
     user_FK = models.ForeignKey('CustomUser', 
                                 related_name='Environment_user_FK',
                                 on_delete=models.CASCADE)
+    # Usado no ETag das respostas que incluem este model
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     def __str__(self):
         return self.name
@@ -2,13 +2,12 @@ from django.db import models
 
 class Equipment(models.Model):
     name = models.CharField(max_length=150)
-    code = models.CharField(max_length=50)
+    # Identificador impresso no QR code: a leitura resolve o equipamento por ele
+    code = models.CharField(max_length=50, unique=True)
     description = models.CharField(max_length=500)
     creation_date = models.DateTimeField(auto_now_add=True)
-    
-    # campo para armazenar o QR gerado
-    qr_code_image = models.ImageField(upload_to='equipment_qr/', blank=True, null=True)
-
+    # Marcador de alteração usado pela sincronização incremental (/api/sync/)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     category_FK = models.ForeignKey('Category', 
                                 related_name='Equipment_category_FK',
@@ -11,6 +11,14 @@ class Notification(models.Model):
                                 null=True)
     creation_date = models.DateTimeField(auto_now_add=True)
     notification_read = models.BooleanField(default=False)
+    # Marcador de alteração usado pela sincronização incremental (/api/sync/)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Contagem de não lidas e agrupamento em core/notifications.py
+            models.Index(fields=['user_FK', 'notification_read'], name='core_notif_user_read_idx'),
+        ]
 
     def __str__(self):
         return self.task_FK.name
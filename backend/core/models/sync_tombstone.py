@@ -0,0 +1,47 @@
+from datetime import timedelta
+
+from django.db import models
+from django.utils import timezone
+
+
+class SyncTombstoneQuerySet(models.QuerySet):
+    def prune(self, days):
+        """
+        Remove lápides mais antigas que `days` dias. Clientes com cursor
+        anterior a isso recebem um snapshot completo (reset) em /api/sync/.
+        """
+        return self.filter(deleted_at__lt=timezone.now() - timedelta(days=days)).delete()[0]
+
+    def visible_to(self, user):
+        """
+        Lápides que o usuário pode receber, com as mesmas regras das listagens:
+        chamados e status pelo criador do chamado (técnicos veem todos),
+        notificações pelo destinatário e equipamentos com core.view_equipment.
+        """
+        if user.is_superuser:
+            return self.all()
+        visible = models.Q(owner_id=user.pk, model__in=('task', 'task_status', 'notification'))
+        if user.is_technician:
+            visible |= models.Q(model__in=('task', 'task_status'))
+        if user.has_perm('core.view_equipment'):
+            visible |= models.Q(model='equipment')
+        return self.filter(visible)
+
+
+class SyncTombstone(models.Model):
+    """
+    Registro de exclusão para a sincronização incremental: o cliente recebe
+    os ids removidos desde o seu cursor e apaga as cópias locais.
+    """
+    model = models.CharField(max_length=50)
+    object_id = models.PositiveBigIntegerField()
+    # Quem enxergava o objeto além de técnicos/superusuários: o criador do
+    # chamado (task, task_status) ou o destinatário (notification). Sem FK: o
+    # usuário pode já ter sido excluído.
+    owner_id = models.PositiveBigIntegerField(null=True, blank=True, db_index=True)
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    objects = SyncTombstoneQuerySet.as_manager()
+
+    def __str__(self):
+        return f'{self.model}:{self.object_id}'
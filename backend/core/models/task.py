@@ -1,4 +1,12 @@
+from django.contrib.auth.models import Group
 from django.db import models
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from ..field_selection import FieldSelection
+from .custom_user import CustomUser
+from .equipment import Equipment
+from .task_status import STATUS, TaskStatus, TaskStatusImage
 
 class URGENCY_LEVELS(models.TextChoices):
     LOW = 'LOW', 'low'
@@ -7,6 +15,121 @@ class URGENCY_LEVELS(models.TextChoices):
     EXTRA_HIGH = 'EXTRA_HIGH', 'extra_high'
 
 
+# Colunas serializadas pelo TaskReadSerializer e as usadas na ordenação/cursor
+READ_COLUMNS = ('name', 'description', 'suggested_date', 'urgency_level', 'creation_date',
+                'current_status', 'last_status_date', 'creator_FK')
+ORDERING_COLUMNS = ('id', 'creation_date', 'current_status', 'last_status_date')
+
+
+def ordered_groups(lookup):
+    # Listas aninhadas sempre por id: a mesma ordem do caminho rápido (core/fast_read.py)
+    return models.Prefetch(lookup, queryset=Group.objects.order_by('pk'))
+
+
+def read_users(selection, name):
+    """
+    Usuários de uma relação da leitura: objetos completos (com grupos, se
+    pedidos) quando embutidos, só o id quando a relação volta como ids.
+    """
+    users = CustomUser.objects.order_by('pk')
+    if not selection.expands(name):
+        return users.only('id')
+    if selection.nested(name).includes('groups'):
+        return users.prefetch_related(ordered_groups('groups'))
+    return users
+
+
+def read_statuses(selection):
+    """
+    Histórico de status para o TaskStatusSerializer aninhado.
+    """
+    statuses = TaskStatus.objects.order_by('status_date', 'id')
+    if selection.loads('user_detail'):
+        statuses = statuses.select_related('user_FK')
+        if selection.nested('user_detail').includes('groups'):
+            statuses = statuses.prefetch_related(ordered_groups('user_FK__groups'))
+    if selection.includes('images'):
+        images = 'TaskStatusImage_task_status_FK'
+        queryset = TaskStatusImage.objects.order_by('pk')
+        statuses = statuses.prefetch_related(models.Prefetch(
+            images, queryset=queryset if selection.expands('images') else queryset.only('id', 'task_status_FK')))
+    return statuses
+
+
+class TaskQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """
+        Regra de visibilidade dos chamados:
+        1. Superusuário ou Técnico: vê TUDO.
+        2. Colaborador comum: vê APENAS o que ele criou (creator_FK=user).
+        """
+        if not user.is_authenticated:
+            return self.none()
+        if user.is_superuser or user.is_technician:
+            return self.all()
+        return self.filter(creator_FK=user)
+
+    def refresh_status_cache(self):
+        """
+        Recalcula current_status/last_status_date a partir do histórico em um
+        único UPDATE. Tarefas sem histórico ficam como OPEN na data de criação.
+        """
+        latest = TaskStatus.objects.filter(task_FK=models.OuterRef('pk')).order_by('-status_date', '-id')
+        return self.update(
+            current_status=Coalesce(models.Subquery(latest.values('status')[:1]), models.Value(STATUS.OPEN)),
+            last_status_date=Coalesce(models.Subquery(latest.values('status_date')[:1]), models.F('creation_date')),
+            updated_at=timezone.now(),
+        )
+
+    def touch(self):
+        """
+        Marca as tarefas como alteradas (update() não aciona o auto_now).
+        """
+        return self.update(updated_at=timezone.now())
+
+    def for_read(self, selection=None):
+        """
+        Carrega todo o grafo usado pelo TaskReadSerializer (criador, equipamentos,
+        responsáveis e histórico de status com imagens) num número fixo de
+        queries, independente da quantidade de tarefas.
+
+        Com uma seleção (?fields=/?expand=, ver core/field_selection.py) só
+        carrega o que vai para a resposta: colunas não pedidas ficam fora do
+        SELECT e relações devolvidas como ids são carregadas só com o id.
+        """
+        selection = selection or FieldSelection()
+        queryset = self
+        if selection.fields is not None:
+            # Colunas da ordenação/cursor sempre vêm; creator_FK também quando pedido (id ou objeto)
+            columns = [name for name in READ_COLUMNS if selection.includes(name)]
+            queryset = queryset.only(*columns, *ORDERING_COLUMNS)
+
+        if selection.loads('creator_FK'):
+            queryset = queryset.select_related('creator_FK')
+            if selection.nested('creator_FK').includes('groups'):
+                queryset = queryset.prefetch_related(ordered_groups('creator_FK__groups'))
+
+        if selection.includes('equipments_FK'):
+            equipment = selection.nested('equipments_FK')
+            if selection.expands('equipments_FK'):
+                related = [name for name in ('environment_FK', 'category_FK') if equipment.loads(name)]
+                equipments = Equipment.objects.select_related(*related).order_by('pk')
+            else:
+                equipments = Equipment.objects.only('id').order_by('pk')
+            queryset = queryset.prefetch_related(models.Prefetch('equipments_FK', queryset=equipments))
+
+        if selection.includes('responsibles_FK'):
+            queryset = queryset.prefetch_related(models.Prefetch(
+                'responsibles_FK', queryset=read_users(selection, 'responsibles_FK')))
+
+        if selection.includes('status_history'):
+            queryset = queryset.prefetch_related(models.Prefetch(
+                'TaskStatus_task_FK', queryset=read_statuses(selection.nested('status_history'))
+                if selection.expands('status_history') else TaskStatus.objects.only('id', 'task_FK'),
+            ))
+        return queryset
+
+
 class Task(models.Model):
     name = models.CharField(max_length=150)
     description = models.CharField(max_length=1000)
@@ -21,7 +144,35 @@ class Task(models.Model):
                                 null=True)
     equipments_FK = models.ManyToManyField('Equipment')
     responsibles_FK = models.ManyToManyField('CustomUser')
-    
+
+    # Cópia do status mais recente do histórico (mantida pelos sinais de TaskStatus)
+    # para filtrar e ordenar por status sem subquery.
+    current_status = models.CharField(max_length=50,
+                                      choices=STATUS.choices,
+                                      default=STATUS.OPEN,
+                                      db_index=True)
+    last_status_date = models.DateTimeField(default=timezone.now, db_index=True)
+    # Marcador de alteração usado pela sincronização incremental (/api/sync/).
+    # Mudanças no histórico e nas imagens também "tocam" a tarefa.
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Listagem padrão (-creation_date, -id): de todos e "só os meus" (visible_to)
+            models.Index(fields=['-creation_date', '-id'], name='core_task_created_idx'),
+            models.Index(fields=['creator_FK', '-creation_date', '-id'], name='core_task_creator_created_idx'),
+        ]
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+
+def touch_task_statuses(status_ids):
+    """
+    Marca como alterados os status informados e as tarefas deles, para que
+    mudanças nas imagens apareçam na sincronização incremental.
+    """
+    TaskStatus.objects.filter(pk__in=status_ids).update(updated_at=timezone.now())
+    Task.objects.filter(TaskStatus_task_FK__in=status_ids).touch()
@@ -0,0 +1,142 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .task import Task
+from .task_status import CLOSED_STATUSES, CONCLUDED_STATUSES, STATUS, TaskStatus
+
+
+def local_day(value):
+    return timezone.localtime(value).date()
+
+
+def day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+
+
+def primary_environments(task_ids):
+    """
+    Ambiente "principal" de cada tarefa: o do primeiro equipamento (menor id),
+    o mesmo critério usado na ordenação do Dashboard.
+    """
+    links = (Task.equipments_FK.through.objects
+             .filter(task_id__in=task_ids)
+             .order_by('task_id', 'equipment_id')
+             .values_list('task_id', 'equipment__environment_FK'))
+    environments = {}
+    for task_id, environment_id in links:
+        environments.setdefault(task_id, environment_id)
+    return environments
+
+
+class TaskDailyMetricQuerySet(models.QuerySet):
+    def days_for_tasks(self, task_ids):
+        """
+        Dias (no fuso local) em que as tarefas foram criadas ou mudaram de status.
+        """
+        days = Task.objects.filter(pk__in=task_ids).datetimes('creation_date', 'day')
+        days = set(days) | set(TaskStatus.objects.filter(task_FK__in=task_ids).datetimes('status_date', 'day'))
+        return {day.date() for day in days}
+
+    @transaction.atomic
+    def rebuild_days(self, days):
+        """
+        Recalcula as linhas dos dias informados lendo só os eventos desses dias.
+        """
+        for day in sorted(days):
+            rows = self.compute_day(day)
+            self.filter(day=day).delete()
+            self.bulk_create(rows)
+
+    def compute_day(self, day):
+        start, end = day_bounds(day)
+        counters = defaultdict(lambda: defaultdict(int))
+
+        created = list(Task.objects.filter(creation_date__gte=start, creation_date__lt=end)
+                       .values_list('id', 'urgency_level'))
+
+        # Histórico na ordem de (status_date, pk), a mesma de refresh_status_cache:
+        # um status retroativo entra no lugar da sua data, não no do seu id.
+        previous = TaskStatus.objects.filter(
+            models.Q(status_date__lt=models.OuterRef('status_date'))
+            | models.Q(status_date=models.OuterRef('status_date'), pk__lt=models.OuterRef('pk')),
+            task_FK=models.OuterRef('task_FK'),
+        )
+        first_open = TaskStatus.objects.filter(task_FK=models.OuterRef('task_FK'), status=STATUS.OPEN)
+        transitions = list(
+            TaskStatus.objects.filter(status_date__gte=start, status_date__lt=end)
+            .annotate(
+                previous_status=models.Subquery(previous.order_by('-status_date', '-pk').values('status')[:1]),
+                opened_at=Coalesce(
+                    models.Subquery(first_open.order_by('status_date', 'pk').values('status_date')[:1]),
+                    models.F('task_FK__creation_date'),
+                ),
+            )
+            .values_list('task_FK', 'task_FK__urgency_level', 'status', 'previous_status',
+                         'status_date', 'opened_at')
+        )
+
+        environments = primary_environments({row[0] for row in created} | {row[0] for row in transitions})
+
+        # Uma tarefa nasce aberta (sem histórico ela é tratada como OPEN)
+        for task_id, urgency in created:
+            row = counters[(urgency, environments.get(task_id))]
+            row['tasks_created'] += 1
+            row['opened'] += 1
+
+        for task_id, urgency, status, previous_status, status_date, opened_at in transitions:
+            row = counters[(urgency, environments.get(task_id))]
+            row[f'status_{status.lower()}'] += 1
+
+            was_open = previous_status not in CLOSED_STATUSES
+            is_open = status not in CLOSED_STATUSES
+            if was_open and not is_open:
+                row['closed'] += 1
+            elif is_open and not was_open:
+                row['opened'] += 1
+            if was_open and status in CONCLUDED_STATUSES:
+                row['resolved_count'] += 1
+                row['resolution_seconds'] += max(0, int((status_date - opened_at).total_seconds()))
+
+        return [
+            self.model(day=day, urgency_level=urgency, environment_FK_id=environment_id, **values)
+            for (urgency, environment_id), values in counters.items()
+        ]
+
+
+class TaskDailyMetric(models.Model):
+    """
+    Contadores diários pré-calculados dos chamados, por urgência e ambiente.
+    O backlog de um dia é a soma acumulada de (opened - closed) até ele.
+    """
+    day = models.DateField(db_index=True)
+    urgency_level = models.CharField(max_length=50)
+    environment_FK = models.ForeignKey('Environment',
+                                related_name='TaskDailyMetric_environment_FK',
+                                on_delete=models.SET_NULL,
+                                null=True)
+
+    tasks_created = models.PositiveIntegerField(default=0)
+    opened = models.PositiveIntegerField(default=0)
+    closed = models.PositiveIntegerField(default=0)
+
+    # Transições registradas no dia, uma coluna por valor de STATUS
+    status_open = models.PositiveIntegerField(default=0)
+    status_waiting_responsible = models.PositiveIntegerField(default=0)
+    status_ongoing = models.PositiveIntegerField(default=0)
+    status_done = models.PositiveIntegerField(default=0)
+    status_finished = models.PositiveIntegerField(default=0)
+    status_cancelled = models.PositiveIntegerField(default=0)
+
+    # Tempo entre OPEN e DONE/FINISHED (média = resolution_seconds / resolved_count)
+    resolved_count = models.PositiveIntegerField(default=0)
+    resolution_seconds = models.PositiveBigIntegerField(default=0)
+
+    objects = TaskDailyMetricQuerySet.as_manager()
+
+    def __str__(self):
+        return f'{self.day} {self.urgency_level}'
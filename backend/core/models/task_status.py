@@ -10,6 +10,10 @@ class STATUS(models.TextChoices):
     CANCELLED = 'CANCELLED'
 
 
+# Status que encerram um chamado (mesma regra usada pelo frontend)
+CONCLUDED_STATUSES = (STATUS.DONE, STATUS.FINISHED)
+CLOSED_STATUSES = CONCLUDED_STATUSES + (STATUS.CANCELLED,)
+
 class TaskStatus(models.Model):
     status = models.CharField(max_length=50, 
                               choices=STATUS.choices,
@@ -23,13 +27,25 @@ class TaskStatus(models.Model):
                                 related_name='TaskStatus_user_FK',
                                 on_delete=models.SET_NULL,
                                 null=True)
-    
+    # Marcador de alteração usado pela sincronização incremental (/api/sync/)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Histórico de um chamado em ordem e o status mais recente (refresh_status_cache)
+            models.Index(fields=['task_FK', 'status_date', 'id'], name='core_status_task_date_idx'),
+        ]
+
     def __str__(self):
         return self.status
     
 
 class TaskStatusImage(models.Model):
     image = models.FileField(upload_to="task_images")
+    # Variantes geradas em background pelo job 'task_status_image' (core/jobs.py)
+    thumbnail = models.FileField(upload_to="task_images/thumbnails", null=True, blank=True)
+    medium = models.FileField(upload_to="task_images/medium", null=True, blank=True)
+    processed = models.BooleanField(default=False)
     task_status_FK = models.ForeignKey('TaskStatus', 
                                 related_name='TaskStatusImage_task_status_FK',
                                 on_delete=models.CASCADE)
@@ -0,0 +1,110 @@
+"""
+Geração automática de notificações a partir dos eventos dos chamados.
+
+Para cada lote de eventos (status novos, responsáveis designados) os
+destinatários são calculados de uma vez e as notificações gravadas com um
+único bulk_create. Rajadas de eventos no mesmo chamado são agrupadas: se o
+usuário ainda tem uma notificação não lida desse chamado criada dentro de
+NOTIFICATIONS['COALESCE_SECONDS'], ela é atualizada em vez de criar outra.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import events
+from .models import Notification, Task
+
+DEFAULT_SETTINGS = {
+    'COALESCE_SECONDS': 60,
+}
+
+
+def notification_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'NOTIFICATIONS', {})}
+
+
+def task_responsibles(task_ids):
+    responsibles = {task_id: set() for task_id in task_ids}
+    through = Task.responsibles_FK.through
+    for task_id, user_id in through.objects.filter(task_id__in=task_ids).values_list('task_id', 'customuser_id'):
+        responsibles[task_id].add(user_id)
+    return responsibles
+
+
+def task_recipients(task_ids):
+    """
+    {task_id: {criador e responsáveis}} em duas queries para o lote todo.
+    """
+    recipients = task_responsibles(task_ids)
+    for task_id, creator_id in Task.objects.filter(pk__in=task_ids).values_list('pk', 'creator_FK'):
+        if creator_id:
+            recipients[task_id].add(creator_id)
+    return recipients
+
+
+def notify_task_statuses(statuses):
+    """
+    Avisa criador e responsáveis sobre status novos (menos quem fez a mudança).
+    """
+    statuses = list(statuses)
+    recipients = task_recipients({status.task_FK_id for status in statuses})
+    messages = {}
+    for status in statuses:
+        text = f'Chamado "{status.task_FK.name}": status alterado para {status.get_status_display()}.'
+        for user_id in recipients[status.task_FK_id] - {status.user_FK_id}:
+            # Vários status do mesmo chamado no lote: vale o último
+            messages[(status.task_FK_id, user_id)] = text
+    return deliver(messages)
+
+
+def notify_responsibles_added(assignments):
+    """
+    assignments: {task_id: ids dos usuários designados}. O criador não é avisado.
+    """
+    tasks = Task.objects.filter(pk__in=assignments).only('pk', 'name', 'creator_FK')
+    messages = {}
+    for task in tasks:
+        for user_id in set(assignments[task.pk]) - {task.creator_FK_id}:
+            messages[(task.pk, user_id)] = f'Você foi designado como responsável pelo chamado "{task.name}".'
+    return deliver(messages)
+
+
+def deliver(messages):
+    """
+    Grava {(task_id, user_id): texto}: atualiza as não lidas recentes do mesmo
+    chamado e cria o resto num único bulk_create.
+    """
+    if not messages:
+        return []
+    now = timezone.now()
+    window_start = now - timedelta(seconds=notification_settings()['COALESCE_SECONDS'])
+
+    recent = {}
+    for notification in Notification.objects.filter(
+            task_FK__in={task_id for task_id, _ in messages},
+            user_FK__in={user_id for _, user_id in messages},
+            notification_read=False,
+            creation_date__gte=window_start).order_by('pk'):
+        recent[(notification.task_FK_id, notification.user_FK_id)] = notification
+
+    coalesced, created = [], []
+    for (task_id, user_id), text in messages.items():
+        notification = recent.get((task_id, user_id))
+        if notification:
+            notification.text = text
+            notification.updated_at = now
+            coalesced.append(notification)
+        else:
+            created.append(Notification(task_FK_id=task_id, user_FK_id=user_id, text=text))
+
+    if coalesced:
+        Notification.objects.bulk_update(coalesced, ['text', 'updated_at'])
+    created = Notification.objects.bulk_create(created)
+
+    # bulk_create não dispara post_save: publica no SSE aqui, depois do commit
+    if created:
+        transaction.on_commit(lambda: events.broker.publish(
+            [events.notification_event(notification) for notification in created]))
+    return created + coalesced
@@ -0,0 +1,14 @@
+from rest_framework.pagination import CursorPagination
+
+
+class TaskCursorPagination(CursorPagination):
+    """
+    Paginação por cursor (keyset) ordenada por data de criação e id.
+
+    Sempre ativa: GET /api/task/ devolve no máximo page_size tarefas e o
+    link `next`. Quem precisa de todas segue `next` (ou usa /api/sync/).
+    """
+    ordering = ('-creation_date', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
@@ -0,0 +1,12 @@
+from rest_framework import permissions
+
+
+class IsTechnicianOrSuperuser(permissions.BasePermission):
+    """
+    Libera apenas quem enxerga todos os chamados (Superusuário ou Técnico).
+    """
+    message = 'Apenas técnicos podem acessar este recurso.'
+
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated and (user.is_superuser or user.is_technician))
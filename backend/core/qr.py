@@ -0,0 +1,158 @@
+"""
+Renderização e cache de QR codes em PNG.
+
+A imagem depende só do texto codificado e das opções de renderização, então
+o cache é endereçado pelo conteúdo (sha256 de texto + opções): um LRU em
+memória por processo na frente de um cache em disco (MEDIA_ROOT/QR_CODE['CACHE_DIR']).
+
+Este módulo não importa models de propósito: as funções de renderização rodam
+também nos processos filhos do ProcessPoolExecutor usado nos lotes.
+"""
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import qrcode
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from qrcode import constants
+
+ERROR_CORRECTION_LEVELS = {
+    'L': constants.ERROR_CORRECT_L,
+    'M': constants.ERROR_CORRECT_M,
+    'Q': constants.ERROR_CORRECT_Q,
+    'H': constants.ERROR_CORRECT_H,
+}
+
+DEFAULT_SETTINGS = {
+    'BOX_SIZE': 10,
+    'BORDER': 4,
+    'ERROR_CORRECTION': 'M',
+    'MEMORY_CACHE_SIZE': 256,
+    'CACHE_DIR': 'qr_cache',
+    'MAX_AGE': 60 * 60 * 24,
+}
+
+# Abaixo disso não compensa subir processos filhos
+PARALLEL_THRESHOLD = 16
+
+
+def qr_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'QR_CODE', {})}
+
+
+def qr_options(box_size=None, border=None, error_correction=None):
+    """
+    Completa as opções de renderização com os padrões de settings.QR_CODE.
+    """
+    config = qr_settings()
+    return {
+        'box_size': box_size or config['BOX_SIZE'],
+        'border': config['BORDER'] if border is None else border,
+        'error_correction': error_correction or config['ERROR_CORRECTION'],
+    }
+
+
+def qr_cache_key(data, options):
+    raw = f"{data}|{options['box_size']}|{options['border']}|{options['error_correction']}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def render_qr_png(data, box_size=10, border=4, error_correction='M'):
+    qr = qrcode.QRCode(
+        error_correction=ERROR_CORRECTION_LEVELS[error_correction],
+        box_size=box_size,
+        border=border,
+    )
+    qr.add_data(data)
+    buf = io.BytesIO()
+    qr.make_image().save(buf, format='PNG')
+    return buf.getvalue()
+
+
+def _render_with_options(args):
+    data, options = args
+    return render_qr_png(data, **options)
+
+
+def render_qr_many(values, workers=None, **options):
+    """
+    Renderiza vários QR codes, em paralelo num pool de processos quando o lote é grande.
+    Devolve os PNGs na mesma ordem de `values`.
+    """
+    values = list(values)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(values) < PARALLEL_THRESHOLD:
+        return [render_qr_png(value, **options) for value in values]
+
+    chunksize = max(1, len(values) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_render_with_options, [(value, options) for value in values],
+                                 chunksize=chunksize))
+
+
+class QRCodeCache:
+    """
+    Cache de PNGs de QR: LRU em memória + arquivos em disco nomeados pelo hash.
+    """
+
+    def __init__(self):
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def path(self, key):
+        return f"{qr_settings()['CACHE_DIR']}/{key[:2]}/{key}.png"
+
+    def remember(self, key, png):
+        with self._lock:
+            self._items[key] = png
+            self._items.move_to_end(key)
+            while len(self._items) > qr_settings()['MEMORY_CACHE_SIZE']:
+                self._items.popitem(last=False)
+
+    def store(self, key, png):
+        path = self.path(key)
+        if not default_storage.exists(path):
+            default_storage.save(path, ContentFile(png))
+        self.remember(key, png)
+
+    def get(self, data, options):
+        """
+        Devolve (chave, png) para o texto, renderizando só se não estiver em cache.
+        """
+        key = qr_cache_key(data, options)
+        with self._lock:
+            png = self._items.get(key)
+            if png is not None:
+                self._items.move_to_end(key)
+                return key, png
+
+        path = self.path(key)
+        if default_storage.exists(path):
+            with default_storage.open(path, 'rb') as file:
+                png = file.read()
+            self.remember(key, png)
+        else:
+            png = render_qr_png(data, **options)
+            self.store(key, png)
+        return key, png
+
+    def warm(self, values, options, workers=None):
+        """
+        Pré-gera no disco os QR codes que ainda faltam, renderizando o lote em paralelo.
+        """
+        missing = [value for value in values if not default_storage.exists(self.path(qr_cache_key(value, options)))]
+        for value, png in zip(missing, render_qr_many(missing, workers, **options)):
+            self.store(qr_cache_key(value, options), png)
+        return len(missing)
+
+    def clear_memory(self):
+        with self._lock:
+            self._items.clear()
+
+
+qr_cache = QRCodeCache()
@@ -0,0 +1,111 @@
+"""
+Catálogo das queries mais frequentes da aplicação e auditoria dos planos de
+execução (EXPLAIN QUERY PLAN do SQLite), usado pelo comando audit_queries.
+
+Cada entrada monta o queryset com o mesmo formato usado pelas views, sinais e
+jobs; os valores vêm de linhas existentes quando há alguma, mas o plano não
+depende deles. Uma linha "SCAN <tabela>" sem índice é uma leitura da tabela
+inteira e é apontada como problema. "USE TEMP B-TREE" (ordenação sem índice)
+aparece como aviso.
+"""
+import re
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.db import connection
+from django.utils import timezone
+
+from .models import (BackgroundJob, CustomUser, Equipment, Notification, SyncTombstone, Task, TaskDailyMetric,
+                     TaskStatus)
+from .models.background_job import JOB_STATUS
+from .models.task_status import CLOSED_STATUSES, STATUS
+
+FULL_SCAN = re.compile(r'^SCAN (?!.*\bUSING\b)(\S+)')
+TEMP_SORT = re.compile(r'USE TEMP B-TREE')
+
+
+def sample_ids():
+    """
+    Ids de exemplo para montar as queries (0 com o banco vazio).
+    """
+    first = lambda model: model.objects.order_by('pk').values_list('pk', flat=True).first() or 0
+    return {
+        'user': first(CustomUser),
+        'task': first(Task),
+        'equipment': first(Equipment),
+        'code': Equipment.objects.order_by('pk').values_list('code', flat=True).first() or 'EQ-1',
+    }
+
+
+def catalogue():
+    """
+    {nome: queryset} das queries auditadas.
+    """
+    ids = sample_ids()
+    since = timezone.now() - timedelta(days=1)
+    responsibles = Task.responsibles_FK.through
+    return {
+        # Listagens de chamados (TaskView): técnicos veem tudo, colaboradores só os seus
+        'task_list_all': Task.objects.order_by('-creation_date', '-id')[:50],
+        'task_list_own': Task.objects.filter(creator_FK=ids['user']).order_by('-creation_date', '-id')[:50],
+        'task_list_by_status': Task.objects.filter(current_status__in=[STATUS.OPEN]).order_by('-creation_date', '-id')[:50],
+        # Histórico (prefetch de for_read) e status mais recente (refresh_status_cache)
+        'task_history': TaskStatus.objects.filter(task_FK__in=[ids['task']]).order_by('status_date', 'id'),
+        'task_latest_status': TaskStatus.objects.filter(task_FK=ids['task']).order_by('-status_date', '-id')[:1],
+        'task_responsibles': responsibles.objects.filter(task_id__in=[ids['task']]),
+        # Notificações: contagem de não lidas e agrupamento (core/notifications.py)
+        'notification_unread': Notification.objects.filter(user_FK=ids['user'], notification_read=False),
+        'notification_recent': Notification.objects.filter(
+            task_FK__in=[ids['task']], user_FK__in=[ids['user']], notification_read=False,
+            creation_date__gte=since),
+        # Leitura do QR code (EquipmentView.scan)
+        'equipment_by_code': Equipment.objects.filter(code=ids['code']),
+        'equipment_open_tasks': Task.objects.filter(
+            pk__in=Task.equipments_FK.through.objects.filter(equipment_id=ids['equipment']).values('task_id'),
+        ).exclude(current_status__in=CLOSED_STATUSES).order_by('-last_status_date', '-id'),
+        # Sincronização incremental (/api/sync/)
+        'sync_tasks': Task.objects.filter(updated_at__gt=since),
+        'sync_task_statuses': TaskStatus.objects.filter(updated_at__gt=since),
+        'sync_tombstones': SyncTombstone.objects.filter(deleted_at__gte=since).order_by('deleted_at', 'pk'),
+        # Fila de jobs (core/jobs.py) e relatórios
+        'job_claim': BackgroundJob.objects.filter(kind='equipment_qr', status=JOB_STATUS.PENDING).order_by('id')[:50],
+        'metrics_range': TaskDailyMetric.objects.filter(day__gte=since.date(), day__lte=timezone.localdate()),
+    }
+
+
+@dataclass
+class PlanReport:
+    name: str
+    plan: list
+    full_scans: list = field(default_factory=list)
+    temp_sorts: int = 0
+
+
+def explain(queryset):
+    """
+    Linhas (texto) do EXPLAIN QUERY PLAN do queryset.
+    """
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def audit(names=None):
+    if connection.vendor != 'sqlite':
+        raise NotImplementedError('A auditoria lê o formato do EXPLAIN QUERY PLAN do SQLite.')
+
+    reports = []
+    for name, queryset in catalogue().items():
+        if names and name not in names:
+            continue
+        plan = explain(queryset)
+        report = PlanReport(name, plan)
+        for line in plan:
+            match = FULL_SCAN.match(line)
+            if match:
+                report.full_scans.append(match.group(1))
+            if TEMP_SORT.search(line):
+                report.temp_sorts += 1
+        reports.append(report)
+    return reports
@@ -0,0 +1,37 @@
+"""
+Renderer JSON das listagens do caminho rápido (ver core/fast_read.py).
+
+Usa o orjson quando instalado e produz os mesmos bytes do JSONRenderer do
+DRF na configuração do projeto (UTF-8, compacto, U+2028/U+2029 escapados).
+Tipos que o orjson não serializa igual ao DRF (datas, Decimal, dataclasses...)
+passam pelo encoder do DRF. Floats podem sair formatados de outro jeito
+(ex.: 1e16), por isso o renderer só é usado em views sem campos float.
+Sem o orjson, ou com indentação/ensure_ascii, cai no JSONRenderer.
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+LINE_SEPARATORS = (('\u2028'.encode(), b'\\u2028'), ('\u2029'.encode(), b'\\u2029'))
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None or orjson is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default,
+                               option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS)
+        except TypeError:
+            # Chaves não-str, inteiros grandes demais etc.: o json da stdlib resolve
+            return super().render(data, accepted_media_type, renderer_context)
+
+        for character, escaped in LINE_SEPARATORS:
+            ret = ret.replace(character, escaped)
+        return ret
@@ -0,0 +1,92 @@
+"""
+Cache de respostas para dados de referência (categorias, ambientes,
+equipamentos e usuários), que são muito mais lidos do que escritos.
+
+Cada model tem uma "versão" guardada no próprio cache: o instante (em ns) da
+última alteração, atualizado pelos sinais de save/delete (ver signals.py)
+e de novo no commit da transação.
+A chave de uma resposta inclui as versões de todos os models que ela usa,
+então uma alteração invalida exatamente as respostas que dependem dele, sem
+precisar apagar chaves. O backend é o alias RESPONSE_CACHE['ALIAS'] de
+settings.CACHES (memória local ou arquivo; nenhum serviço externo).
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+DEFAULT_SETTINGS = {
+    'ENABLED': True,
+    'ALIAS': 'responses',
+}
+
+# Nomes das views com cache, para o relatório de acertos (comando response_cache)
+CACHED_VIEWS = set()
+
+
+def response_cache_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'RESPONSE_CACHE', {})}
+
+
+def get_cache():
+    return caches[response_cache_settings()['ALIAS']]
+
+
+def version_key(model):
+    return f'version:{model._meta.label_lower}'
+
+
+def model_versions(models):
+    """
+    Versões atuais dos models. Um model sem versão no cache (cache novo ou
+    chave descartada) recebe o instante atual, o que invalida o que havia antes.
+    """
+    cache = get_cache()
+    keys = [version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump(*models):
+    """
+    Muda a versão dos models agora e de novo no commit: um GET concorrente
+    que leu as linhas antigas entre a escrita e o commit guarda a resposta
+    com a versão de agora, e o segundo bump a invalida.
+    """
+    set_versions(models)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: set_versions(models))
+
+
+def set_versions(models):
+    get_cache().set_many({version_key(model): time.time_ns() for model in models}, timeout=None)
+
+
+def record(view_name, hit):
+    cache = get_cache()
+    key = f"stats:{view_name}:{'hits' if hit else 'misses'}"
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # A chave expirou entre o add e o incr
+        cache.set(key, 1, timeout=None)
+
+
+def stats():
+    cache = get_cache()
+    result = {}
+    for name in sorted(CACHED_VIEWS):
+        hits = cache.get(f'stats:{name}:hits', 0)
+        misses = cache.get(f'stats:{name}:misses', 0)
+        result[name] = {'hits': hits, 'misses': misses}
+    return result
+
+
+def reset_stats():
+    get_cache().delete_many([f'stats:{name}:{kind}' for name in CACHED_VIEWS for kind in ('hits', 'misses')])
@@ -0,0 +1,86 @@
+"""
+Novas tentativas para escritas que falham por disputa do lock do SQLite.
+
+Com WAL e busy_timeout (ver config/database.py) o escritor já espera o lock;
+"database is locked" ainda aparece quando a espera passa do busy_timeout
+sob muita concorrência. Nesses casos a operação inteira é repetida com
+espera exponencial e jitter (DATABASE_RETRY).
+
+Só faz sentido repetir uma transação completa: dentro de um atomic() externo
+a transação já está comprometida, então a função roda uma única vez e o
+erro sobe para quem abriu a transação.
+"""
+import functools
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'ATTEMPTS': 5,
+    'BASE_DELAY': 0.05,
+    'MAX_DELAY': 1.0,
+}
+
+LOCK_MESSAGES = ('database is locked', 'database table is locked', 'database schema is locked')
+
+
+def retry_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'DATABASE_RETRY', {})}
+
+
+def is_lock_error(exc):
+    message = str(exc).lower()
+    return any(text in message for text in LOCK_MESSAGES)
+
+
+def backoff_delays(attempts, base_delay, max_delay):
+    """
+    Esperas entre as tentativas: base, 2*base, 4*base... (até max_delay), com jitter.
+    """
+    for attempt in range(attempts - 1):
+        delay = min(max_delay, base_delay * 2 ** attempt)
+        yield delay / 2 + random.uniform(0, delay / 2)
+
+
+def call_with_retry(func, *args, attempts=None, base_delay=None, max_delay=None,
+                    lock_errors=(OperationalError,), **kwargs):
+    """
+    Chama func(*args, **kwargs), repetindo enquanto falhar com erro de lock.
+    """
+    config = retry_settings()
+    delays = backoff_delays(attempts or config['ATTEMPTS'], base_delay or config['BASE_DELAY'],
+                            max_delay or config['MAX_DELAY'])
+    while True:
+        try:
+            return func(*args, **kwargs)
+        except lock_errors as exc:
+            delay = next(delays, None)
+            if delay is None or not is_lock_error(exc):
+                raise
+            logger.warning('Banco ocupado em %s; nova tentativa em %.2fs.', func.__qualname__, delay)
+            time.sleep(delay)
+
+
+def retry_on_lock(func=None, *, using=DEFAULT_DB_ALIAS, **options):
+    """
+    Decorator de call_with_retry para funções que abrem a própria transação:
+
+        @retry_on_lock
+        def claim(...):
+            with transaction.atomic():
+                ...
+    """
+    if func is None:
+        return functools.partial(retry_on_lock, using=using, **options)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if connections[using].in_atomic_block:
+            return func(*args, **kwargs)
+        return call_with_retry(func, *args, **options, **kwargs)
+    return wrapper
@@ -0,0 +1,74 @@
+"""
+Busca textual sobre chamados, comentários de status e equipamentos usando os
+índices FTS5 do SQLite (criados e mantidos por triggers na migração
+0012_search_index).
+
+O texto digitado vira uma expressão FTS com cada palavra como prefixo
+("bomba agua" -> "bomba"* "agua"*), então a busca funciona enquanto o
+usuário digita e ignora acentos. Os resultados vêm ordenados por bm25
+(menor = mais relevante), com o nome pesando mais que a descrição.
+"""
+import re
+
+from .models import Equipment, Task, TaskStatus
+
+TERM = re.compile(r'\w+')
+MAX_TERMS = 8
+SEARCH_TYPES = ('task', 'task_status', 'equipment')
+
+
+def match_expression(text):
+    """
+    Expressão MATCH segura: só palavras, entre aspas (sem operadores do FTS).
+    """
+    terms = TERM.findall(text)[:MAX_TERMS]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def fts_query(queryset, expression, weights, columns):
+    """
+    Junta o queryset ao índice <tabela>_fts e anota rank e trecho encontrado.
+    """
+    table = queryset.model._meta.db_table
+    fts = f'{table}_fts'
+    return queryset.extra(
+        tables=[fts],
+        where=[f'{fts}.rowid = {table}.id', f'{fts} MATCH %s'],
+        params=[expression],
+        select={
+            'rank': f"bm25({fts}, {', '.join(map(str, weights))})",
+            'snippet': f"snippet({fts}, -1, '', '', '…', 12)",
+        },
+        order_by=['rank'],
+    ).values('rank', 'snippet', *columns)
+
+
+def search(user, text, limit=20, types=SEARCH_TYPES):
+    """
+    Resultados visíveis ao usuário, já mesclados e ordenados por relevância.
+    """
+    expression = match_expression(text)
+    if not expression:
+        return []
+
+    visible_tasks = Task.objects.visible_to(user)
+    results = []
+    if 'task' in types:
+        for row in fts_query(visible_tasks, expression, (10.0, 1.0), ['id', 'name'])[:limit]:
+            results.append({'type': 'task', 'id': row['id'], 'task_FK': row['id'], 'title': row['name'],
+                            'snippet': row['snippet'], 'rank': row['rank']})
+
+    if 'task_status' in types:
+        statuses = TaskStatus.objects.filter(task_FK__in=visible_tasks.values('pk'))
+        for row in fts_query(statuses, expression, (1.0,), ['id', 'task_FK', 'task_FK__name'])[:limit]:
+            results.append({'type': 'task_status', 'id': row['id'], 'task_FK': row['task_FK'],
+                            'title': row['task_FK__name'], 'snippet': row['snippet'], 'rank': row['rank']})
+
+    if 'equipment' in types and user.has_perm('core.view_equipment'):
+        for row in fts_query(Equipment.objects.all(), expression, (10.0, 10.0, 1.0), ['id', 'name', 'code'])[:limit]:
+            results.append({'type': 'equipment', 'id': row['id'], 'task_FK': None,
+                            'title': f"{row['name']} ({row['code']})", 'snippet': row['snippet'],
+                            'rank': row['rank']})
+
+    results.sort(key=lambda result: result['rank'])
+    return results[:limit]
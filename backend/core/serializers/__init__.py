@@ -5,9 +5,13 @@ from .task import *
 from .task_status import *
 from .custom_user import *
 from .notification import *
+from .report import *
+from .sync import *
+from .search import *
 
 __all__ = [
-    'CategorySerializer', 'EnvironmentSerializer', 'EquipmentSerializer', 
+    'CategorySerializer', 'EnvironmentSerializer', 'EquipmentSerializer', 'EquipmentScanSerializer',
     'TaskReadSerializer', 'TaskWriteSerializer', 'TaskStatusSerializer', 'TaskStatusImageSerializer', 
-    'CustomUserSerializer', 'NotificationSerializer'
+    'CustomUserSerializer', 'NotificationSerializer', 'ReportFiltersSerializer',
+    'SyncParamsSerializer', 'SearchParamsSerializer'
 ]
\ No newline at end of file
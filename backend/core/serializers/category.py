@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from .sparse import SparseFieldsMixin
 from ..models import Category
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ['id', 'name']
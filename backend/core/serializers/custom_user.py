@@ -1,10 +1,11 @@
 from rest_framework import serializers
+from .sparse import SparseFieldsMixin
 from djoser.serializers import UserSerializer as BaseUserSerializer
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
-class CustomUserSerializer(BaseUserSerializer):
+class CustomUserSerializer(SparseFieldsMixin, BaseUserSerializer):
     # Essa linha mágica converte IDs [1] em Nomes ["Técnico"]
     groups = serializers.SlugRelatedField(
         many=True,
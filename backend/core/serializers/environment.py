@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from .sparse import SparseFieldsMixin
 from ..models import Environment
 
-class EnvironmentSerializer(serializers.ModelSerializer):
+class EnvironmentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Environment
         fields = ['id', 'name']
@@ -1,15 +1,58 @@
+from django.urls import reverse
 from rest_framework import serializers
+from .sparse import SparseFieldsMixin
 from ..models import Equipment
 from .category import CategorySerializer
 from .environment import EnvironmentSerializer
 
-class EquipmentSerializer(serializers.ModelSerializer):
+class EquipmentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     # Definimos os campos de relação para usar os serializers aninhados
     environment_FK = EnvironmentSerializer(read_only=True)
     category_FK = CategorySerializer(read_only=True)
-    qr_code_image = serializers.ImageField(read_only=True)
+    # URL do QR renderizado sob demanda (ver EquipmentView.qr)
+    qr_code_image = serializers.SerializerMethodField()
 
     class Meta:
         model = Equipment
         # Listamos os campos explicitamente para incluir os campos aninhados
-        fields = ['id', 'name', 'code', 'description', 'environment_FK', 'category_FK','qr_code_image',]
\ No newline at end of file
+        fields = ['id', 'name', 'code', 'description', 'environment_FK', 'category_FK','qr_code_image',]
+
+    def get_qr_code_image(self, obj):
+        url = reverse('equipment-qr', kwargs={'pk': obj.pk})
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+    def compile_qr_code_image(self):
+        """
+        get_qr_code_image para o caminho rápido (core/fast_read.py): a rota é
+        resolvida uma vez e só o id muda por linha.
+        """
+        marker = 987654321
+        template = reverse('equipment-qr', kwargs={'pk': marker}).replace(str(marker), '{}')
+        return ['pk'], lambda row, context: context['absolute'](template.format(row['pk']))
+
+
+class ScanTaskSerializer(serializers.Serializer):
+    """
+    Chamado em aberto no retorno da leitura do QR (só o necessário no celular).
+    """
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    urgency_level = serializers.CharField()
+    status = serializers.CharField(source='current_status')
+    status_date = serializers.DateTimeField(source='last_status_date')
+
+
+class EquipmentScanSerializer(serializers.ModelSerializer):
+    """
+    Resposta de /api/equipment/scan/<pk ou código>/: o equipamento, ambiente,
+    categoria e os chamados em aberto (Prefetch em obj.open_tasks) numa só chamada.
+    """
+    environment_FK = EnvironmentSerializer(read_only=True)
+    category_FK = CategorySerializer(read_only=True)
+    open_tasks = ScanTaskSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Equipment
+        fields = ['id', 'name', 'code', 'description', 'environment_FK', 'category_FK', 'open_tasks']
+
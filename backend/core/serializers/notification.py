@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from .sparse import SparseFieldsMixin
 from ..models import *
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Notification
         fields = '__all__'
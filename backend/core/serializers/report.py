@@ -0,0 +1,25 @@
+from rest_framework import serializers
+
+
+class ReportFiltersSerializer(serializers.Serializer):
+    """
+    Valida os parâmetros de query dos relatórios (?start=&end=&environment=&category=&breakdown=).
+    """
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    environment = serializers.IntegerField(required=False)
+    category = serializers.IntegerField(required=False)
+    breakdown = serializers.MultipleChoiceField(choices=['environment', 'category'], required=False)
+
+    def to_internal_value(self, data):
+        # "breakdown=environment,category" chega como uma string só
+        if hasattr(data, 'getlist'):
+            data = {key: data.get(key) for key in data}
+            if data.get('breakdown'):
+                data['breakdown'] = data['breakdown'].split(',')
+        return super().to_internal_value(data)
+
+    def validate(self, attrs):
+        if attrs.get('start') and attrs.get('end') and attrs['start'] > attrs['end']:
+            raise serializers.ValidationError({'end': 'A data final deve ser posterior à inicial.'})
+        return attrs
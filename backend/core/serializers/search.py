@@ -0,0 +1,20 @@
+from rest_framework import serializers
+
+from ..search import SEARCH_TYPES
+
+
+class SearchParamsSerializer(serializers.Serializer):
+    """
+    Valida os parâmetros de /api/search/ (?q=&limit=&type=task,task_status,equipment).
+    """
+    q = serializers.CharField(max_length=200)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+    type = serializers.MultipleChoiceField(choices=SEARCH_TYPES, required=False)
+
+    def to_internal_value(self, data):
+        # "type=task,equipment" chega como uma string só
+        if hasattr(data, 'getlist'):
+            data = {key: data.get(key) for key in data}
+            if data.get('type'):
+                data['type'] = data['type'].split(',')
+        return super().to_internal_value(data)
@@ -0,0 +1,43 @@
+from rest_framework import serializers
+
+from ..field_selection import FieldSelection
+
+
+class SparseFieldsMixin:
+    """
+    Aplica ?fields= e ?expand= (ver core/field_selection.py) aos campos do
+    serializer. O serializer raiz lê os parâmetros do request; os aninhados
+    recebem do pai a parte da seleção que lhes cabe. Relações não embutidas
+    viram PrimaryKeyRelatedField com a mesma origem.
+    """
+
+    def field_selection(self):
+        selection = getattr(self, '_field_selection', None)
+        if selection is not None:
+            return selection
+        parent = getattr(self, 'parent', None)
+        if isinstance(parent, serializers.ListSerializer):
+            parent = getattr(parent, 'parent', None)
+        # Aninhado sem seleção do pai: saída completa
+        return FieldSelection.from_request(self.context.get('request')) if parent is None else FieldSelection()
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selection = self.field_selection()
+        if selection.is_default:
+            return fields
+
+        selected = {}
+        for name, field in fields.items():
+            # Campos só de escrita não aparecem na resposta: ficam como estão
+            if not field.write_only and not selection.includes(name):
+                continue
+            nested = field.child if isinstance(field, serializers.ListSerializer) else field
+            if isinstance(nested, serializers.BaseSerializer):
+                if selection.expands(name):
+                    nested._field_selection = selection.nested(name)
+                else:
+                    field = serializers.PrimaryKeyRelatedField(
+                        read_only=True, many=nested is not field, source=field.source)
+            selected[name] = field
+        return selected
@@ -0,0 +1,11 @@
+from rest_framework import serializers
+
+
+class SyncParamsSerializer(serializers.Serializer):
+    """
+    Valida o cursor de /api/sync/ (?cursor=), devolvido pela chamada anterior,
+    e ?snapshot=false (no reset, só o cursor: o cliente carrega as tarefas
+    pelas páginas de /api/task/).
+    """
+    cursor = serializers.DateTimeField(required=False)
+    snapshot = serializers.BooleanField(required=False, default=True)
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from .sparse import SparseFieldsMixin
 from ..models import Task
 
 # Importação dos serializers que a versão de LEITURA irá usar
@@ -30,7 +31,7 @@ class TaskWriteSerializer(serializers.ModelSerializer):
         ]
 
 # Serializer de Leitura MODIFICADO
-class TaskReadSerializer(serializers.ModelSerializer):
+class TaskReadSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     creator_FK = CustomUserSerializer(read_only=True, allow_null=True)
     equipments_FK = EquipmentSerializer(many=True, read_only=True)
     responsibles_FK = CustomUserSerializer(many=True, read_only=True)
@@ -39,6 +40,8 @@ class TaskReadSerializer(serializers.ModelSerializer):
         read_only=True, 
         source='TaskStatus_task_FK' # Usa o related_name do ForeignKey
     ) 
+    # Ordem das listas aninhadas que não é por id (a mesma do prefetch em TaskQuerySet.for_read)
+    nested_ordering = {'status_history': ('status_date', 'id')}
 
     class Meta:
         model = Task
@@ -49,6 +52,8 @@ class TaskReadSerializer(serializers.ModelSerializer):
             'suggested_date', 
             'urgency_level', 
             'creation_date', 
+            'current_status',
+            'last_status_date',
             'creator_FK', 
             'equipments_FK', 
             'responsibles_FK',
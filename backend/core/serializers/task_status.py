@@ -1,13 +1,23 @@
 from rest_framework import serializers
+from .sparse import SparseFieldsMixin
 from ..models import TaskStatus, TaskStatusImage, CustomUser # Make sure CustomUser is imported
 from .custom_user import CustomUserSerializer
+from ..images import image_settings
 
-class TaskStatusImageSerializer(serializers.ModelSerializer):
+class TaskStatusImageSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = TaskStatusImage
-        fields = ['id', 'image', 'task_status_FK']
+        fields = ['id', 'image', 'thumbnail', 'medium', 'task_status_FK']
+        # Variantes preenchidas pelo processamento em background
+        read_only_fields = ['thumbnail', 'medium']
 
-class TaskStatusSerializer(serializers.ModelSerializer):
+    def validate_image(self, value):
+        limit = image_settings()['MAX_UPLOAD_SIZE']
+        if value.size > limit:
+            raise serializers.ValidationError(f'O arquivo deve ter no máximo {limit // (1024 * 1024)} MB.')
+        return value
+
+class TaskStatusSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     # Campo para leitura dos dados do usuário
     user_detail = CustomUserSerializer(source='user_FK', read_only=True) 
     
@@ -22,6 +32,13 @@ class TaskStatusSerializer(serializers.ModelSerializer):
         required=False  # Permite que o campo seja opcional
     )
 
+    # Imagens enviadas junto com o status (multipart), evitando o segundo request
+    uploaded_images = serializers.ListField(
+        child=serializers.FileField(),
+        write_only=True,
+        required=False
+    )
+
     class Meta:
         model = TaskStatus
         fields = [
@@ -32,7 +49,20 @@ class TaskStatusSerializer(serializers.ModelSerializer):
             'task_FK', 
             'user_FK',     
             'user_detail',  
-            'images'
+            'images',
+            'uploaded_images'
         ]
         # Apenas alguns campos são somente leitura
-        read_only_fields = ['id', 'status_date', 'images', 'user_detail'] 
\ No newline at end of file
+        read_only_fields = ['id', 'status_date', 'images', 'user_detail']
+
+    def validate_uploaded_images(self, value):
+        for file in value:
+            TaskStatusImageSerializer().validate_image(file)
+        return value
+
+    def create(self, validated_data):
+        uploaded_images = validated_data.pop('uploaded_images', [])
+        status = super().create(validated_data)
+        for file in uploaded_images:
+            TaskStatusImage.objects.create(task_status_FK=status, image=file)
+        return status
\ No newline at end of file
@@ -1,37 +1,45 @@
-import io
-import qrcode
-from django.db.models.signals import post_save
+import threading
+from django.db import transaction
+from django.utils import timezone
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
-from django.core.files.base import ContentFile
-from django.conf import settings
-from django.urls import reverse
-from django.contrib.auth.models import Group   
-from .models import Equipment, CustomUser
+from django.contrib.auth.models import Group, Permission
+from rest_framework.authtoken.models import Token
+from . import auth_cache, events, jobs, notifications, response_cache
+from .models import (Category, Environment, Equipment, CustomUser, Notification, Task, TaskStatus,
+                     TaskStatusImage, TaskDailyMetric, SyncTombstone)
+from .models.task import touch_task_statuses
+from .models.task_metric import local_day
 
 @receiver(post_save, sender=Equipment)
 def generate_equipment_qr(sender, instance, created, **kwargs):
-    # gera no create, ou no edit se ainda não tiver QR
-    if not created and instance.qr_code_image:
-        return
+    # O QR é servido sob demanda por /api/equipment/<pk>/qr/; no create apenas
+    # pedimos ao worker (core/jobs.py) que já deixe o PNG no cache de disco.
+    if created:
+        jobs.enqueue('equipment_qr', [instance.pk])
+
+@receiver(post_save, sender=TaskStatusImage)
+def process_task_status_image(sender, instance, created, **kwargs):
+    # Miniaturas e reencode rodam no worker; o upload só grava o arquivo
+    if created:
+        jobs.enqueue('task_status_image', [instance.pk])
+    # O status e a tarefa aninham as imagens: marca os dois para o /api/sync/
+    touch_task_statuses([instance.task_status_FK_id])
+
+@receiver(post_delete, sender=TaskStatusImage)
+def touch_status_on_image_delete(sender, instance, **kwargs):
+    touch_task_statuses([instance.task_status_FK_id])
 
-    # monte a URL absoluta para o detalhe do equipamento:
-    # ex.: http://127.0.0.1:8000/api/equipment/2/
-    base = getattr(settings, "SITE_URL", "http://127.0.0.1:8000")
-    detail_path = reverse('equipment-detail', kwargs={'pk': instance.pk})
-    data = f"{base}{detail_path}"
-
-    # gera imagem PNG
-    img = qrcode.make(data)
-    buf = io.BytesIO()
-    img.save(buf, format='PNG')
-    buf.seek(0)
-
-    instance.qr_code_image.save(
-        f"equipment_{instance.id}.png",
-        ContentFile(buf.read()),
-        save=False
-    )
-    instance.save(update_fields=['qr_code_image'])
+@receiver(m2m_changed, sender=CustomUser.groups.through)
+def touch_user_on_group_change(sender, instance, action, reverse, pk_set, **kwargs):
+    # Os grupos aparecem no CustomUserSerializer; marca o usuário como alterado
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    user_ids = pk_set if reverse else [instance.pk]
+    if reverse and action == 'post_clear':
+        user_ids = None
+    users = CustomUser.objects.all() if user_ids is None else CustomUser.objects.filter(pk__in=user_ids)
+    users.update(updated_at=timezone.now())
 
 @receiver(post_save, sender=CustomUser)
 def add_user_to_default_group(sender, instance, created, **kwargs):
@@ -44,4 +52,239 @@ def add_user_to_default_group(sender, instance, created, **kwargs):
             group = Group.objects.get(name='Colaborador(a)')
             instance.groups.add(group)
         except Group.DoesNotExist:
-            print("AVISO: O grupo 'Colaborador(a)' não existe no banco de dados.")
\ No newline at end of file
+            print("AVISO: O grupo 'Colaborador(a)' não existe no banco de dados.")
+
+
+@receiver(post_save, sender=TaskStatus)
+def update_task_current_status(sender, instance, created, **kwargs):
+    """
+    Mantém Task.current_status/last_status_date em dia sem reler o histórico:
+    um status novo só substitui o atual se for o mais recente.
+    """
+    tasks = Task.objects.filter(pk=instance.task_FK_id)
+    if created:
+        updated = tasks.filter(last_status_date__lte=instance.status_date).update(
+            current_status=instance.status, last_status_date=instance.status_date,
+            updated_at=instance.updated_at)
+        if not updated:
+            # Status retroativo: o atual não muda, mas o histórico aninhado sim
+            tasks.touch()
+    else:
+        tasks.refresh_status_cache()
+
+
+@receiver(post_delete, sender=TaskStatus)
+def rollback_task_current_status(sender, instance, **kwargs):
+    Task.objects.filter(pk=instance.task_FK_id).refresh_status_cache()
+
+
+# --- Sincronização incremental (/api/sync/) ---
+# Exclusões viram lápides, já que a linha some e não tem mais updated_at.
+SYNC_MODELS = {
+    Task: 'task',
+    TaskStatus: 'task_status',
+    Equipment: 'equipment',
+    Notification: 'notification',
+}
+
+
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=TaskStatus)
+@receiver(post_delete, sender=Equipment)
+@receiver(post_delete, sender=Notification)
+def record_sync_tombstone(sender, instance, **kwargs):
+    SyncTombstone.objects.create(model=SYNC_MODELS[sender], object_id=instance.pk, owner_id=tombstone_owner(instance))
+
+
+def tombstone_owner(instance):
+    """
+    Usuário que, além de técnicos/superusuários, recebe a lápide (ver SyncTombstone.visible_to).
+    """
+    if isinstance(instance, Task):
+        return instance.creator_FK_id
+    if isinstance(instance, TaskStatus):
+        # Na exclusão em cascata do chamado os status saem antes dele: a linha ainda existe
+        return Task.objects.filter(pk=instance.task_FK_id).values_list('creator_FK_id', flat=True).first()
+    if isinstance(instance, Notification):
+        return instance.user_FK_id
+    return None
+
+
+# --- Rollup diário (TaskDailyMetric) ---
+# Os dias afetados são acumulados por thread e recalculados uma única vez
+# depois do commit, mesmo quando vários sinais tocam o mesmo dia.
+_pending_metric_days = threading.local()
+
+
+def schedule_metric_rebuild(days):
+    pending = _pending_metric_days.__dict__.setdefault('days', set())
+    pending.update(days)
+    transaction.on_commit(flush_metric_rebuild)
+
+
+def flush_metric_rebuild():
+    days = _pending_metric_days.__dict__.pop('days', None)
+    if days:
+        TaskDailyMetric.objects.rebuild_days(days)
+
+
+@receiver(post_save, sender=Task)
+def update_metrics_on_task_save(sender, instance, created, **kwargs):
+    if created:
+        schedule_metric_rebuild({local_day(instance.creation_date)})
+
+
+@receiver(post_delete, sender=Task)
+def update_metrics_on_task_delete(sender, instance, **kwargs):
+    schedule_metric_rebuild({local_day(instance.creation_date)})
+
+
+@receiver(post_save, sender=TaskStatus)
+@receiver(post_delete, sender=TaskStatus)
+def update_metrics_on_status_change(sender, instance, **kwargs):
+    # Um status novo só afeta o próprio dia; editar/remover muda o "status
+    # anterior" dos seguintes, então refazemos todos os dias da tarefa.
+    if kwargs.get('created'):
+        schedule_metric_rebuild({local_day(instance.status_date)})
+    else:
+        days = TaskDailyMetric.objects.days_for_tasks([instance.task_FK_id])
+        schedule_metric_rebuild(days | {local_day(instance.status_date)})
+
+
+@receiver(m2m_changed, sender=Task.equipments_FK.through)
+def update_metrics_on_equipment_change(sender, instance, action, **kwargs):
+    # O ambiente da tarefa vem dos equipamentos, que são gravados após o save
+    if action in ('post_add', 'post_remove', 'post_clear') and isinstance(instance, Task):
+        schedule_metric_rebuild(TaskDailyMetric.objects.days_for_tasks([instance.pk]))
+
+
+# --- Operações em lote ---
+# bulk_create/bulk_update não disparam post_save; as views de /bulk/ chamam
+# estas funções uma vez para o lote inteiro.
+
+def tasks_bulk_saved(tasks, previous_responsibles=None):
+    task_ids = [task.pk for task in tasks]
+    schedule_metric_rebuild(TaskDailyMetric.objects.days_for_tasks(task_ids))
+
+    # Responsáveis novos (no create, todos) recebem notificação, como no m2m_changed
+    previous = previous_responsibles or {}
+    assignments = {task_id: users - previous.get(task_id, set())
+                   for task_id, users in notifications.task_responsibles(task_ids).items()}
+    notifications.notify_responsibles_added({task_id: users for task_id, users in assignments.items() if users})
+
+
+def task_statuses_bulk_saved(statuses, created=False, previous_task_ids=()):
+    task_ids = {status.task_FK_id for status in statuses} | set(previous_task_ids)
+    Task.objects.filter(pk__in=task_ids).refresh_status_cache()
+    schedule_metric_rebuild(TaskDailyMetric.objects.days_for_tasks(task_ids))
+    if created:
+        notifications.notify_task_statuses(statuses)
+        publish_task_statuses([status.pk for status in statuses])
+
+
+def equipments_bulk_created(equipments):
+    jobs.enqueue('equipment_qr', [equipment.pk for equipment in equipments])
+    response_cache.bump(Equipment)
+
+
+def equipments_bulk_updated(equipments):
+    response_cache.bump(Equipment)
+
+
+# --- Cache de respostas dos dados de referência (core/response_cache.py) ---
+# Mudar a versão do model invalida todas as respostas que dependem dele.
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Environment)
+@receiver(post_delete, sender=Environment)
+@receiver(post_save, sender=Equipment)
+@receiver(post_delete, sender=Equipment)
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_response_cache(sender, **kwargs):
+    response_cache.bump(sender)
+
+
+@receiver(m2m_changed, sender=CustomUser.groups.through)
+def invalidate_user_responses(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        response_cache.bump(CustomUser)
+
+
+# --- Cache de autenticação (core/auth_cache.py) ---
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    # Logout: o token deixa de valer na hora, não só quando a entrada expirar
+    auth_cache.forget_token(instance.key)
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def forget_changed_user(sender, instance, **kwargs):
+    auth_cache.forget_users([instance.pk])
+
+
+@receiver(m2m_changed, sender=CustomUser.groups.through)
+@receiver(m2m_changed, sender=CustomUser.user_permissions.through)
+def forget_user_authorization(sender, instance, action, reverse, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        # group.user_set / permission.user_set: pode afetar vários usuários
+        auth_cache.bump_generation()
+    else:
+        auth_cache.forget_users([instance.pk])
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=Permission)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def forget_all_authorization(sender, action=None, **kwargs):
+    if action is None or action in ('post_add', 'post_remove', 'post_clear'):
+        auth_cache.bump_generation()
+
+
+# --- Eventos em tempo real (core/events.py) ---
+# Publicados só depois do commit, para o cliente nunca receber algo que foi desfeito.
+
+def publish_task_statuses(status_ids):
+    def publish():
+        statuses = TaskStatus.objects.filter(pk__in=status_ids).select_related('task_FK').order_by('pk')
+        events.broker.publish(events.task_status_events(statuses))
+    transaction.on_commit(publish)
+
+
+@receiver(post_save, sender=TaskStatus)
+def publish_task_status(sender, instance, created, **kwargs):
+    if created:
+        publish_task_statuses([instance.pk])
+
+
+@receiver(post_save, sender=Notification)
+def publish_notification(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: events.broker.publish([events.notification_event(instance)]))
+
+
+# --- Notificações automáticas (core/notifications.py) ---
+
+@receiver(post_save, sender=TaskStatus)
+def notify_task_status(sender, instance, created, **kwargs):
+    if created:
+        notifications.notify_task_statuses([instance])
+
+
+@receiver(m2m_changed, sender=Task.responsibles_FK.through)
+def notify_responsibles(sender, instance, action, reverse, pk_set, **kwargs):
+    if action != 'post_add' or not pk_set:
+        return
+    if reverse:
+        # user.task_set.add(...): o usuário foi designado a várias tarefas
+        notifications.notify_responsibles_added({task_id: {instance.pk} for task_id in pk_set})
+    else:
+        notifications.notify_responsibles_added({instance.pk: pk_set})
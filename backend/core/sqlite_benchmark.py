@@ -0,0 +1,165 @@
+"""
+Benchmark de concorrência do SQLite (comando benchmark_sqlite).
+
+Roda a mesma carga mista de leituras e escritas, com várias threads e uma
+conexão por thread, em dois perfis sobre arquivos temporários:
+
+- default: como o Django conecta sem configuração (journal DELETE,
+  synchronous FULL, transações DEFERRED, timeout de 5 s, sem novas tentativas);
+- tuned: os PRAGMAs e o BEGIN IMMEDIATE de settings.SQLITE (ver
+  config/database.py) e as novas tentativas de core/retry.py.
+
+A escrita imita a atualização de status de um chamado: lê a tarefa, grava o
+novo status e uma linha de histórico na mesma transação. A leitura é a
+listagem das tarefas alteradas mais recentemente.
+"""
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+
+from django.conf import settings
+
+from config.database import sqlite_options, sqlite_pragmas
+
+from .retry import call_with_retry
+
+PROFILES = ('default', 'tuned')
+STATUSES = ('OPEN', 'IN_PROGRESS', 'DONE')
+
+
+@dataclass
+class BenchmarkResult:
+    profile: str
+    seconds: float
+    reads: int = 0
+    writes: int = 0
+    errors: int = 0
+    retries: int = 0
+    write_latencies: list = field(default_factory=list, repr=False)
+
+    @property
+    def operations_per_second(self):
+        return (self.reads + self.writes) / self.seconds
+
+    @property
+    def writes_per_second(self):
+        return self.writes / self.seconds
+
+    @property
+    def write_p95_ms(self):
+        if not self.write_latencies:
+            return 0.0
+        latencies = sorted(self.write_latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+
+
+def profile_config(profile):
+    """
+    (comandos de conexão, modo de transação, timeout em segundos, usa novas tentativas)
+    """
+    if profile == 'default':
+        return [], '', 5.0, False
+    options = sqlite_options(getattr(settings, 'SQLITE', None))
+    return sqlite_pragmas(options), options['TRANSACTION_MODE'], options['BUSY_TIMEOUT'] / 1000, True
+
+
+def connect(path, profile):
+    commands, _, timeout, _ = profile_config(profile)
+    connection = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+    for command in commands:
+        connection.execute(command)
+    return connection
+
+
+def seed(path, profile, rows):
+    connection = connect(path, profile)
+    connection.executescript('''
+        CREATE TABLE bench_task (id INTEGER PRIMARY KEY, name TEXT, status TEXT, updated_at REAL);
+        CREATE INDEX bench_task_updated ON bench_task (updated_at);
+        CREATE TABLE bench_status (id INTEGER PRIMARY KEY, task_id INTEGER, status TEXT, created_at REAL);
+        CREATE INDEX bench_status_task ON bench_status (task_id);
+    ''')
+    now = time.time()
+    connection.execute('BEGIN')
+    connection.executemany('INSERT INTO bench_task (id, name, status, updated_at) VALUES (?, ?, ?, ?)',
+                           ((pk, f'Chamado {pk}', 'OPEN', now) for pk in range(1, rows + 1)))
+    connection.execute('COMMIT')
+    connection.close()
+
+
+def write(connection, transaction_mode, task_id, counter):
+    counter[0] += 1
+    connection.execute(f'BEGIN {transaction_mode}'.strip())
+    try:
+        (current,) = connection.execute('SELECT status FROM bench_task WHERE id = ?', (task_id,)).fetchone()
+        new = STATUSES[(STATUSES.index(current) + 1) % len(STATUSES)]
+        now = time.time()
+        connection.execute('UPDATE bench_task SET status = ?, updated_at = ? WHERE id = ?', (new, now, task_id))
+        connection.execute('INSERT INTO bench_status (task_id, status, created_at) VALUES (?, ?, ?)',
+                           (task_id, new, now))
+        connection.execute('COMMIT')
+    except BaseException:
+        if connection.in_transaction:
+            connection.execute('ROLLBACK')
+        raise
+
+
+def read(connection):
+    return connection.execute(
+        'SELECT id, name, status FROM bench_task ORDER BY updated_at DESC LIMIT 50').fetchall()
+
+
+def worker(path, profile, deadline, write_ratio, rows, result, lock):
+    _, transaction_mode, _, retries = profile_config(profile)
+    connection = connect(path, profile)
+    randomizer = random.Random()
+    reads = writes = errors = attempts = 0
+    latencies = []
+    while time.monotonic() < deadline:
+        if randomizer.random() >= write_ratio:
+            read(connection)
+            reads += 1
+            continue
+        counter = [0]
+        started = time.perf_counter()
+        try:
+            args = (connection, transaction_mode, randomizer.randint(1, rows), counter)
+            if retries:
+                call_with_retry(write, *args, lock_errors=(sqlite3.OperationalError,))
+            else:
+                write(*args)
+        except sqlite3.OperationalError:
+            errors += 1
+        else:
+            writes += 1
+            latencies.append(time.perf_counter() - started)
+        attempts += counter[0] - 1
+    connection.close()
+    with lock:
+        result.reads += reads
+        result.writes += writes
+        result.errors += errors
+        result.retries += attempts
+        result.write_latencies += latencies
+
+
+def run_benchmark(profile, threads=8, seconds=5.0, write_ratio=0.3, rows=1000):
+    if profile not in PROFILES:
+        raise ValueError(f'Perfil desconhecido: {profile}.')
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, f'{profile}.sqlite3')
+        seed(path, profile, rows)
+        result = BenchmarkResult(profile, seconds)
+        lock = threading.Lock()
+        deadline = time.monotonic() + seconds
+        pool = [threading.Thread(target=worker, args=(path, profile, deadline, write_ratio, rows, result, lock))
+                for _ in range(threads)]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+    return result
@@ -1,3 +1,1473 @@
-from django.test import TestCase
+import asyncio
+import csv
+import gzip
+import io
+import itertools
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import time
+import zlib
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache, caches
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, OperationalError, connection, router
+from django.db.models import QuerySet, Sum
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+from PIL import Image
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from config import settings as project_settings
+
+from . import auth_cache, jobs
+from .compression import BrotliCodec, GzipCodec, ZstdCodec, negotiate
+from .db_router import (ReadReplicaRouter, pin_key, pin_to_primary, read_alias, replica_alias, routing_settings,
+                        use_replica)
+from .events import Event, broker, issue_ticket, redeem_ticket
+from .jobs import equipment_qr_data
+from .labels import LABELS_PER_PAGE
+from .pagination import TaskCursorPagination
+from .models import *
+from .qr import qr_cache, qr_cache_key, qr_options
+from .query_audit import audit
+from .retry import call_with_retry, retry_on_lock
+from .sqlite_benchmark import run_benchmark
+
+
+def locmem_caches(name):
+    # Caches em memória e separados por teste, no lugar dos arquivos em CACHE_DIR
+    return {
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'responses': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': name},
+        'auth': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'auth-{name}'},
+        'routing': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'routing-{name}'},
+    }
+
+
+class TaskFixturesMixin:
+    """
+    Monta um cenário mínimo com usuários, equipamentos e tarefas com histórico.
+    Os arquivos gerados (QR codes, imagens) vão para um MEDIA_ROOT temporário
+    e o cache de respostas fica em memória.
+    """
+
+    codes = itertools.count(1)
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=media_root, CACHES=locmem_caches(self.id()))
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        self.admin = CustomUser.objects.create_superuser(
+            email='admin@cbm.test', password='senha-forte-123', nif='000000001', name='Admin'
+        )
+        self.environment = Environment.objects.create(name='Bloco A', user_FK=self.admin)
+        self.category = Category.objects.create(name='Elétrica')
+        self.client.force_authenticate(self.admin)
+
+    def create_tasks(self, amount, creator=None):
+        creator = creator or self.admin
+        tasks = []
+        for i in range(amount):
+            equipment = Equipment.objects.create(
+                name=f'Equipamento {i}', code=f'EQ-{next(self.codes)}',
+                description='-', environment_FK=self.environment, category_FK=self.category,
+            )
+            task = Task.objects.create(
+                name=f'Chamado {i}', description='-', creator_FK=creator,
+                suggested_date=timezone.now() + timedelta(days=1),
+            )
+            task.equipments_FK.add(equipment)
+            task.responsibles_FK.add(creator)
+            status = TaskStatus.objects.create(task_FK=task, user_FK=creator)
+            TaskStatusImage.objects.create(task_status_FK=status, image='task_images/t.jpg', processed=True)
+            tasks.append(task)
+        return tasks
+
+
+class TaskReadQueryCountTests(TaskFixturesMixin, APITestCase):
+    def count_list_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/task/')
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.data['results']
+
+    def test_list_query_count_does_not_grow_with_rows(self):
+        self.create_tasks(2)
+        small, data = self.count_list_queries()
+        self.assertEqual(len(data), 2)
+
+        self.create_tasks(15)
+        large, data = self.count_list_queries()
+        self.assertEqual(len(data), 17)
+        self.assertEqual(small, large)
+
+    def test_list_keeps_nested_payload(self):
+        self.create_tasks(1)
+        _, data = self.count_list_queries()
+        task = data[0]
+        self.assertEqual(task['creator_FK']['email'], self.admin.email)
+        self.assertEqual(task['equipments_FK'][0]['environment_FK']['name'], 'Bloco A')
+        self.assertEqual(task['status_history'][0]['user_detail']['id'], self.admin.id)
+        self.assertEqual(len(task['status_history'][0]['images']), 1)
+
+
+class TaskListPaginationFilterTests(TaskFixturesMixin, APITestCase):
+    def test_cursor_pagination_walks_all_tasks(self):
+        created = self.create_tasks(5)
+        response = self.client.get('/api/task/', {'page_size': 2})
+        seen = [task['id'] for task in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            seen += [task['id'] for task in response.data['results']]
+        self.assertEqual(seen, [task.id for task in reversed(created)])
+
+    def test_list_is_paginated_by_default(self):
+        self.create_tasks(3)
+        with mock.patch.object(TaskCursorPagination, 'page_size', 2):
+            response = self.client.get('/api/task/')
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_filters_by_status_and_urgency(self):
+        first, second, third = self.create_tasks(3)
+        TaskStatus.objects.create(task_FK=second, status='CANCELLED')
+        Task.objects.filter(pk=third.pk).update(urgency_level='HIGH')
+
+        response = self.client.get('/api/task/', {'status': 'OPEN'})
+        self.assertEqual({task['id'] for task in response.data['results']}, {first.id, third.id})
+
+        response = self.client.get('/api/task/', {'status': 'OPEN', 'urgency': 'HIGH'})
+        self.assertEqual([task['id'] for task in response.data['results']], [third.id])
+
+    def test_filters_by_equipment_and_rejects_invalid_ids(self):
+        first, _ = self.create_tasks(2)
+        equipment = first.equipments_FK.get()
+        response = self.client.get('/api/task/', {'equipment': equipment.id})
+        self.assertEqual([task['id'] for task in response.data['results']], [first.id])
+
+        response = self.client.get('/api/task/', {'equipment': 'abc'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_orders_by_asset_with_pagination(self):
+        tasks = self.create_tasks(3)
+        for task, name in zip(tasks, ['Bomba', 'Compressor', 'Alarme']):
+            task.equipments_FK.update(name=name)
+
+        response = self.client.get('/api/task/', {'ordering': 'asset', 'page_size': 2})
+        names = [task['equipments_FK'][0]['name'] for task in response.data['results']]
+        response = self.client.get(response.data['next'])
+        names += [task['equipments_FK'][0]['name'] for task in response.data['results']]
+        self.assertEqual(names, ['Alarme', 'Bomba', 'Compressor'])
+
+
+class TaskCurrentStatusTests(TaskFixturesMixin, APITestCase):
+    def test_status_cache_follows_history(self):
+        task, = self.create_tasks(1)
+        task.refresh_from_db()
+        self.assertEqual(task.current_status, 'OPEN')
+
+        done = TaskStatus.objects.create(task_FK=task, status='DONE')
+        task.refresh_from_db()
+        self.assertEqual(task.current_status, 'DONE')
+        self.assertEqual(task.last_status_date, done.status_date)
+
+        done.delete()
+        task.refresh_from_db()
+        self.assertEqual(task.current_status, 'OPEN')
+
+    def test_rebuild_command_fixes_stale_rows(self):
+        task, = self.create_tasks(1)
+        TaskStatus.objects.create(task_FK=task, status='CANCELLED')
+        Task.objects.filter(pk=task.pk).update(current_status='ONGOING')
+
+        call_command('rebuild_task_status', stdout=io.StringIO())
+        task.refresh_from_db()
+        self.assertEqual(task.current_status, 'CANCELLED')
+
+
+class ReportSummaryTests(TaskFixturesMixin, APITestCase):
+    def test_summary_counts_by_status_and_urgency(self):
+        first, second, third = self.create_tasks(3)
+        TaskStatus.objects.create(task_FK=first, status='FINISHED')
+        TaskStatus.objects.create(task_FK=second, status='CANCELLED')
+        Task.objects.filter(pk=third.pk).update(urgency_level='HIGH')
+
+        response = self.client.get('/api/reports/summary/', {'breakdown': 'environment'})
+        self.assertEqual(response.status_code, 200)
+        data = response.data
+        self.assertEqual((data['total'], data['open'], data['concluded'], data['cancelled']), (3, 1, 1, 1))
+        self.assertEqual(data['by_urgency'], {'LOW': 2, 'MEDIUM': 0, 'HIGH': 1, 'EXTRA_HIGH': 0})
+        self.assertEqual(data['by_environment'], [{
+            'id': self.environment.id, 'name': 'Bloco A',
+            'total': 3, 'open': 1, 'concluded': 1, 'cancelled': 1,
+        }])
+
+    def test_summary_respects_task_visibility(self):
+        colaborador = CustomUser.objects.create_user(
+            email='colab@cbm.test', password='senha-forte-123', nif='000000002', name='Colab'
+        )
+        self.create_tasks(2)
+        self.create_tasks(1, creator=colaborador)
+
+        self.client.force_authenticate(colaborador)
+        response = self.client.get('/api/reports/summary/')
+        self.assertEqual(response.data['total'], 1)
+
+    def test_summary_rejects_inverted_period(self):
+        response = self.client.get('/api/reports/summary/', {'start': '2025-02-01', 'end': '2025-01-01'})
+        self.assertEqual(response.status_code, 400)
+
+
+class TaskDailyMetricTests(TaskFixturesMixin, APITestCase):
+    def test_rollup_tracks_creation_transitions_and_backlog(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first, second = self.create_tasks(2)
+            TaskStatus.objects.create(task_FK=first, status='DONE')
+
+        today = timezone.localdate()
+        totals = TaskDailyMetric.objects.filter(day=today).aggregate(
+            created=Sum('tasks_created'), opened=Sum('status_open'),
+            done=Sum('status_done'), resolved=Sum('resolved_count'),
+        )
+        self.assertEqual(totals, {'created': 2, 'opened': 2, 'done': 1, 'resolved': 1})
+
+        response = self.client.get('/api/reports/daily/', {'start': today, 'end': today})
+        self.assertEqual(response.status_code, 200)
+        day = response.data['days'][0]
+        self.assertEqual(day['tasks_created'], 2)
+        self.assertEqual(day['transitions']['DONE'], 1)
+        self.assertEqual(day['backlog'], 1)
+
+    def test_rebuild_command_matches_incremental_rollup(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            task, = self.create_tasks(1)
+            TaskStatus.objects.create(task_FK=task, status='CANCELLED')
+        incremental = list(TaskDailyMetric.objects.values('day', 'opened', 'closed', 'status_cancelled'))
+
+        TaskDailyMetric.objects.all().delete()
+        call_command('rebuild_task_metrics', stdout=io.StringIO())
+        rebuilt = list(TaskDailyMetric.objects.values('day', 'opened', 'closed', 'status_cancelled'))
+        self.assertEqual(incremental, rebuilt)
+        self.assertEqual(rebuilt[0]['closed'], 1)
+
+    def test_backdated_status_is_ordered_by_status_date(self):
+        task, = self.create_tasks(1)
+        cancelled = TaskStatus.objects.create(task_FK=task, status='CANCELLED')
+        done = TaskStatus.objects.create(task_FK=task, status='DONE')
+        # DONE tem id maior, mas foi registrado antes do cancelamento
+        opened = TaskStatus.objects.get(task_FK=task, status='OPEN').status_date
+        TaskStatus.objects.filter(pk=done.pk).update(
+            status_date=opened + (cancelled.status_date - opened) / 2)
+
+        today = timezone.localdate()
+        TaskDailyMetric.objects.rebuild_days({today})
+        totals = TaskDailyMetric.objects.filter(day=today).aggregate(
+            closed=Sum('closed'), resolved=Sum('resolved_count'))
+        self.assertEqual(totals, {'closed': 1, 'resolved': 1})
+
+    def test_daily_report_requires_technician(self):
+        colaborador = CustomUser.objects.create_user(
+            email='colab@cbm.test', password='senha-forte-123', nif='000000002', name='Colab'
+        )
+        self.client.force_authenticate(colaborador)
+        self.assertEqual(self.client.get('/api/reports/daily/').status_code, 403)
+
+
+class EquipmentQRJobTests(TaskFixturesMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        qr_cache.clear_memory()
+
+    def create_equipment(self):
+        return Equipment.objects.create(name='Bomba', code=f'EQ-{next(self.codes)}', description='-')
+
+    def cached_path(self, equipment):
+        return qr_cache.path(qr_cache_key(equipment_qr_data(equipment.pk), qr_options()))
+
+    def test_create_enqueues_instead_of_rendering(self):
+        equipment = self.create_equipment()
+        self.assertTrue(BackgroundJob.objects.filter(kind='equipment_qr', object_id=equipment.pk).exists())
+        self.assertFalse(default_storage.exists(self.cached_path(equipment)))
+
+        self.assertEqual(jobs.run_pending(), 1)
+        self.assertTrue(default_storage.exists(self.cached_path(equipment)))
+        self.assertEqual(BackgroundJob.objects.get(object_id=equipment.pk).status, 'DONE')
+
+    def test_failed_jobs_are_retried_then_marked_failed(self):
+        equipment = self.create_equipment()
+        with mock.patch.dict(jobs.HANDLERS, {'equipment_qr': mock.Mock(side_effect=RuntimeError('boom'))}):
+            with self.assertLogs('core.jobs', level='ERROR'):
+                for _ in range(jobs.MAX_ATTEMPTS):
+                    jobs.run_pending()
+        job = BackgroundJob.objects.get(object_id=equipment.pk)
+        self.assertEqual((job.status, job.attempts, job.error), ('FAILED', jobs.MAX_ATTEMPTS, 'boom'))
+
+    def test_claim_skips_jobs_taken_by_another_worker(self):
+        taken, mine = BackgroundJob.objects.bulk_create(
+            BackgroundJob(kind='equipment_qr', object_id=pk) for pk in (1, 2))
+        update = QuerySet.update
+
+        def concurrent_update(queryset, **values):
+            # Outro worker pega `taken` entre a leitura dos ids e o UPDATE deste
+            if values.get('claim_token'):
+                update(BackgroundJob.objects.filter(pk=taken.pk), status='RUNNING', claim_token='outro')
+            return update(queryset, **values)
+
+        with mock.patch.object(QuerySet, 'update', concurrent_update):
+            claimed = jobs.claim('equipment_qr', 10)
+        self.assertEqual([job.pk for job in claimed], [mine.pk])
+
+    def test_command_generates_missing_qr_codes_in_bulk(self):
+        equipments = Equipment.objects.bulk_create(
+            Equipment(name='Bomba', code=f'EQ-{next(self.codes)}', description='-') for _ in range(3)
+        )
+        call_command('generate_qr_codes', workers=1, stdout=io.StringIO())
+        for equipment in equipments:
+            self.assertTrue(default_storage.exists(self.cached_path(equipment)))
+
+    def test_qr_endpoint_serves_png_with_validators(self):
+        equipment = self.create_equipment()
+        self.client.force_authenticate(None)
+
+        response = self.client.get(f'/api/equipment/{equipment.pk}/qr/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertTrue(response.content.startswith(b'\x89PNG'))
+        self.assertIn('max-age=', response['Cache-Control'])
+        self.assertTrue(default_storage.exists(self.cached_path(equipment)))
+
+        response = self.client.get(f'/api/equipment/{equipment.pk}/qr/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(f'/api/equipment/{equipment.pk}/qr/', {'ec': 'H', 'size': 4})
+        self.assertNotEqual(response['ETag'], self.client.get(f'/api/equipment/{equipment.pk}/qr/')['ETag'])
+
+    def test_serializer_exposes_qr_url(self):
+        equipment = self.create_equipment()
+        response = self.client.get(f'/api/equipment/{equipment.pk}/')
+        self.assertEqual(response.data['qr_code_image'], f'http://testserver/api/equipment/{equipment.pk}/qr/')
+
+
+class EquipmentLabelTests(TaskFixturesMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        Equipment.objects.bulk_create(
+            Equipment(name=f'Extintor {i}', code=f'EQ-{next(self.codes)}', description='-',
+                      environment_FK=self.environment)
+            for i in range(LABELS_PER_PAGE + 1)
+        )
+
+    def test_pdf_sheet_is_streamed_with_one_page_per_block(self):
+        # No request a renderização é no próprio processo, sem pool
+        with mock.patch('core.labels.ProcessPoolExecutor', side_effect=AssertionError):
+            response = self.client.get('/api/equipment/labels/', {'environment': self.environment.pk})
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.streaming)
+            pdf = b''.join(response.streaming_content)
+        self.assertTrue(pdf.startswith(b'%PDF-1.4'))
+        self.assertIn(b'/Count 2', pdf)
+        self.assertTrue(pdf.rstrip().endswith(b'%%EOF'))
+
+    def test_png_page_and_validation(self):
+        response = self.client.get('/api/equipment/labels/',
+                                   {'environment': self.environment.pk, 'output': 'png', 'page': 2})
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(self.client.get('/api/equipment/labels/').status_code, 400)
+
+
+class TaskStatusImagePipelineTests(TaskFixturesMixin, APITestCase):
+    def upload(self, content, name='foto.jpg'):
+        task, = self.create_tasks(1)
+        status = task.TaskStatus_task_FK.get()
+        return self.client.post('/api/task-status-image/', {
+            'image': SimpleUploadedFile(name, content, content_type='image/jpeg'),
+            'task_status_FK': status.pk,
+        }, format='multipart')
+
+    def photo(self, size=(3000, 2000)):
+        image = Image.new('RGB', size, 'red')
+        exif = Image.Exif()
+        exif[0x010F] = 'Fabricante do celular'
+        buf = io.BytesIO()
+        image.save(buf, format='JPEG', exif=exif)
+        return buf.getvalue()
+
+    def test_upload_is_reencoded_with_variants(self):
+        response = self.upload(self.photo())
+        self.assertEqual(response.status_code, 201)
+        self.assertIsNone(response.data['thumbnail'])
+
+        jobs.run_pending(kinds=['task_status_image'])
+        item = TaskStatusImage.objects.get(pk=response.data['id'])
+        self.assertTrue(item.processed)
+        for field, side in [(item.image, 2048), (item.medium, 1024), (item.thumbnail, 256)]:
+            with Image.open(field.open('rb')) as image:
+                self.assertEqual(max(image.size), side)
+                self.assertFalse(image.getexif())
+
+        data = self.client.get(f'/api/task-status-image/{item.pk}/').data
+        self.assertTrue(data['thumbnail'].endswith('.jpg'))
+
+    def test_non_image_is_kept_as_is(self):
+        response = self.upload(b'%PDF-1.4 relatorio', name='relatorio.pdf')
+        with self.assertLogs('core.jobs', level='WARNING'):
+            jobs.run_pending(kinds=['task_status_image'])
+        item = TaskStatusImage.objects.get(pk=response.data['id'])
+        self.assertTrue(item.processed)
+        self.assertFalse(item.thumbnail)
+        self.assertTrue(item.image.name.endswith('.pdf'))
+
+    def test_failure_of_one_image_does_not_fail_the_batch(self):
+        bomb = self.upload(self.photo(size=(60, 40)), name='bomba.jpg').data['id']
+        good = self.upload(self.photo(size=(60, 40))).data['id']
+        broken = self.upload(self.photo(size=(60, 40)), name='quebrada.jpg').data['id']
+        real = jobs.process_image
+
+        def process(source):
+            if 'bomba' in source.name:
+                raise Image.DecompressionBombError('grande demais')
+            variants = real(source)
+            if 'quebrada' in source.name:
+                # Falha depois de gravar parte das variantes
+                return {'original': variants['original'], 'medium': variants['medium']}
+            return variants
+
+        with mock.patch('core.jobs.process_image', process), self.assertLogs('core.jobs', level='WARNING'):
+            jobs.run_pending(kinds=['task_status_image'])
+
+        self.assertEqual(set(BackgroundJob.objects.filter(kind='task_status_image').values_list('status', flat=True)),
+                         {'DONE'})
+        items = TaskStatusImage.objects.in_bulk([bomb, good, broken])
+        self.assertTrue(all(item.processed for item in items.values()))
+        self.assertTrue(items[good].thumbnail)
+        for pk in (bomb, broken):
+            self.assertFalse(items[pk].medium)
+            self.assertTrue(items[pk].image.storage.exists(items[pk].image.name))
+        # Variantes parciais do anexo que falhou não ficam órfãs
+        media = os.path.join(default_storage.location, 'task_images')
+        self.assertFalse([name for name in os.listdir(media) if name.startswith('quebrada_')])
+        self.assertFalse([name for name in os.listdir(os.path.join(media, 'medium')) if name.startswith('quebrada')])
+
+    def test_upload_size_limit(self):
+        with self.settings(TASK_IMAGE={'MAX_UPLOAD_SIZE': 1024}):
+            response = self.upload(self.photo())
+        self.assertEqual(response.status_code, 400)
+
+
+class BulkEndpointTests(TaskFixturesMixin, APITestCase):
+    def test_bulk_create_tasks_sets_creator_and_relations(self):
+        equipment = Equipment.objects.create(name='Bomba', code=f'EQ-{next(self.codes)}', description='-')
+        payload = [
+            {'name': f'Chamado {i}', 'description': '-', 'suggested_date': timezone.now().isoformat(),
+             'equipments_FK': [equipment.pk], 'responsibles_FK': [self.admin.pk]}
+            for i in range(5)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/task/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data), 5)
+        # Um INSERT para as tarefas e um por tabela M2M, independente do tamanho do lote
+        inserts = [query for query in queries.captured_queries if query['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 3)
+
+        tasks = Task.objects.filter(pk__in=[item['id'] for item in response.data])
+        self.assertEqual(set(tasks.values_list('creator_FK', flat=True)), {self.admin.pk})
+        for task in tasks:
+            self.assertEqual(list(task.equipments_FK.values_list('pk', flat=True)), [equipment.pk])
+
+    def test_bulk_status_transition_updates_current_status(self):
+        tasks = self.create_tasks(3)
+        payload = [{'task_FK': task.pk, 'status': 'DONE', 'comment': 'ok'} for task in tasks]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/task-status/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(set(Task.objects.values_list('current_status', flat=True)), {'DONE'})
+        self.assertEqual(TaskDailyMetric.objects.aggregate(total=Sum('status_done'))['total'], 3)
+
+    def test_bulk_update_moving_status_refreshes_previous_task(self):
+        source, target = self.create_tasks(2)
+        status = TaskStatus.objects.create(task_FK=source, user_FK=self.admin, status='DONE', comment='ok')
+        self.assertEqual(Task.objects.get(pk=source.pk).current_status, 'DONE')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch('/api/task-status/bulk/', [{'id': status.pk, 'task_FK': target.pk}],
+                                         format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Task.objects.get(pk=source.pk).current_status, 'OPEN')
+        self.assertEqual(Task.objects.get(pk=target.pk).current_status, 'DONE')
+
+    def test_bulk_status_rejects_tasks_the_user_cannot_see(self):
+        user = CustomUser.objects.create_user(email='col@cbm.test', password='x', nif='6', name='Col')
+        user.user_permissions.add(*Permission.objects.filter(codename__in=['add_taskstatus', 'change_taskstatus']))
+        own, = self.create_tasks(1, creator=user)
+        other, = self.create_tasks(1)
+        other_status = TaskStatus.objects.create(task_FK=other, user_FK=self.admin, status='ONGOING')
+        self.client.force_authenticate(CustomUser.objects.get(pk=user.pk))
+        statuses = TaskStatus.objects.count()
+
+        response = self.client.post('/api/task-status/bulk/', [
+            {'task_FK': own.pk, 'status': 'ONGOING'}, {'task_FK': other.pk, 'status': 'DONE'},
+        ], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('task_FK', response.data[1])
+        self.assertEqual(TaskStatus.objects.count(), statuses)
+
+        # Nem mover um status de outro chamado, nem mover para um chamado que não enxerga
+        for item in ({'id': other_status.pk, 'task_FK': own.pk}, {'id': other_status.pk, 'comment': 'x'}):
+            response = self.client.patch('/api/task-status/bulk/', [item], format='json')
+            self.assertEqual(response.status_code, 400, item)
+        self.assertEqual(TaskStatus.objects.get(pk=other_status.pk).task_FK_id, other.pk)
+
+        response = self.client.post('/api/task-status/bulk/', [{'task_FK': own.pk, 'status': 'ONGOING'}],
+                                    format='json')
+        self.assertEqual(response.status_code, 201)
+
+    def test_bulk_create_equipment_enqueues_qr_jobs(self):
+        payload = [{'name': 'Bomba', 'code': f'EQ-{next(self.codes)}', 'description': '-'} for _ in range(4)]
+        response = self.client.post('/api/equipment/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, 201)
+        ids = {item['id'] for item in response.data}
+        self.assertEqual(set(BackgroundJob.objects.filter(kind='equipment_qr').values_list('object_id', flat=True)), ids)
+
+    def test_bulk_rejects_repeated_unique_values(self):
+        code = f'EQ-{next(self.codes)}'
+        response = self.client.post('/api/equipment/bulk/', [
+            {'name': 'Bomba', 'code': code, 'description': '-'},
+            {'name': 'Bomba 2', 'code': code, 'description': '-'},
+        ], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('code', response.data[1])
+        self.assertFalse(Equipment.objects.filter(code=code).exists())
+
+        first, second = [Equipment.objects.create(name='Bomba', code=f'EQ-{next(self.codes)}', description='-')
+                         for _ in range(2)]
+        response = self.client.patch('/api/equipment/bulk/', [
+            {'id': first.pk, 'code': code}, {'id': second.pk, 'code': code},
+        ], format='json')
+        self.assertEqual(response.status_code, 400)
+
+        with mock.patch('django.db.models.QuerySet.bulk_create', side_effect=IntegrityError):
+            response = self.client.post('/api/equipment/bulk/', [{'name': 'Bomba', 'code': code, 'description': '-'}],
+                                        format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_patch_updates_and_rejects_unknown_ids(self):
+        tasks = self.create_tasks(2)
+        response = self.client.patch('/api/task/bulk/', [
+            {'id': task.pk, 'urgency_level': 'HIGH'} for task in tasks
+        ], format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(Task.objects.values_list('urgency_level', flat=True)), {'HIGH'})
+
+        response = self.client.patch('/api/task/bulk/', [{'id': 999999, 'urgency_level': 'LOW'}], format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_status_created_with_uploaded_images(self):
+        task, = self.create_tasks(1)
+        response = self.client.post('/api/task-status/', {
+            'task_FK': task.pk, 'status': 'ONGOING',
+            'uploaded_images': [SimpleUploadedFile(f'foto{i}.jpg', b'x', content_type='image/jpeg') for i in range(2)],
+        }, format='multipart')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(TaskStatusImage.objects.filter(task_status_FK=response.data['id']).count(), 2)
+        self.assertEqual(BackgroundJob.objects.filter(kind='task_status_image').count(), 3)
+
+
+class TaskExportTests(TaskFixturesMixin, APITestCase):
+    def read(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_has_one_row_per_status(self):
+        task, other = self.create_tasks(2)
+        TaskStatus.objects.create(task_FK=task, status='DONE', comment='feito, ok')
+
+        response = self.client.get('/api/task/export/', {'output': 'csv'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        rows = list(csv.DictReader(io.StringIO(self.read(response))))
+        history = [row for row in rows if row['task_id'] == str(task.pk)]
+        self.assertEqual([row['status'] for row in history], ['OPEN', 'DONE'])
+        self.assertEqual(history[-1]['comment'], 'feito, ok')
+        self.assertEqual({row['environments'] for row in rows}, {'Bloco A'})
+
+    def test_ndjson_streams_in_chunks_with_constant_queries(self):
+        self.create_tasks(6)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/task/export/', {'output': 'ndjson'})
+            lines = self.read(response).splitlines()
+        self.assertEqual(len(lines), 6)
+        record = json.loads(lines[0])
+        self.assertEqual(len(record['history']), 1)
+        self.assertEqual(record['equipments'][0]['environment'], 'Bloco A')
+
+        self.create_tasks(6)
+        with CaptureQueriesContext(connection) as more_queries:
+            self.read(self.client.get('/api/task/export/', {'output': 'ndjson'}))
+        self.assertEqual(len(queries), len(more_queries))
+
+    def test_export_respects_filters_and_visibility(self):
+        first, second = self.create_tasks(2)
+        TaskStatus.objects.create(task_FK=second, status='DONE')
+        response = self.client.get('/api/task/export/', {'output': 'ndjson', 'status': 'DONE'})
+        self.assertEqual([json.loads(line)['id'] for line in self.read(response).splitlines()], [second.pk])
+
+        response = self.client.get('/api/task/export/', {'output': 'xml'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_command_writes_file(self):
+        self.create_tasks(3)
+        path = os.path.join(tempfile.mkdtemp(), 'chamados.ndjson')
+        self.addCleanup(shutil.rmtree, os.path.dirname(path))
+        call_command('export_tasks', format='ndjson', output=path, chunk_size=2, stderr=io.StringIO())
+        with open(path, encoding='utf-8') as file:
+            self.assertEqual(len(file.readlines()), 3)
+
+
+class SyncTests(TaskFixturesMixin, APITestCase):
+    def sync(self, cursor=None):
+        response = self.client.get('/api/sync/', {'cursor': cursor} if cursor else {})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_first_sync_is_a_full_snapshot(self):
+        self.create_tasks(2)
+        data = self.sync()
+        self.assertTrue(data['reset'])
+        self.assertEqual(len(data['tasks']), 2)
+        self.assertEqual(len(data['equipments']), 2)
+
+    def test_reset_without_snapshot_returns_only_the_cursor(self):
+        self.create_tasks(2)
+        response = self.client.get('/api/sync/', {'snapshot': 'false'})
+        self.assertTrue(response.data['reset'])
+        self.assertEqual((response.data['tasks'], response.data['equipments']), ([], []))
+        self.assertTrue(response.data['cursor'])
+
+    def test_delta_returns_only_changes_and_tombstones(self):
+        first, second = self.create_tasks(2)
+        second_pk = second.pk
+
+        with self.settings(SYNC={'CURSOR_LAG_SECONDS': 0}):
+            cursor = self.sync()['cursor']
+            data = self.sync(cursor)
+            self.assertFalse(data['reset'])
+            self.assertEqual((data['tasks'], data['equipments']), ([], []))
+
+            TaskStatus.objects.create(task_FK=first, status='ONGOING')
+            second_status = second.TaskStatus_task_FK.get().pk
+            second.delete()
+            data = self.sync(cursor)
+
+        self.assertEqual([task['id'] for task in data['tasks']], [first.pk])
+        self.assertEqual(data['tasks'][0]['current_status'], 'ONGOING')
+        self.assertEqual([status['status'] for status in data['task_statuses']], ['ONGOING'])
+        self.assertEqual(data['deleted']['task'], [second_pk])
+        self.assertIn(second_status, data['deleted']['task_status'])
+
+    def test_collaborator_only_gets_own_data_and_tombstones(self):
+        user = CustomUser.objects.create_user(email='col@cbm.test', password='x', nif='5', name='Col')
+        own, = self.create_tasks(1, creator=user)
+        other, = self.create_tasks(1)
+        own_note = Notification.objects.create(task_FK=own, user_FK=user, text='-')
+        other_note = Notification.objects.create(task_FK=own, user_FK=self.admin, text='-')
+        expected = {'task': [own.pk], 'notification': [own_note.pk]}
+        self.client.force_authenticate(user)
+        with self.settings(SYNC={'CURSOR_LAG_SECONDS': 0}):
+            data = self.sync()
+            self.assertEqual(data['equipments'], [])
+            cursor = data['cursor']
+            for instance in (own_note, other_note, own, other, Equipment.objects.first()):
+                instance.delete()
+            data = self.sync(cursor)
+        self.assertEqual({model: data['deleted'][model] for model in expected}, expected)
+        self.assertEqual(data['deleted']['equipment'], [])
+
+        # Com a permissão de ver equipamentos (a mesma da busca) eles voltam
+        user.user_permissions.add(Permission.objects.get(codename='view_equipment'))
+        self.client.force_authenticate(CustomUser.objects.get(pk=user.pk))
+        with self.settings(SYNC={'CURSOR_LAG_SECONDS': 0}):
+            data = self.sync(cursor)
+        self.assertEqual(len(data['deleted']['equipment']), 1)
+        self.assertEqual(len(self.sync()['equipments']), 1)
+
+    def test_bulk_update_bumps_updated_at(self):
+        task, = self.create_tasks(1)
+        before = Task.objects.get(pk=task.pk).updated_at
+        self.client.patch('/api/task/bulk/', [{'id': task.pk, 'name': 'Outro'}], format='json')
+        self.assertGreater(Task.objects.get(pk=task.pk).updated_at, before)
+
+    def test_stale_or_invalid_cursor(self):
+        old = (timezone.now() - timedelta(days=365)).isoformat()
+        self.assertTrue(self.sync(old)['reset'])
+        self.assertEqual(self.client.get('/api/sync/', {'cursor': 'ontem'}).status_code, 400)
+
+    def test_prune_tombstones(self):
+        SyncTombstone.objects.create(model='task', object_id=1)
+        SyncTombstone.objects.filter(object_id=1).update(deleted_at=timezone.now() - timedelta(days=90))
+        call_command('prune_sync_tombstones', stdout=io.StringIO())
+        self.assertFalse(SyncTombstone.objects.exists())
+
+
+class ConditionalGetTests(TaskFixturesMixin, APITestCase):
+    def test_task_list_returns_304_without_serializing(self):
+        self.create_tasks(3)
+        response = self.client.get('/api/task/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+
+        with mock.patch('core.serializers.task.TaskReadSerializer.to_representation') as serialize:
+            with CaptureQueriesContext(connection) as queries:
+                cached = self.client.get('/api/task/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        serialize.assert_not_called()
+        # Um aggregate nas tarefas visíveis; os models aninhados vêm das versões no cache
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('core_equipment', queries.captured_queries[0]['sql'])
+
+    def test_etag_changes_with_nested_data_and_deletes(self):
+        first, second = self.create_tasks(2)
+        etag = self.client.get('/api/task/')['ETag']
+
+        TaskStatus.objects.create(task_FK=first, status='DONE')
+        changed = self.client.get('/api/task/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+
+        etag = changed['ETag']
+        self.environment.name = 'Bloco B'
+        self.environment.save()
+        self.assertEqual(self.client.get('/api/task/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        etag = self.client.get('/api/task/')['ETag']
+        second.delete()
+        self.assertEqual(self.client.get('/api/task/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_detail_and_scope(self):
+        task, = self.create_tasks(1)
+        response = self.client.get(f'/api/task/{task.pk}/')
+        self.assertEqual(self.client.get(f'/api/task/{task.pk}/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertFalse(response.has_header('Last-Modified'))
+
+        other = CustomUser.objects.create_user(email='c@cbm.test', password='x', nif='2', name='C')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get('/api/task/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+        self.assertEqual(self.client.get(f'/api/task/{task.pk}/').status_code, 404)
+
+    def test_simple_viewsets_emit_validators(self):
+        for url in ['/api/category/', '/api/environment/', '/api/equipment/', '/api/notification/',
+                    f'/api/category/{self.category.pk}/']:
+            response = self.client.get(url)
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304, url)
+
+        etag = self.client.get('/api/category/')['ETag']
+        Category.objects.create(name='Hidráulica')
+        self.assertEqual(self.client.get('/api/category/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_invalid_lookup_is_not_found(self):
+        for url in ['/api/task/abc/', '/api/equipment/abc/', '/api/notification/abc/', '/api/category/abc/']:
+            self.assertEqual(self.client.get(url).status_code, 404, url)
+
+    def test_if_modified_since_alone_never_returns_stale_304(self):
+        category = Category.objects.create(name='Hidráulica')
+        response = self.client.get('/api/category/')
+        self.assertFalse(response.has_header('Last-Modified'))
+        since = http_date(time.time() + 60)
+        category.delete()
+        response = self.client.get('/api/category/', HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Hidráulica', [item['name'] for item in response.json()])
+
+
+class ResponseCacheTests(TaskFixturesMixin, APITestCase):
+    def test_second_read_skips_db_and_serializer(self):
+        self.create_tasks(2)
+        first = self.client.get('/api/equipment/')
+        self.assertEqual(first['X-Cache'], 'MISS')
+
+        with mock.patch('core.serializers.equipment.EquipmentSerializer.to_representation') as serialize:
+            with CaptureQueriesContext(connection) as queries:
+                second = self.client.get('/api/equipment/')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['Content-Type'], 'application/json')
+        serialize.assert_not_called()
+        # Só a autenticação/permissão do usuário
+        self.assertFalse([q for q in queries.captured_queries if 'core_equipment' in q['sql']])
+
+    def test_signals_invalidate_dependent_responses(self):
+        self.create_tasks(1)
+        self.client.get('/api/equipment/')
+        self.client.get('/api/category/')
+
+        self.environment.name = 'Bloco B'
+        self.environment.save()
+        response = self.client.get('/api/equipment/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()[0]['environment_FK']['name'], 'Bloco B')
+        self.assertEqual(self.client.get('/api/category/')['X-Cache'], 'HIT')
+
+        Equipment.objects.get().delete()
+        self.assertEqual(self.client.get('/api/equipment/').json(), [])
+
+    def test_response_stored_before_commit_is_invalidated_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.name = 'Elétrica'
+            self.category.save()
+            # GET concorrente antes do commit: lê a linha antiga com a versão nova
+            with mock.patch('core.models.Category.from_db', side_effect=lambda *args: stale):
+                stale = Category(pk=self.category.pk, name='Antiga', updated_at=timezone.now())
+                self.assertEqual(self.client.get('/api/category/').json()[0]['name'], 'Antiga')
+        response = self.client.get('/api/category/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()[0]['name'], 'Elétrica')
+
+    def test_group_membership_invalidates_users(self):
+        self.client.get('/api/custom-user/')
+        group = Group.objects.create(name='Técnico')
+        self.admin.groups.add(group)
+        response = self.client.get('/api/custom-user/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()[0]['groups'], ['Técnico'])
+
+    def test_etag_and_stats(self):
+        response = self.client.get('/api/category/')
+        self.assertEqual(self.client.get('/api/category/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.client.get('/api/category/')
+
+        out = io.StringIO()
+        call_command('response_cache', stdout=out)
+        self.assertIn('CategoryView: 2 acertos, 1 faltas', out.getvalue())
+
+
+class AuthCacheTests(TaskFixturesMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.technicians = Group.objects.create(name='Técnico')
+        self.user = CustomUser.objects.create_user(email='tec@cbm.test', password='x', nif='3', name='Tec')
+        self.user.groups.add(self.technicians)
+        self.token = Token.objects.create(user=self.user)
+        self.client.force_authenticate(None)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def auth_queries(self, url='/api/task/'):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        tables = ('authtoken_token', 'auth_group', 'auth_permission', 'core_customuser_groups')
+        return response, [q['sql'] for q in queries.captured_queries if any(t in q['sql'] for t in tables)]
+
+    def test_second_request_skips_auth_queries(self):
+        # /reports/daily/ checa o papel de técnico e não aninha usuários na resposta
+        response, queries = self.auth_queries('/api/reports/daily/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(queries)
+
+        with CaptureQueriesContext(connection) as all_queries:
+            response, queries = self.auth_queries('/api/reports/daily/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(queries, [])
+        # Nem o usuário é lido: ele é remontado a partir do cache
+        self.assertFalse([q for q in all_queries.captured_queries if 'core_customuser' in q['sql']])
+        self.assertEqual(response.wsgi_request.user.pk, self.user.pk)
+
+    def test_deactivated_user_is_rejected(self):
+        self.auth_queries()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.auth_queries()[0].status_code, 401)
+
+    def test_logout_invalidates_token(self):
+        self.auth_queries()
+        self.token.delete()
+        response, _ = self.auth_queries()
+        self.assertEqual(response.status_code, 401)
+
+    def test_group_and_permission_changes_invalidate(self):
+        self.create_tasks(1)
+        self.assertEqual(len(self.auth_queries()[0].json()['results']), 1)
+
+        self.user.groups.remove(self.technicians)
+        self.assertEqual(self.auth_queries()[0].json()['results'], [])
+
+        self.technicians.user_set.add(self.user)
+        self.assertEqual(len(self.auth_queries()[0].json()['results']), 1)
+
+        # Permissão dada ao grupo (afeta todos os membros)
+        self.assertEqual(self.client.post('/api/category/', {'name': 'Nova'}).status_code, 403)
+        self.technicians.permissions.add(Permission.objects.get(codename='add_category'))
+        self.assertEqual(self.client.post('/api/category/', {'name': 'Nova'}).status_code, 201)
+
+
+    def test_cache_keeps_only_ids_and_permission_sets(self):
+        self.auth_queries()
+        entries = [caches['auth'].get(key) for key in (auth_cache.token_key(self.token.key),
+                                                        auth_cache.user_key(self.user.pk))]
+        self.assertEqual(entries[0], {'user_id': self.user.pk, 'created': self.token.created})
+        self.assertTrue(entries[1]['is_technician'])
+        dumped = pickle.dumps(entries)
+        self.assertNotIn(self.token.key.encode(), dumped)
+        self.assertNotIn(self.user.password.encode(), dumped)
+
+    def test_invalidation_is_repeated_on_commit(self):
+        self.assertEqual(self.auth_queries()[0].status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.groups.remove(self.technicians)
+            # Request concorrente antes do commit: guarda o papel antigo
+            auth_cache.store_token(Token.objects.select_related('user').get(pk=self.token.pk))
+            caches['auth'].set(auth_cache.user_key(self.user.pk), {
+                **caches['auth'].get(auth_cache.user_key(self.user.pk)), 'is_technician': True})
+        self.assertEqual(self.auth_queries('/api/reports/daily/')[0].status_code, 403)
+
+
+@override_settings(EVENTS={'POLL_INTERVAL': 0.01, 'HEARTBEAT_INTERVAL': 15, 'QUEUE_SIZE': 2})
+class EventStreamTests(TaskFixturesMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        # O broker é do processo: ids de testes anteriores (revertidos) voltam a aparecer
+        broker._seen.clear()
+
+    async def stop_poller(self, *subscribers):
+        for subscriber in subscribers:
+            broker.unsubscribe(subscriber)
+        await asyncio.sleep(0.05)
+
+    async def test_broker_fans_out_to_interested_users(self):
+        own, technician, other = broker.subscribe(1, False), broker.subscribe(2, True), broker.subscribe(3, False)
+        event = Event('task_status', 10 ** 9, {'id': 1}, user_ids={1}, technicians=True)
+        broker.publish([event, event])
+        await asyncio.sleep(0)
+        self.assertEqual([own.queue.qsize(), technician.queue.qsize(), other.queue.qsize()], [1, 1, 0])
+
+        # Fila cheia: o cliente recebe um aviso para ressincronizar
+        broker.publish([Event('notification', 10 ** 9 + i, {}, user_ids={1}) for i in range(3)])
+        await asyncio.sleep(0)
+        self.assertTrue(own.overflowed)
+        await self.stop_poller(own, technician, other)
+
+    async def test_stream_delivers_rows_written_by_other_processes(self):
+        ticket = await sync_to_async(issue_ticket)(self.admin)
+        response = await self.async_client.get('/api/events/', {'ticket': ticket})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = aiter(response.streaming_content)
+        self.assertEqual(await anext(chunks), b'retry: 5000\n\n')
+        await asyncio.sleep(0.05)
+
+        # Sem on_commit aqui: só o poller (fallback entre processos) vê a linha
+        task, = await sync_to_async(self.create_tasks)(1)
+        await sync_to_async(Notification.objects.create)(text='Novo chamado', task_FK=task, user_FK=self.admin)
+        received = sorted([(await asyncio.wait_for(anext(chunks), 1)).decode() for _ in range(2)])
+        self.assertTrue(received[0].startswith('id: notification:'))
+        self.assertIn('Novo chamado', received[0])
+        self.assertTrue(received[1].startswith('id: task_status:'))
+        await chunks.aclose()
+        await asyncio.sleep(0.05)
+
+    async def test_stream_requires_token(self):
+        response = await self.async_client.get('/api/events/', {'ticket': 'invalido'})
+        self.assertEqual(response.status_code, 401)
+        # O token da API não é aceito na URL
+        token = await sync_to_async(Token.objects.create)(user=self.admin)
+        response = await self.async_client.get('/api/events/', {'token': token.key})
+        self.assertEqual(response.status_code, 401)
+
+    def test_ticket_is_single_use_and_requires_authentication(self):
+        response = self.client.post('/api/events/ticket/')
+        self.assertEqual(response.status_code, 200)
+        ticket = response.data['ticket']
+        self.assertEqual(redeem_ticket(ticket), (self.admin.pk, True))
+        self.assertIsNone(redeem_ticket(ticket))
+
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.post('/api/events/ticket/').status_code, 401)
+
+    def test_wsgi_request_gets_503_instead_of_a_stream(self):
+        response = self.client.get('/api/events/', {'ticket': issue_ticket(self.admin)})
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(response.streaming)
+        self.assertEqual(self.client.head('/api/events/').status_code, 503)
+
+    async def test_head_reports_availability_under_asgi(self):
+        response = await self.async_client.head('/api/events/')
+        self.assertEqual(response.status_code, 204)
+
+    def test_signals_publish_after_commit(self):
+        task, = self.create_tasks(1)
+        collaborator = CustomUser.objects.create_user(email='c@cbm.test', password='x', nif='4', name='C')
+        task.responsibles_FK.add(collaborator)
+        with mock.patch.object(broker, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                Notification.objects.create(text='x', task_FK=task, user_FK=self.admin)
+                TaskStatus.objects.create(task_FK=task, status='DONE')
+                publish.assert_not_called()
+        published = [call.args[0][0] for call in publish.call_args_list]
+        notification, status = published[0], next(event for event in published if event.kind == 'task_status')
+        self.assertEqual(notification.user_ids, {self.admin.pk})
+        self.assertEqual(status.user_ids, {self.admin.pk, collaborator.pk})
+        self.assertEqual(status.data['status'], 'DONE')
+
+
+class NotificationFanOutTests(TaskFixturesMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.task, = self.create_tasks(1)
+        self.collaborators = [
+            CustomUser.objects.create_user(email=f'r{i}@cbm.test', password='x', nif=f'7{i}', name=f'R{i}')
+            for i in range(3)
+        ]
+        self.task.responsibles_FK.add(*self.collaborators)
+        Notification.objects.all().delete()
+
+    def test_status_change_notifies_everyone_but_the_author_in_one_insert(self):
+        author = self.collaborators[0]
+        with CaptureQueriesContext(connection) as queries:
+            TaskStatus.objects.create(task_FK=self.task, status='DONE', user_FK=author)
+        inserts = [query for query in queries.captured_queries
+                   if query['sql'].startswith('INSERT INTO "core_notification"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(set(Notification.objects.values_list('user_FK', flat=True)),
+                         {self.admin.pk, *[user.pk for user in self.collaborators[1:]]})
+
+    def test_burst_on_same_task_is_coalesced(self):
+        TaskStatus.objects.create(task_FK=self.task, status='ONGOING', user_FK=self.admin)
+        TaskStatus.objects.create(task_FK=self.task, status='DONE', user_FK=self.admin)
+        self.assertEqual(Notification.objects.count(), 3)
+        self.assertTrue(all(text.endswith('para Done.') for text in Notification.objects.values_list('text', flat=True)))
+
+        with override_settings(NOTIFICATIONS={'COALESCE_SECONDS': 0}):
+            TaskStatus.objects.create(task_FK=self.task, status='ONGOING', user_FK=self.admin)
+        self.assertEqual(Notification.objects.count(), 6)
+
+    def test_assignment_notifies_new_responsibles(self):
+        newcomer = CustomUser.objects.create_user(email='n@cbm.test', password='x', nif='80', name='N')
+        response = self.client.patch('/api/task/bulk/', [
+            {'id': self.task.pk, 'responsibles_FK': [self.admin.pk, self.collaborators[0].pk, newcomer.pk]},
+        ], format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(Notification.objects.values_list('user_FK', flat=True)), [newcomer.pk])
+
+        other, = self.create_tasks(1)
+        Notification.objects.all().delete()
+        newcomer.task_set.add(other)
+        self.assertEqual(list(Notification.objects.values_list('user_FK', 'task_FK')), [(newcomer.pk, other.pk)])
+
+    def test_mark_all_read_and_unread_count(self):
+        user = self.collaborators[0]
+        TaskStatus.objects.create(task_FK=self.task, status='DONE', user_FK=self.admin)
+        self.client.force_authenticate(user)
+        self.assertEqual(self.client.get('/api/notification/unread-count/').data, {'unread': 1})
+        self.assertEqual(self.client.post('/api/notification/mark-all-read/').data, {'updated': 1})
+        self.assertEqual(self.client.get('/api/notification/unread-count/').data, {'unread': 0})
+        # Os outros destinatários continuam com a deles
+        self.assertEqual(Notification.objects.filter(notification_read=False).count(), 2)
+
+
+class QueryPlanAuditTests(TaskFixturesMixin, APITestCase):
+    def test_hot_queries_use_indexes(self):
+        self.create_tasks(2)
+        reports = {report.name: report for report in audit()}
+        self.assertEqual({name: report.full_scans for name, report in reports.items() if report.full_scans}, {})
+        self.assertIn('core_task_creator_created_idx', ' '.join(reports['task_list_own'].plan))
+        self.assertIn('core_status_task_date_idx', ' '.join(reports['task_latest_status'].plan))
+
+        out = io.StringIO()
+        call_command('audit_queries', '--fail-on-scan', stdout=out)
+        self.assertIn('equipment_by_code: ok', out.getvalue())
+
+    def test_equipment_code_is_unique(self):
+        Equipment.objects.create(name='Bomba', code='EQ-DUP', description='-')
+        response = self.client.post('/api/equipment/', {'name': 'Outra', 'code': 'EQ-DUP', 'description': '-'},
+                                    format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('code', response.data)
+
+
+class SearchTests(TaskFixturesMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.task, self.other = self.create_tasks(2)
+        Task.objects.filter(pk=self.task.pk).update(name='Manutenção da bomba d\'água', description='Vazamento')
+        TaskStatus.objects.create(task_FK=self.other, status='ONGOING', comment='Aguardando peça do compressor')
+        Equipment.objects.create(name='Compressor', code='CMP-900', description='Ar condicionado central')
+
+    def search(self, q, **params):
+        response = self.client.get('/api/search/', {'q': q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [(result['type'], result['id']) for result in response.data['results']]
+
+    def test_prefix_and_accent_insensitive_match(self):
+        self.assertEqual(self.search('manutencao'), [('task', self.task.pk)])
+        self.assertEqual(self.search('MANUT bom'), [('task', self.task.pk)])
+        self.assertEqual(self.search('agua bomba'), [('task', self.task.pk)])
+        self.assertEqual(self.search('"; DROP'), [])
+
+    def test_ranks_across_tasks_statuses_and_equipment(self):
+        results = self.search('compress')
+        self.assertEqual({kind for kind, _ in results}, {'task_status', 'equipment'})
+        # O nome do equipamento pesa mais que o comentário
+        self.assertEqual(results[0][0], 'equipment')
+        self.assertEqual(self.search('cmp 900'), [('equipment', Equipment.objects.get(code='CMP-900').pk)])
+        self.assertEqual(self.search('compress', type='task_status'), [('task_status', results[1][1])])
+
+    def test_index_follows_bulk_writes_and_deletes(self):
+        Task.objects.filter(pk=self.other.pk).update(name='Troca de lâmpadas')
+        self.assertEqual(self.search('lampada'), [('task', self.other.pk)])
+        self.assertEqual(self.search('chamado', type='task'), [])
+        self.other.delete()
+        self.assertEqual(self.search('lampada'), [])
+
+    def test_collaborator_only_finds_own_tasks(self):
+        collaborator = CustomUser.objects.create_user(email='c@cbm.test', password='x', nif='5', name='C')
+        own, = self.create_tasks(1, creator=collaborator)
+        Task.objects.filter(pk=own.pk).update(name='Bomba do bloco B')
+        self.client.force_authenticate(collaborator)
+        self.assertEqual(self.search('bomba'), [('task', own.pk)])
+
+
+class EquipmentScanTests(TaskFixturesMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.open_task, self.closed_task = self.create_tasks(2)
+        self.equipment = self.open_task.equipments_FK.get()
+        self.closed_task.equipments_FK.add(self.equipment)
+        TaskStatus.objects.create(task_FK=self.closed_task, status='DONE', user_FK=self.admin)
+
+    def test_resolves_by_code_or_pk_with_open_tasks(self):
+        # Equipamento (com ambiente e categoria) + Prefetch dos chamados em aberto
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/equipment/scan/{self.equipment.code}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['environment_FK'], {'id': self.environment.pk, 'name': 'Bloco A'})
+        self.assertEqual([task['id'] for task in response.data['open_tasks']], [self.open_task.pk])
+        self.assertEqual(response.data['open_tasks'][0]['status'], 'OPEN')
+
+        with self.assertNumQueries(2):
+            by_pk = self.client.get(f'/api/equipment/scan/{self.equipment.pk}/')
+        self.assertEqual(by_pk.data['id'], self.equipment.pk)
+        self.assertEqual(self.client.get('/api/equipment/scan/NAO-EXISTE/').status_code, 404)
+
+    def test_etag_follows_task_changes(self):
+        url = f'/api/equipment/scan/{self.equipment.code}/'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        TaskStatus.objects.create(task_FK=self.open_task, status='DONE', user_FK=self.admin)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['open_tasks'], [])
+
+    def test_collaborator_sees_only_own_open_tasks(self):
+        collaborator = CustomUser.objects.create_user(email='c@cbm.test', password='x', nif='6', name='C')
+        self.client.force_authenticate(collaborator)
+        response = self.client.get(f'/api/equipment/scan/{self.equipment.code}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['open_tasks'], [])
+
+
+class SparseFieldsTests(TaskFixturesMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.create_tasks(3)
+
+    def get(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response, [query['sql'] for query in queries.captured_queries]
+
+    def test_default_output_is_unchanged(self):
+        response, _ = self.get('/api/task/')
+        task = response.data['results'][0]
+        self.assertEqual(list(task), ['id', 'name', 'description', 'suggested_date', 'urgency_level',
+                                      'creation_date', 'current_status', 'last_status_date', 'creator_FK',
+                                      'equipments_FK', 'responsibles_FK', 'status_history'])
+        self.assertEqual(task['creator_FK']['groups'], [])
+        self.assertEqual(task['equipments_FK'][0]['environment_FK']['name'], 'Bloco A')
+        self.assertEqual(len(task['status_history'][0]['images']), 1)
+
+    def test_fields_prune_payload_and_queries(self):
+        response, queries = self.get('/api/task/', fields='id,name,current_status', page_size=2)
+        self.assertEqual(list(response.data['results'][0]), ['id', 'name', 'current_status'])
+        # O cursor continua funcionando com as colunas adiadas
+        next_page = self.client.get(response.data['next'])
+        self.assertEqual(len(next_page.data['results']), 1)
+        self.assertFalse([sql for sql in queries if 'core_taskstatusimage' in sql or 'auth_group' in sql])
+        task_select = next(sql for sql in queries if sql.startswith('SELECT "core_task"."id"'))
+        self.assertNotIn('"core_task"."description"', task_select)
+
+    def test_expand_collapses_other_relations_to_ids(self):
+        response, queries = self.get('/api/task/', expand='creator_FK', fields='id,creator_FK.name,equipments_FK,status_history')
+        task = response.data['results'][0]
+        self.assertEqual(task['creator_FK'], {'name': 'Admin'})
+        self.assertTrue(all(isinstance(pk, int) for pk in task['equipments_FK'] + task['status_history']))
+        self.assertFalse([sql for sql in queries if 'core_environment' in sql and 'JOIN' in sql])
+
+        response, _ = self.get('/api/task/', expand='equipments_FK.environment_FK', fields='id,equipments_FK')
+        equipment = response.data['results'][0]['equipments_FK'][0]
+        self.assertEqual(equipment['environment_FK'], {'id': self.environment.pk, 'name': 'Bloco A'})
+        self.assertEqual(equipment['category_FK'], self.category.pk)
+
+    def test_other_endpoints_and_writes(self):
+        response, queries = self.get('/api/equipment/', fields='id,code,environment_FK', expand='')
+        self.assertEqual(list(response.data[0]), ['id', 'code', 'environment_FK'])
+        self.assertEqual(response.data[0]['environment_FK'], self.environment.pk)
+        self.assertFalse([sql for sql in queries if 'JOIN' in sql])
+
+        response, _ = self.get('/api/task-status/', fields='id,status,images', expand='')
+        self.assertEqual(list(response.data[0]), ['id', 'status', 'images'])
+        self.assertTrue(all(isinstance(pk, int) for pk in response.data[0]['images']))
+
+        # Na escrita os parâmetros são ignorados
+        task = Task.objects.first()
+        response = self.client.post('/api/task-status/?fields=id', {'task_FK': task.pk, 'status': 'DONE'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertIn('status_date', response.data)
+
+
+
+class FastReadTests(TaskFixturesMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.create_tasks(3)
+        # Grupos criados fora da ordem de id, usuário sem grupos, criador nulo e separador de linha no texto
+        technicians, managers = Group.objects.create(name='Técnico'), Group.objects.create(name='Gestão')
+        self.admin.groups.add(managers, technicians)
+        other = CustomUser.objects.create_user(email='outro@cbm.test', password='senha-forte-123',
+                                               nif='000000002', name='Outro')
+        orphan = self.create_tasks(1, creator=other)[0]
+        orphan.description = 'linha\u2028quebra "aspas" ç'
+        orphan.creator_FK = None
+        orphan.save()
+        orphan.responsibles_FK.add(self.admin)
+        status = orphan.TaskStatus_task_FK.get()
+        status.user_FK = None
+        status.save()
+        TaskStatusImage.objects.create(task_status_FK=status, image='task_images/a.jpg',
+                                       thumbnail='task_images/a_thumb.jpg', processed=True)
+        TaskStatus.objects.create(task_FK=orphan, user_FK=self.admin, status='DONE', comment='ok')
+        Equipment.objects.create(name='Sem ambiente', code='EQ-SOLO', description='-')
+        Notification.objects.create(text='Aviso\u2029', task_FK=orphan, user_FK=self.admin)
+        Notification.objects.create(text='Outro', task_FK=orphan, user_FK=None, notification_read=True)
+
+    def assertSameBytes(self, url, **params):
+        fast = self.client.get(url, params)
+        with override_settings(FAST_READ={'ENABLED': False}):
+            slow = self.client.get(url, params)
+        self.assertEqual(fast.status_code, 200)
+        self.assertEqual(fast.content, slow.content)
+        return fast
+
+    def test_lists_match_serializer_output(self):
+        for url in ('/api/task/', '/api/equipment/', '/api/notification/'):
+            with self.subTest(url=url):
+                response = self.assertSameBytes(url)
+                self.assertIn(b'\\u2028' if url == '/api/task/' else b'"id"', response.content)
+        self.assertIn(b'\\u2029', self.assertSameBytes('/api/notification/').content)
+
+    def test_filters_ordering_and_pagination(self):
+        self.assertSameBytes('/api/task/', ordering='current_status')
+        response = self.assertSameBytes('/api/task/', page_size=2)
+        self.assertSameBytes(response.json()['next'])
+        self.assertSameBytes('/api/task/', fields='id,name', expand='')
+
+    def test_fast_path_skips_model_instances(self):
+        # Nenhuma instância de Task/TaskStatus é criada para montar a listagem
+        with mock.patch.object(Task, 'from_db', side_effect=AssertionError), \
+                mock.patch.object(TaskStatus, 'from_db', side_effect=AssertionError):
+            response = self.client.get('/api/task/')
+        self.assertEqual(len(response.json()['results']), 4)
+
+    def test_renderer_matches_drf(self):
+        from rest_framework.renderers import JSONRenderer
+        from .renderers import FastJSONRenderer
+
+        data = {'texto': 'á\u2028b\u2029c "d"', 'data': timezone.now(), 'lista': [1, None, True],
+                'inteiro': 10 ** 30, 'chaves': {1: 'a'}}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+class CompressionTests(TaskFixturesMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.create_tasks(5)
+
+    def test_negotiation(self):
+        codecs = [ZstdCodec(3), BrotliCodec(5), GzipCodec(6)]
+        self.assertIsNone(negotiate('', codecs))
+        self.assertIsNone(negotiate('identity', codecs))
+        self.assertEqual(negotiate('gzip, br', codecs).name, 'br')
+        self.assertEqual(negotiate('gzip, br;q=0.5', codecs).name, 'gzip')
+        self.assertEqual(negotiate('*, zstd;q=0', codecs).name, 'br')
+        self.assertIsNone(negotiate('gzip;q=0', codecs))
+
+    def test_large_json_is_compressed(self):
+        plain = self.client.get('/api/task/')
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertIn('Accept-Encoding', plain['Vary'])
+
+        response = self.client.get('/api/task/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertTrue(response['ETag'].startswith('W/'))
+        # O ETag fraco continua valendo para o 304
+        again = self.client.get('/api/task/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, 304)
+
+    def test_small_and_binary_responses_are_not_compressed(self):
+        response = self.client.get('/api/notification/unread-count/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', response)
+        with override_settings(COMPRESSION={'ENABLED': False}):
+            response = self.client.get('/api/task/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', response)
+
+    def test_streaming_export_is_compressed(self):
+        plain = b''.join(self.client.get('/api/task/export/', {'output': 'ndjson'}).streaming_content)
+        response = self.client.get('/api/task/export/', {'output': 'ndjson'}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), plain)
+
+    def test_cached_responses_are_stored_compressed(self):
+        self.create_tasks(20)
+        miss = self.client.get('/api/equipment/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(miss['X-Cache'], 'MISS')
+        self.assertEqual(miss['Content-Encoding'], 'gzip')
+
+        # No acerto o corpo comprimido sai do cache, sem passar pelo compressor
+        with mock.patch.object(zlib, 'compressobj', side_effect=AssertionError):
+            hit = self.client.get('/api/equipment/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(hit['X-Cache'], 'HIT')
+        self.assertEqual(hit.content, miss.content)
+        self.assertEqual(gzip.decompress(hit.content), self.client.get('/api/equipment/').content)
+
+
+class SQLiteTuningTests(APITestCase):
+    def setUp(self):
+        caches_override = override_settings(CACHES=locmem_caches(self.id()))
+        caches_override.enable()
+        self.addCleanup(caches_override.disable)
+
+    def test_connection_pragmas(self):
+        with connection.cursor() as cursor:
+            values = {name: cursor.execute(f'PRAGMA {name}').fetchone()[0]
+                      for name in ('busy_timeout', 'synchronous', 'cache_size')}
+        self.assertEqual(values, {'busy_timeout': 5000, 'synchronous': 1, 'cache_size': -32000})
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+    def test_lock_errors_are_retried(self):
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise OperationalError('database is locked')
+            return 'ok'
+
+        with mock.patch('core.retry.time.sleep') as sleep, self.assertLogs('core.retry', 'WARNING'):
+            self.assertEqual(call_with_retry(flaky), 'ok')
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(sleep.call_count, 2)
+
+        calls.clear()
+        with mock.patch('core.retry.time.sleep'), self.assertLogs('core.retry', 'WARNING'), \
+                self.assertRaises(OperationalError):
+            call_with_retry(flaky, attempts=2)
+        with self.assertRaises(OperationalError):
+            call_with_retry(mock.Mock(side_effect=OperationalError('no such table: x'), __qualname__='x'))
+
+    def test_no_retry_inside_outer_transaction(self):
+        func = mock.Mock(side_effect=OperationalError('database is locked'), __qualname__='func')
+        # Os testes já rodam dentro de um atomic(): repetir aqui não adiantaria
+        with self.assertRaises(OperationalError):
+            retry_on_lock(func)()
+        self.assertEqual(func.call_count, 1)
+
+    def test_benchmark_runs_both_profiles(self):
+        for profile in ('default', 'tuned'):
+            result = run_benchmark(profile, threads=2, seconds=0.2, rows=50)
+            self.assertGreater(result.reads + result.writes, 0)
+        self.assertEqual(result.errors, 0)
+
+
+class ReadReplicaRoutingTests(TaskFixturesMixin, APITestCase):
+    """
+    Nos testes a réplica é um espelho do default (mesmo banco), então não há
+    roteamento de verdade: forçamos o alias e registramos para onde cada
+    leitura iria, deixando a query em si no default.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.create_tasks(2)
+        patcher = mock.patch('core.db_router.replica_alias', return_value='replica')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def read_aliases(self, request):
+        aliases = []
+
+        def record(router, model, **hints):
+            aliases.append(read_alias.get())
+
+        with mock.patch.object(ReadReplicaRouter, 'db_for_read', record):
+            response = request()
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertLess(response.status_code, 400)
+        return set(aliases)
+
+    def test_router(self):
+        self.assertIsNone(ReadReplicaRouter().db_for_read(Task))
+        with use_replica():
+            self.assertEqual(Task.objects.all().db, 'replica')
+            self.assertEqual(router.db_for_write(Task), 'default')
+        self.assertEqual(Task.objects.all().db, 'default')
+        self.assertFalse(ReadReplicaRouter().allow_migrate('replica', 'core'))
+
+    def test_same_database_is_not_a_replica(self):
+        # replica_alias importado no módulo é o original (sem o patch)
+        self.assertIsNone(replica_alias())
+
+    def test_list_reports_and_exports_read_from_replica(self):
+        self.assertEqual(self.read_aliases(lambda: self.client.get('/api/task/')), {'replica'})
+        self.assertEqual(self.read_aliases(lambda: self.client.get('/api/reports/summary/')), {'replica'})
+        self.assertEqual(self.read_aliases(lambda: self.client.get('/api/task/export/')), {'replica'})
+        # Views sem replica_actions (ou ações fora delas) continuam no default
+        self.assertEqual(self.read_aliases(lambda: self.client.get('/api/task-status/')), {None})
+        self.assertIsNone(read_alias.get())
+
+    def test_pin_uses_the_shared_cache(self):
+        # Fora dos testes é um cache em arquivo, visto por todos os processos
+        self.assertEqual(project_settings.CACHES['routing']['BACKEND'],
+                         'django.core.cache.backends.filebased.FileBasedCache')
+        self.assertEqual(routing_settings()['CACHE_ALIAS'], 'routing')
+        pin_to_primary(self.admin)
+        self.assertTrue(caches['routing'].get(pin_key(self.admin.pk)))
+        self.assertIsNone(cache.get(pin_key(self.admin.pk)))
+
+    def test_reads_after_own_write_stay_on_primary(self):
+        equipment = Equipment.objects.first()
+        aliases = self.read_aliases(lambda: self.client.post('/api/task/', {
+            'name': 'Novo', 'description': '-', 'suggested_date': timezone.now().isoformat(),
+            'equipments_FK': [equipment.pk],
+        }, format='json'))
+        self.assertEqual(aliases, {None})
+        self.assertEqual(self.read_aliases(lambda: self.client.get('/api/task/')), {None})
+
+        # Passado o PIN_SECONDS (aqui: pin apagado), volta para a réplica
+        caches['routing'].delete(pin_key(self.admin.pk))
+        self.assertEqual(self.read_aliases(lambda: self.client.get('/api/task/')), {'replica'})
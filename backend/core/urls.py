@@ -1,3 +1,4 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 
 from .views import *
@@ -12,4 +13,11 @@ router.register(r'task-status', TaskStatusView, basename='taskstatus')
 router.register(r'task-status-image', TaskStatusImageView, basename='taskstatusimage')
 router.register(r'task',TaskView, basename='task')
 
-urlpatterns = router.urls
\ No newline at end of file
+urlpatterns = router.urls + [
+    path('reports/summary/', ReportSummaryView.as_view(), name='reports-summary'),
+    path('reports/daily/', ReportDailyView.as_view(), name='reports-daily'),
+    path('sync/', SyncView.as_view(), name='sync'),
+    path('events/', EventStreamView.as_view(), name='events'),
+    path('events/ticket/', EventTicketView.as_view(), name='events-ticket'),
+    path('search/', SearchView.as_view(), name='search'),
+]
\ No newline at end of file
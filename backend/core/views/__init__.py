@@ -5,9 +5,14 @@ from .task import *
 from .task_status import *
 from .custom_user import *
 from .notification import *
+from .report import *
+from .sync import *
+from .events import *
+from .search import *
 
 __all__ = [
     'CategoryView', 'EnvironmentView', 'EquipmentView', 
     'TaskView', 'TaskStatusView', 'TaskStatusImageView', 
-    'CustomUserView', 'NotificationView'
+    'CustomUserView', 'NotificationView', 'ReportSummaryView', 'ReportDailyView',
+    'SyncView', 'EventStreamView', 'EventTicketView', 'SearchView'
 ]
\ No newline at end of file
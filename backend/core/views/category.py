@@ -2,8 +2,9 @@ from rest_framework.viewsets import ModelViewSet
 from rest_framework import permissions
 from ..models import *
 from ..serializers import *
+from .mixins import ResponseCacheMixin
 
-class CategoryView(ModelViewSet):
+class CategoryView(ResponseCacheMixin, ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [permissions.DjangoModelPermissions]
\ No newline at end of file
@@ -2,8 +2,19 @@ from rest_framework.viewsets import ModelViewSet
 from ..models import *
 from rest_framework import permissions
 from ..serializers import *
+from django.contrib.auth.models import Group
+from ..field_selection import FieldSelection
+from .mixins import ResponseCacheMixin
 
-class CustomUserView(ModelViewSet):
-    queryset = CustomUser.objects.all()
+class CustomUserView(ResponseCacheMixin, ModelViewSet):
+    queryset = CustomUser.objects.prefetch_related('groups')
     serializer_class = CustomUserSerializer
-    permission_classes = [permissions.DjangoModelPermissions]
\ No newline at end of file
+    permission_classes = [permissions.DjangoModelPermissions]
+    # O serializer lista os nomes dos grupos
+    validator_related_models = (Group,)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ['list', 'retrieve'] and not FieldSelection.from_request(self.request).includes('groups'):
+            queryset = queryset.prefetch_related(None)
+        return queryset
\ No newline at end of file
@@ -2,8 +2,9 @@ from rest_framework.viewsets import ModelViewSet
 from ..models import *
 from ..serializers import *
 from rest_framework import permissions
+from .mixins import ResponseCacheMixin
 
-class EnvironmentView(ModelViewSet):
+class EnvironmentView(ResponseCacheMixin, ModelViewSet):
     queryset = Environment.objects.all()
     serializer_class = EnvironmentSerializer
     permission_classes = [permissions.DjangoModelPermissions]
\ No newline at end of file
@@ -1,9 +1,155 @@
+from django.db import models
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 from ..models import *
 from ..serializers import *
+from ..jobs import equipment_qr_data
+from ..labels import LABELS_PER_PAGE, equipment_labels, iter_pages, page_png, stream_pdf
+from ..field_selection import FieldSelection
+from ..models.task_status import CLOSED_STATUSES
+from .mixins import BulkWriteMixin, FastListMixin, ResponseCacheMixin
+from ..signals import equipments_bulk_created, equipments_bulk_updated
+from ..qr import ERROR_CORRECTION_LEVELS, qr_cache, qr_cache_key, qr_options, qr_settings
 from rest_framework import permissions
 
-class EquipmentView(ModelViewSet):
-    queryset = Equipment.objects.all()
+class EquipmentView(ResponseCacheMixin, FastListMixin, BulkWriteMixin, ModelViewSet):
+    queryset = Equipment.objects.select_related('environment_FK', 'category_FK')
+    validator_related_models = (Environment, Category)
     serializer_class = EquipmentSerializer
-    permission_classes = [permissions.DjangoModelPermissions]
\ No newline at end of file
+    permission_classes = [permissions.DjangoModelPermissions]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        selection = FieldSelection.from_request(self.request)
+        if self.action in ['list', 'retrieve'] and not selection.is_default:
+            # Ambiente/categoria devolvidos como id (ou fora da resposta) não precisam do JOIN
+            related = [name for name in ('environment_FK', 'category_FK') if selection.loads(name)]
+            queryset = queryset.select_related(None).select_related(*related)
+        return queryset
+
+    def perform_bulk_create(self, validated_data):
+        equipments = super().perform_bulk_create(validated_data)
+        equipments_bulk_created(equipments)
+        return equipments
+
+    def perform_bulk_update(self, pairs):
+        equipments = super().perform_bulk_update(pairs)
+        equipments_bulk_updated(equipments)
+        return equipments
+
+    @action(detail=False, methods=['get'], url_path=r'scan/(?P<ref>[^/]+)')
+    def scan(self, request, ref=None):
+        """
+        Leitura do QR em campo: GET /api/equipment/scan/<código ou id>/.
+        Devolve o equipamento com ambiente, categoria e os chamados em aberto
+        (visíveis ao usuário) com o status atual (o cache current_status da
+        tarefa), em duas queries indexadas: o equipamento pelo código único ou
+        pk (com JOIN em ambiente e categoria) e o Prefetch dos chamados pela
+        tabela M2M. O ETag muda quando o equipamento, ambiente, categoria ou
+        algum desses chamados muda; 304 não serializa nada.
+        """
+        match = models.Q(code=ref)
+        if ref.isdigit():
+            match |= models.Q(pk=int(ref))
+        open_tasks = (Task.objects.visible_to(request.user)
+                      .exclude(current_status__in=CLOSED_STATUSES)
+                      .order_by('-last_status_date', '-id')
+                      .only('id', 'name', 'urgency_level', 'current_status', 'last_status_date', 'updated_at'))
+        equipment = (
+            self.get_queryset().filter(match)
+            .prefetch_related(models.Prefetch('task_set', queryset=open_tasks, to_attr='open_tasks'))
+            # O código tem prioridade sobre um pk com o mesmo valor
+            .order_by(models.Case(models.When(code=ref, then=0), default=1))
+            .first()
+        )
+        if equipment is None:
+            raise Http404
+        open_tasks = equipment.open_tasks
+
+        related = [item for item in (equipment.environment_FK, equipment.category_FK) if item]
+        changes = [equipment.updated_at, *[item.updated_at for item in related],
+                   *[task.updated_at for task in open_tasks]]
+        etag = self.make_etag([
+            'scan', request.user.pk, request.user.is_superuser or request.user.is_technician,
+            equipment.pk, *[value.isoformat() for value in changes], *[task.pk for task in open_tasks],
+        ])
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return self.set_validator_headers(not_modified, etag)
+
+        serializer = EquipmentScanSerializer(equipment, context={'request': request})
+        return self.set_validator_headers(Response(serializer.data), etag)
+
+    # Público: o QR só codifica a URL do equipamento e é usado direto em <img>
+    @action(detail=True, methods=['get'], permission_classes=[permissions.AllowAny])
+    def qr(self, request, pk=None):
+        """
+        PNG do QR do equipamento, gerado sob demanda e servido do cache.
+        Opções: ?size=<1-40> (tamanho do módulo) e ?ec=L|M|Q|H (correção de erro).
+        """
+        equipment = self.get_object()
+
+        size = request.query_params.get('size', '')
+        level = request.query_params.get('ec', '').upper()
+        options = qr_options(
+            box_size=min(max(int(size), 1), 40) if size.isdigit() else None,
+            error_correction=level if level in ERROR_CORRECTION_LEVELS else None,
+        )
+        data = equipment_qr_data(equipment.pk)
+
+        # O ETag é o próprio hash do conteúdo: dá para responder 304 sem renderizar
+        etag = f'"{qr_cache_key(data, options)}"'
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            _, png = qr_cache.get(data, options)
+            response = HttpResponse(png, content_type='image/png')
+        response['ETag'] = etag
+        response['Cache-Control'] = f"public, max-age={qr_settings()['MAX_AGE']}"
+        return response
+
+
+    @action(detail=False, methods=['get'])
+    def labels(self, request):
+        """
+        Folha de etiquetas dos equipamentos de um ambiente e/ou categoria.
+        ?environment=<id>&category=<id>&output=pdf (todas as páginas, em streaming)
+        ou output=png&page=<n> (uma página). Não usamos ?format= porque o DRF
+        reserva esse parâmetro para escolher o renderer.
+        """
+        params = request.query_params
+        if not params.get('environment') and not params.get('category'):
+            raise ValidationError({'detail': 'Informe environment e/ou category.'})
+
+        equipments = Equipment.objects.order_by('environment_FK', 'category_FK', 'pk')
+        try:
+            if params.get('environment'):
+                equipments = equipments.filter(environment_FK=int(params['environment']))
+            if params.get('category'):
+                equipments = equipments.filter(category_FK=int(params['category']))
+            page_number = int(params.get('page', 1))
+        except ValueError:
+            raise ValidationError({'detail': 'environment, category e page devem ser inteiros.'})
+
+        if not equipments.exists():
+            raise Http404
+        # Renderização no próprio processo: um pool por request num servidor com
+        # threads e conexões abertas multiplicaria processos (o pool fica para o
+        # comando generate_labels e para a fila de jobs)
+        workers = 1
+
+        if params.get('output', 'pdf') == 'png':
+            offset = (max(page_number, 1) - 1) * LABELS_PER_PAGE
+            page = next(iter_pages(equipment_labels(equipments[offset:offset + LABELS_PER_PAGE]), workers), None)
+            if page is None:
+                raise Http404
+            return HttpResponse(page_png(page), content_type='image/png')
+
+        response = StreamingHttpResponse(
+            stream_pdf(iter_pages(equipment_labels(equipments), workers)), content_type='application/pdf'
+        )
+        response['Content-Disposition'] = 'attachment; filename="etiquetas.pdf"'
+        return response
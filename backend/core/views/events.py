@@ -0,0 +1,70 @@
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework import exceptions, permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..authentication import CachedTokenAuthentication
+from ..events import broker, events_settings, issue_ticket, redeem_ticket
+
+
+def authenticate_stream(request):
+    """
+    Ticket de uso único por ?ticket= (o EventSource do navegador não envia
+    headers; ver EventTicketView) ou o token da API no header Authorization.
+    O token não é aceito na URL. Devolve (id do usuário, vê todos os chamados).
+    """
+    if request.GET.get('ticket'):
+        redeemed = redeem_ticket(request.GET['ticket'])
+        if redeemed is None:
+            raise exceptions.AuthenticationFailed('Ticket inválido, expirado ou já usado.')
+        return redeemed
+    result = CachedTokenAuthentication().authenticate(request)
+    if result is None:
+        raise exceptions.NotAuthenticated()
+    user, _ = result
+    return user.pk, user.is_superuser or user.is_technician
+
+
+class EventTicketView(APIView):
+    """
+    POST /api/events/ticket/: troca o token (header) por um ticket curto e de
+    uso único para abrir /api/events/?ticket=.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        return Response({'ticket': issue_ticket(request.user), 'expires_in': events_settings()['TICKET_SECONDS']})
+
+
+class EventStreamView(View):
+    """
+    GET /api/events/: Server-Sent Events com as notificações do usuário e as
+    mudanças de status dos chamados que ele enxerga (ver core/events.py).
+
+    A view é assíncrona: rodando sob ASGI (config/asgi.py, servido pelo
+    uvicorn de startup.sh) cada conexão ociosa é só uma fila no event loop.
+    Sob WSGI o StreamingHttpResponse consumiria o stream inteiro (que não
+    termina) antes de enviar algo, prendendo uma thread para sempre: a view
+    responde 503. HEAD é a sondagem que o frontend faz antes de abrir o
+    EventSource.
+    """
+
+    async def head(self, request):
+        return HttpResponse(status=204 if isinstance(request, ASGIRequest) else 503)
+
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            return JsonResponse({'detail': 'Eventos em tempo real exigem o servidor ASGI.'}, status=503)
+        try:
+            user_id, sees_all = await sync_to_async(authenticate_stream)(request)
+        except exceptions.APIException as exc:
+            return JsonResponse({'detail': str(exc.detail)}, status=exc.status_code)
+
+        response = StreamingHttpResponse(broker.stream(user_id, sees_all), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Desliga o buffer de proxies (nginx) para os eventos saírem na hora
+        response['X-Accel-Buffering'] = 'no'
+        return response
@@ -0,0 +1,389 @@
+import hashlib
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers, quote_etag
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
+
+from .. import db_router, fast_read, response_cache
+from ..compression import compress_variants
+from ..field_selection import FieldSelection
+from ..renderers import FastJSONRenderer
+from ..retry import retry_on_lock
+
+
+class BulkWriteMixin:
+    """
+    Adiciona /<recurso>/bulk/ a um ModelViewSet:
+    POST  [{...}, ...]            cria todos com bulk_create
+    PATCH [{"id": 1, ...}, ...]   atualiza todos com bulk_update
+    Tudo é validado antes (serializer com many=True) e gravado numa única transação.
+
+    Os sinais de post_save não disparam em operações em lote; as views que
+    dependem deles sobrescrevem perform_bulk_create/perform_bulk_update e
+    aplicam os efeitos colaterais de uma vez para o lote inteiro.
+    """
+    bulk_max_size = 1000
+
+    @action(detail=False, methods=['post', 'patch'], url_path='bulk')
+    def bulk(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError({'detail': 'Envie uma lista de objetos.'})
+        if len(items) > self.bulk_max_size:
+            raise ValidationError({'detail': f'Envie no máximo {self.bulk_max_size} objetos por vez.'})
+
+        if request.method == 'POST':
+            return self.create_many(items)
+        return self.update_many(items)
+
+    def create_many(self, items):
+        serializer = self.get_serializer(data=items, many=True)
+        serializer.is_valid(raise_exception=True)
+        self.check_unique_in_batch(serializer.validated_data)
+        self.validate_bulk(serializer.validated_data)
+        instances = self.write_atomic(self.perform_bulk_create, serializer.validated_data)
+        data = self.get_serializer(self.reload_for_response(instances), many=True).data
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    def update_many(self, items):
+        ids = [item.get('id') if isinstance(item, dict) else None for item in items]
+        if not all(isinstance(pk, int) for pk in ids):
+            raise ValidationError({'detail': 'Cada objeto precisa de um "id" inteiro.'})
+
+        # Só atualiza o que o usuário pode ver (mesma regra do get_queryset)
+        instances = self.get_queryset().in_bulk(ids)
+        missing = [pk for pk in ids if pk not in instances]
+        if missing:
+            raise ValidationError({'detail': f'Objetos não encontrados: {missing}.'})
+
+        serializers = [
+            self.get_serializer(instances[item['id']], data=item, partial=True) for item in items
+        ]
+        errors = [serializer.errors if not serializer.is_valid() else {} for serializer in serializers]
+        if any(errors):
+            raise ValidationError(errors)
+        self.check_unique_in_batch([serializer.validated_data for serializer in serializers])
+        self.validate_bulk([serializer.validated_data for serializer in serializers],
+                           [serializer.instance for serializer in serializers])
+
+        updated = self.write_atomic(
+            self.perform_bulk_update, [(serializer.instance, serializer.validated_data) for serializer in serializers]
+        )
+        return Response(self.get_serializer(self.reload_for_response(updated), many=True).data)
+
+    def validate_bulk(self, values, instances=None):
+        """
+        Validação do lote inteiro antes de gravar (ex.: acesso aos objetos
+        relacionados). `instances` vem só no PATCH, alinhado com `values`.
+        """
+
+    def check_unique_in_batch(self, values):
+        """
+        Os UniqueValidator do serializer comparam cada item só com o banco;
+        um valor de campo único repetido dentro do próprio lote é recusado aqui.
+        """
+        model = self.get_queryset().model
+        unique = [field.name for field in model._meta.concrete_fields if field.unique and not field.primary_key]
+        errors = [{} for _ in values]
+        for name in unique:
+            seen = {}
+            for index, data in enumerate(values):
+                value = data.get(name)
+                if value is None or value == '':
+                    continue
+                if value in seen:
+                    errors[index][name] = [f'Valor repetido no lote (igual ao item {seen[value]}).']
+                else:
+                    seen[value] = index
+        if any(errors):
+            raise ValidationError(errors)
+
+    def write_atomic(self, operation, *args):
+        """
+        Grava o lote numa transação, repetida inteira se o banco estiver ocupado (ver core/retry.py).
+        """
+        try:
+            return retry_on_lock(transaction.atomic()(operation))(*args)
+        except IntegrityError:
+            # Outra escrita gravou o mesmo valor único entre a validação e o commit
+            raise ValidationError({'detail': 'O lote conflita com dados já gravados; nada foi salvo.'})
+
+    def reload_for_response(self, instances):
+        """
+        Relê o lote com as relações pré-carregadas para serializar a resposta
+        sem uma query por objeto.
+        """
+        queryset = self.get_queryset()
+        names = [field.name for field in queryset.model._meta.many_to_many]
+        return list(queryset.filter(pk__in=[instance.pk for instance in instances])
+                    .prefetch_related(*names).order_by('pk'))
+
+    def perform_bulk_create(self, validated_data, **extra):
+        model = self.get_queryset().model
+        many_to_many = {field.name: field for field in model._meta.many_to_many}
+
+        objects, relations = [], []
+        for data in validated_data:
+            data = {**data, **extra}
+            relations.append({name: data.pop(name) for name in many_to_many if name in data})
+            objects.append(model(**data))
+        objects = model.objects.bulk_create(objects)
+
+        self.bulk_set_many_to_many(many_to_many, list(zip(objects, relations)))
+        return objects
+
+    def perform_bulk_update(self, pairs):
+        model = self.get_queryset().model
+        many_to_many = {field.name: field for field in model._meta.many_to_many}
+
+        fields = set()
+        relations = []
+        for instance, data in pairs:
+            relations.append((instance, {name: data[name] for name in many_to_many if name in data}))
+            for name, value in data.items():
+                if name not in many_to_many:
+                    setattr(instance, name, value)
+                    fields.add(name)
+
+        objects = [instance for instance, _ in pairs]
+        # bulk_update não aciona auto_now (ex.: updated_at); aplicamos aqui
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False):
+                for instance in objects:
+                    field.pre_save(instance, add=False)
+                fields.add(field.name)
+        if fields:
+            model.objects.bulk_update(objects, sorted(fields))
+        self.bulk_set_many_to_many(many_to_many, relations, replace=True)
+        return objects
+
+    def bulk_set_many_to_many(self, many_to_many, relations, replace=False):
+        """
+        Grava as relações M2M do lote direto na tabela intermediária,
+        com um DELETE e um INSERT por campo em vez de um por objeto.
+        """
+        for name, field in many_to_many.items():
+            through = field.remote_field.through
+            source = f'{field.m2m_field_name()}_id'
+            target = f'{field.m2m_reverse_field_name()}_id'
+
+            changed = [(instance, values[name]) for instance, values in relations if name in values]
+            if not changed:
+                continue
+            if replace:
+                through.objects.filter(**{f'{source}__in': [instance.pk for instance, _ in changed]}).delete()
+            through.objects.bulk_create(
+                [through(**{source: instance.pk, target: related.pk})
+                 for instance, related_objects in changed for related in related_objects],
+                ignore_conflicts=True,
+            )
+
+
+class ReplicaReadMixin:
+    """
+    Lê da réplica (ver core/db_router.py) nas ações de `replica_actions`:
+    nomes de ação num ViewSet ('list', 'retrieve', 'export') ou o método em
+    minúsculas numa APIView ('get'). Só vale para GET/HEAD e para quem não
+    escreveu nos últimos DATABASE_ROUTING['PIN_SECONDS']. O corpo de
+    respostas em streaming também é lido da réplica.
+    """
+    replica_actions = ('list', 'retrieve')
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        alias = db_router.replica_alias()
+        if alias and self.reads_from_replica(request):
+            self._replica_route = db_router.read_alias.set(alias)
+
+    def reads_from_replica(self, request):
+        action = getattr(self, 'action', None) or request.method.lower()
+        return (request.method in ('GET', 'HEAD') and action in self.replica_actions
+                and not db_router.is_pinned(request.user))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        route = self.__dict__.pop('_replica_route', None)
+        if route is not None:
+            alias = db_router.read_alias.get()
+            db_router.read_alias.reset(route)
+            if response.streaming and not response.is_async:
+                response.streaming_content = db_router.iterate_on(alias, response.streaming_content)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class FastListMixin:
+    """
+    Listagem pelo caminho rápido (ver core/fast_read.py): as linhas vêm de
+    values() e são montadas pelo plano compilado do serializer, sem criar
+    instâncias nem passar campo a campo pelo DRF. O JSON sai pelo
+    FastJSONRenderer. A saída é a mesma do serializer.
+
+    Com ?fields=/?expand=, na API navegável ou se o serializer tiver um campo
+    que o plano não monta, a listagem segue pelo caminho normal.
+    """
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    def list(self, request, *args, **kwargs):
+        if (not fast_read.fast_read_settings()['ENABLED'] or request.accepted_renderer.format != 'json'
+                or not FieldSelection.from_request(request).is_default):
+            return super().list(request, *args, **kwargs)
+        try:
+            plan = fast_read.bind(self.get_serializer_class(), request)
+        except fast_read.UnsupportedField:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = plan.values(queryset, extra=self.get_pagination_columns(queryset))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(plan.render(page))
+        return Response(plan.render(rows))
+
+    def get_pagination_columns(self, queryset):
+        """
+        Colunas da ordenação que a paginação por cursor lê de cada linha.
+        """
+        paginator = self.paginator
+        if paginator is None or not hasattr(paginator, 'get_ordering'):
+            return ()
+        return [name.lstrip('-') for name in paginator.get_ordering(self.request, queryset, self)]
+
+
+class ConditionalGetMixin:
+    """
+    ETag em list e retrieve de um ModelViewSet.
+
+    A versão da resposta junta um aggregate (count + max(updated_at)) sobre o
+    queryset já filtrado, as versões dos models aninhados no payload
+    (validator_related_models, lidas do cache de core/response_cache.py, sem
+    query), o escopo de visibilidade do usuário e a URL. Se o cliente já tem
+    essa versão, a resposta é 304 sem buscar nem serializar os objetos.
+
+    Não há Last-Modified: max(updated_at) não muda quando uma linha é
+    excluída nem em duas alterações no mesmo segundo, e um If-Modified-Since
+    sozinho receberia um 304 desatualizado.
+    """
+    # Models aninhados no serializer: alterar um deles também muda a resposta
+    validator_related_models = ()
+
+    def list(self, request, *args, **kwargs):
+        queryset = self._filtered_queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional_response(queryset, super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        self._filtered_queryset = self.filter_queryset(self.get_queryset())
+        try:
+            queryset = self._filtered_queryset.filter(**{self.lookup_field: lookup})
+        except (TypeError, ValueError, DjangoValidationError):
+            # Mesmo tratamento do get_object(): chave inválida (ex.: /api/task/abc/) é 404
+            raise Http404
+        return self.conditional_response(queryset, super().retrieve, request, *args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        # O ETag e a resposta (list/get_object) usam o mesmo queryset: os filtros rodam uma vez
+        filtered = getattr(self, '_filtered_queryset', None)
+        return filtered if filtered is not None else super().filter_queryset(queryset)
+
+    def get_validator_scope(self):
+        """
+        Parte do ETag que depende de quem pede (respostas filtradas por usuário).
+        """
+        return str(self.request.user.pk)
+
+    def get_etag(self, queryset):
+        stats = queryset.order_by().aggregate(count=Count('pk'), last=Max('updated_at'))
+        parts = [self.get_validator_scope(), self.request.get_full_path(), self.request.accepted_renderer.format,
+                 stats['count'], stats['last'] and stats['last'].isoformat(),
+                 *response_cache.model_versions(self.validator_related_models)]
+        return self.make_etag(parts)
+
+    def make_etag(self, parts):
+        return quote_etag(hashlib.sha256('|'.join(map(str, parts)).encode()).hexdigest()[:32])
+
+    def conditional_response(self, queryset, handler, request, *args, **kwargs):
+        etag = self.get_etag(queryset)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return self.set_validator_headers(not_modified, etag)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code != status.HTTP_200_OK:
+            return response
+        return self.set_validator_headers(response, etag)
+
+    def set_validator_headers(self, response, etag):
+        response['ETag'] = etag
+        # Conteúdo por usuário: caches compartilhados não guardam, o navegador revalida
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ['Authorization'])
+        return response
+
+
+class ResponseCacheMixin(ConditionalGetMixin):
+    """
+    Guarda as respostas JSON de list/retrieve já renderizadas (ver core/response_cache.py).
+
+    A versão da resposta vem só das versões dos models envolvidos (o do
+    queryset e validator_related_models), lidas do cache: num acerto não há
+    query nem serializer, e o ETag sai da mesma chave. Use apenas em views
+    cujo conteúdo não depende do usuário que pede.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        response_cache.CACHED_VIEWS.add(cls.__name__)
+
+    def get_validator_scope(self):
+        return 'shared'
+
+    def get_etag(self, queryset):
+        versions = response_cache.model_versions([queryset.model, *self.validator_related_models])
+        parts = [self.get_validator_scope(), self.request.build_absolute_uri(),
+                 self.request.accepted_renderer.format, *versions]
+        return self.make_etag(parts)
+
+    def conditional_response(self, queryset, handler, request, *args, **kwargs):
+        # A API navegável mostra o usuário logado: só o JSON vai para o cache
+        if not response_cache.response_cache_settings()['ENABLED'] or request.accepted_renderer.format != 'json':
+            return super().conditional_response(queryset, handler, request, *args, **kwargs)
+
+        cache = response_cache.get_cache()
+        view_name = type(self).__name__
+        etag = self.get_etag(queryset)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            response_cache.record(view_name, hit=True)
+            return self.set_validator_headers(not_modified, etag)
+
+        key = 'response:' + etag.strip('"')
+        entry = cache.get(key)
+        if entry is not None:
+            response_cache.record(view_name, hit=True)
+            response = HttpResponse(entry['content'], content_type=entry['content_type'])
+            # Já comprimida em cada codificação: o CompressionMiddleware só escolhe
+            response.precompressed = entry.get('encoded', {})
+            response['X-Cache'] = 'HIT'
+            return self.set_validator_headers(response, etag)
+
+        response_cache.record(view_name, hit=False)
+        response = handler(request, *args, **kwargs)
+        if response.status_code != status.HTTP_200_OK:
+            return response
+        response['X-Cache'] = 'MISS'
+        response.add_post_render_callback(lambda rendered: self.store_response(cache, key, rendered))
+        return self.set_validator_headers(response, etag)
+
+    def store_response(self, cache, key, rendered):
+        rendered.precompressed = compress_variants(rendered.content, rendered['Content-Type'])
+        cache.set(key, {
+            'content': rendered.content,
+            'content_type': rendered['Content-Type'],
+            'encoded': rendered.precompressed,
+        })
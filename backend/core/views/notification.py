@@ -1,9 +1,33 @@
+from django.utils import timezone
 from rest_framework.viewsets import ModelViewSet
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from ..models import *
 from ..serializers import *
 from rest_framework import permissions
+from .mixins import ConditionalGetMixin, FastListMixin
 
-class NotificationView(ModelViewSet):
+class NotificationView(ConditionalGetMixin, FastListMixin, ModelViewSet):
     queryset = Notification.objects.all()
     serializer_class = NotificationSerializer
-    permission_classes = [permissions.DjangoModelPermissions]
\ No newline at end of file
+    permission_classes = [permissions.DjangoModelPermissions]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.user.is_superuser:
+            return queryset
+        return queryset.filter(user_FK=self.request.user)
+
+    @action(detail=False, methods=['post'], url_path='mark-all-read',
+            permission_classes=[permissions.IsAuthenticated])
+    def mark_all_read(self, request):
+        # update() não dispara auto_now; updated_at é gravado para o /api/sync/
+        updated = Notification.objects.filter(user_FK=request.user, notification_read=False).update(
+            notification_read=True, updated_at=timezone.now())
+        return Response({'updated': updated})
+
+    @action(detail=False, methods=['get'], url_path='unread-count',
+            permission_classes=[permissions.IsAuthenticated])
+    def unread_count(self, request):
+        count = Notification.objects.filter(user_FK=request.user, notification_read=False).count()
+        return Response({'unread': count})
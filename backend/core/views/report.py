@@ -0,0 +1,158 @@
+from datetime import timedelta
+
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..models import Task, TaskDailyMetric, URGENCY_LEVELS
+from ..models.task_metric import day_bounds
+from ..models.task_status import CLOSED_STATUSES, CONCLUDED_STATUSES, STATUS
+from ..permissions import IsTechnicianOrSuperuser
+from ..serializers.report import ReportFiltersSerializer
+from .mixins import ReplicaReadMixin
+
+
+def filter_report_tasks(queryset, filters):
+    """
+    Aplica os filtros comuns dos relatórios (período de criação, ambiente e categoria).
+    """
+    through = Task.equipments_FK.through
+    if filters.get('start'):
+        queryset = queryset.filter(creation_date__gte=day_bounds(filters['start'])[0])
+    if filters.get('end'):
+        queryset = queryset.filter(creation_date__lt=day_bounds(filters['end'])[1])
+    if filters.get('environment'):
+        queryset = queryset.filter(pk__in=through.objects.filter(
+            equipment__environment_FK=filters['environment']).values('task_id'))
+    if filters.get('category'):
+        queryset = queryset.filter(pk__in=through.objects.filter(
+            equipment__category_FK=filters['category']).values('task_id'))
+    return queryset
+
+
+def status_counters(prefix=''):
+    """
+    Contadores condicionais (total, abertos, concluídos, cancelados) para um aggregate/annotate.
+    """
+    task_id = f'{prefix}id'
+    status = f'{prefix}current_status'
+    return {
+        'total': Count(task_id, distinct=bool(prefix)),
+        'open': Count(task_id, distinct=bool(prefix), filter=~Q(**{f'{status}__in': CLOSED_STATUSES})),
+        'concluded': Count(task_id, distinct=bool(prefix), filter=Q(**{f'{status}__in': CONCLUDED_STATUSES})),
+        'cancelled': Count(task_id, distinct=bool(prefix), filter=Q(**{status: STATUS.CANCELLED})),
+    }
+
+
+class ReportSummaryView(ReplicaReadMixin, APIView):
+    """
+    Resumo dos chamados calculado no banco (GET /api/reports/summary/).
+    Respeita a mesma visibilidade de /api/task/.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    replica_actions = ('get',)
+
+    def get(self, request):
+        params = ReportFiltersSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = params.validated_data
+
+        tasks = filter_report_tasks(Task.objects.visible_to(request.user), filters)
+
+        summary = tasks.aggregate(**status_counters())
+        by_urgency = dict.fromkeys(URGENCY_LEVELS.values, 0)
+        by_urgency.update(tasks.order_by().values_list('urgency_level').annotate(total=Count('id')))
+        summary['by_urgency'] = by_urgency
+
+        # Quebras opcionais agrupadas pelo ambiente/categoria dos equipamentos da tarefa.
+        # Uma tarefa com equipamentos em vários ambientes conta em cada um deles.
+        links = Task.equipments_FK.through.objects.filter(task__in=tasks).order_by()
+        for breakdown in sorted(filters.get('breakdown', [])):
+            key = f'equipment__{breakdown}_FK'
+            rows = links.values(key, f'{key}__name').annotate(**status_counters('task__'))
+            summary[f'by_{breakdown}'] = [
+                {
+                    'id': row.pop(key),
+                    'name': row.pop(f'{key}__name'),
+                    **row,
+                }
+                for row in rows.order_by(f'{key}__name')
+            ]
+
+        return Response(summary)
+
+
+
+class ReportDailyView(ReplicaReadMixin, APIView):
+    """
+    Série diária lida do rollup TaskDailyMetric (GET /api/reports/daily/).
+    Padrão: últimos 30 dias. O rollup não é separado por usuário, por isso
+    só técnicos e superusuários têm acesso.
+    """
+    permission_classes = [IsTechnicianOrSuperuser]
+    replica_actions = ('get',)
+    default_days = 30
+    max_days = 366
+
+    def get(self, request):
+        params = ReportFiltersSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = params.validated_data
+
+        end = filters.get('end') or timezone.localdate()
+        start = filters.get('start') or end - timedelta(days=self.default_days - 1)
+        if (end - start).days >= self.max_days:
+            start = end - timedelta(days=self.max_days - 1)
+
+        metrics = TaskDailyMetric.objects.all()
+        if filters.get('environment'):
+            metrics = metrics.filter(environment_FK=filters['environment'])
+
+        # Backlog acumulado antes do período + uma linha agregada por dia/urgência
+        backlog = dict.fromkeys(URGENCY_LEVELS.values, 0)
+        backlog.update(
+            metrics.filter(day__lt=start).order_by().values_list('urgency_level')
+            .annotate(net=Sum('opened') - Sum('closed'))
+        )
+        status_columns = {status: f'status_{status.lower()}' for status in STATUS.values}
+        rows = (
+            metrics.filter(day__gte=start, day__lte=end).order_by('day')
+            .values('day', 'urgency_level')
+            .annotate(
+                tasks_created=Sum('tasks_created'), opened=Sum('opened'), closed=Sum('closed'),
+                resolved_count=Sum('resolved_count'), resolution_seconds=Sum('resolution_seconds'),
+                **{column: Sum(column) for column in status_columns.values()},
+            )
+        )
+        rows_by_day = {}
+        for row in rows:
+            rows_by_day.setdefault(row['day'], []).append(row)
+
+        series = []
+        for offset in range((end - start).days + 1):
+            day = start + timedelta(days=offset)
+            entry = {
+                'day': day,
+                'tasks_created': 0,
+                'transitions': dict.fromkeys(STATUS.values, 0),
+                'resolved': 0,
+                'mean_resolution_hours': None,
+            }
+            resolution_seconds = 0
+            for row in rows_by_day.get(day, []):
+                entry['tasks_created'] += row['tasks_created']
+                entry['resolved'] += row['resolved_count']
+                resolution_seconds += row['resolution_seconds']
+                for status, column in status_columns.items():
+                    entry['transitions'][status] += row[column]
+                backlog[row['urgency_level']] = backlog.get(row['urgency_level'], 0) + row['opened'] - row['closed']
+
+            if entry['resolved']:
+                entry['mean_resolution_hours'] = round(resolution_seconds / entry['resolved'] / 3600, 2)
+            entry['backlog'] = sum(backlog.values())
+            entry['backlog_by_urgency'] = dict(backlog)
+            series.append(entry)
+
+        return Response({'start': start, 'end': end, 'days': series})
@@ -0,0 +1,23 @@
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..search import SEARCH_TYPES, search
+from ..serializers import SearchParamsSerializer
+
+
+class SearchView(APIView):
+    """
+    Busca textual (GET /api/search/?q=...) em chamados, comentários de status e
+    equipamentos, por prefixo e sem diferenciar acentos (ver core/search.py).
+    Chamados respeitam a mesma visibilidade de /api/task/.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        params = SearchParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        query = params.validated_data['q']
+        types = params.validated_data.get('type') or SEARCH_TYPES
+        results = search(request.user, query, params.validated_data['limit'], types)
+        return Response({'query': query, 'results': results})
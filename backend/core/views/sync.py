@@ -0,0 +1,91 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..models import Equipment, Notification, SyncTombstone, Task, TaskStatus
+from ..serializers import (EquipmentSerializer, NotificationSerializer, SyncParamsSerializer,
+                           TaskReadSerializer, TaskStatusSerializer)
+
+DEFAULT_SYNC_SETTINGS = {
+    'CURSOR_LAG_SECONDS': 2,
+    'TOMBSTONE_DAYS': 30,
+}
+
+
+def sync_settings():
+    return {**DEFAULT_SYNC_SETTINGS, **getattr(settings, 'SYNC', {})}
+
+
+def format_cursor(value):
+    return value.isoformat().replace('+00:00', 'Z')
+
+
+class SyncView(APIView):
+    """
+    Sincronização incremental: GET /api/sync/?cursor=<cursor anterior>.
+
+    Devolve só o que foi criado/alterado (updated_at) desde o cursor, mais os
+    ids excluídos (lápides), e o próximo cursor. Sem cursor, ou com um cursor
+    mais antigo que as lápides guardadas, devolve tudo com "reset": true e o
+    cliente substitui a cópia local; com ?snapshot=false o reset vem vazio e o
+    cliente segue as páginas de /api/task/ (o cursor já cobre o que mudar
+    enquanto isso). O mesmo item pode vir repetido em duas chamadas seguidas
+    (margem CURSOR_LAG_SECONDS); o cliente só sobrescreve.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        params = SyncParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        config = sync_settings()
+        now = timezone.now()
+
+        since = params.validated_data.get('cursor')
+        reset = since is None or since < now - timedelta(days=config['TOMBSTONE_DAYS'])
+        if reset:
+            since = None
+
+        tasks = Task.objects.visible_to(request.user)
+        statuses = TaskStatus.objects.filter(task_FK__in=tasks)
+        notifications = Notification.objects.all()
+        if not request.user.is_superuser:
+            notifications = notifications.filter(user_FK=request.user)
+        # Mesma permissão da busca (core/search.py)
+        equipments = Equipment.objects.select_related('environment_FK', 'category_FK')
+        if not request.user.has_perm('core.view_equipment'):
+            equipments = equipments.none()
+        querysets = {
+            'tasks': tasks.for_read(),
+            'task_statuses': statuses.select_related('user_FK').prefetch_related(
+                'user_FK__groups', 'TaskStatusImage_task_status_FK'),
+            'equipments': equipments,
+            'notifications': notifications,
+        }
+        if since:
+            querysets = {name: queryset.filter(updated_at__gte=since) for name, queryset in querysets.items()}
+        elif not params.validated_data['snapshot']:
+            querysets = {name: queryset.none() for name, queryset in querysets.items()}
+
+        context = {'request': request}
+        data = {
+            'cursor': format_cursor(now - timedelta(seconds=config['CURSOR_LAG_SECONDS'])),
+            'reset': reset,
+            'tasks': TaskReadSerializer(querysets['tasks'].order_by('pk'), many=True, context=context).data,
+            'task_statuses': TaskStatusSerializer(querysets['task_statuses'].order_by('pk'), many=True,
+                                                  context=context).data,
+            'equipments': EquipmentSerializer(querysets['equipments'].order_by('pk'), many=True,
+                                              context=context).data,
+            'notifications': NotificationSerializer(querysets['notifications'].order_by('pk'), many=True,
+                                                    context=context).data,
+            'deleted': {'task': [], 'task_status': [], 'equipment': [], 'notification': []},
+        }
+        if since:
+            tombstones = (SyncTombstone.objects.visible_to(request.user).filter(deleted_at__gte=since)
+                          .order_by('deleted_at', 'pk'))
+            for model, object_id in tombstones.values_list('model', 'object_id'):
+                data['deleted'][model].append(object_id)
+        return Response(data)
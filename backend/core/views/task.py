@@ -1,4 +1,8 @@
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 # Imports dos models e serializers
 from ..models import Task, Equipment, Environment, TaskStatus, TaskStatusImage, CustomUser, Category
@@ -8,43 +12,82 @@ from ..serializers.environment import EnvironmentSerializer
 from ..serializers.task_status import TaskStatusSerializer, TaskStatusImageSerializer
 from ..serializers.custom_user import CustomUserSerializer
 from ..serializers.category import CategorySerializer
+from ..field_selection import FieldSelection
+from ..filters import TaskFilterBackend, TaskOrderingFilter
+from ..pagination import TaskCursorPagination
+from ..signals import tasks_bulk_saved
+from ..exports import EXPORT_FORMATS, stream_export
+from ..notifications import task_responsibles
+from .mixins import BulkWriteMixin, ConditionalGetMixin, FastListMixin, ReplicaReadMixin
 
-class TaskView(viewsets.ModelViewSet):
+class TaskView(ReplicaReadMixin, ConditionalGetMixin, FastListMixin, BulkWriteMixin, viewsets.ModelViewSet):
     permission_classes = [
         permissions.IsAuthenticated,      # 1. Tem que estar logado
         permissions.DjangoModelPermissions # 2. Tem que ter a permissão exata no Admin
     ]
+    # Filtros, ordenação e paginação feitos no servidor (ver core/filters.py)
+    filter_backends = [TaskFilterBackend, TaskOrderingFilter]
+    ordering = ('-creation_date', '-id')
+    pagination_class = TaskCursorPagination
+    # Leituras pesadas na réplica (ver core/db_router.py)
+    replica_actions = ('list', 'retrieve', 'export')
+    # Histórico e imagens já atualizam Task.updated_at (ver signals.py)
+    validator_related_models = (Equipment, Environment, Category, CustomUser)
 
     def get_serializer_class(self):
         if self.action in ['list', 'retrieve']:
             return TaskReadSerializer
         return TaskWriteSerializer
 
+    def get_validator_scope(self):
+        # Mesma regra de TaskQuerySet.visible_to
+        user = self.request.user
+        return f"{user.pk}:{'all' if user.is_superuser or user.is_technician else 'own'}"
+
     def get_queryset(self):
         """
         Este método define QUAIS dados serão retornados.
         """
-        user = self.request.user
-        
-        # Se o usuário não estiver autenticado (por segurança extra), retorna lista vazia
-        if not user.is_authenticated:
-            return Task.objects.none()
-
-        # Verifica se o usuário pertence ao grupo 'Técnico' (ou 'Tecnico')
-        # Ajuste a string dentro de filter(name=...) para o nome EXATO do seu grupo no Admin
-        is_technician = user.groups.filter(name__in=['Técnico', 'Tecnico', 'Técnico(a)']).exists()
-
-        # REGRA:
-        # 1. Se for Superusuário ou Técnico: Vê TUDO.
-        # 2. Se for Colaborador comum: Vê APENAS o que ele criou (creator_FK=user).
-        if user.is_superuser or is_technician:
-            return Task.objects.all().order_by('-creation_date')
-        else:
-            return Task.objects.filter(creator_FK=user).order_by('-creation_date')
+        # Superusuário/Técnico vê tudo; Colaborador só o que criou (ver TaskQuerySet.visible_to)
+        queryset = Task.objects.visible_to(self.request.user)
+
+        # Na leitura o serializer aninha usuários, equipamentos e histórico:
+        # carregamos tudo de uma vez para evitar N+1 queries.
+        if self.action in ['list', 'retrieve']:
+            queryset = queryset.for_read(FieldSelection.from_request(self.request))
+
+        return queryset.order_by('-creation_date', '-id')
 
     # Para atribuir o criador automaticamente
     def perform_create(self, serializer):
     # Apenas salva a tarefa e define quem criou.
     # A responsabilidade de criar o primeiro status (com comentário e anexo)
     # agora é inteiramente do Frontend.
-        serializer.save(creator_FK=self.request.user)
\ No newline at end of file
+        serializer.save(creator_FK=self.request.user)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Exporta as tarefas visíveis, com histórico e equipamentos, em streaming.
+        ?output=csv|ndjson, mais os mesmos filtros e ordenação da listagem.
+        """
+        output = request.query_params.get('output', 'csv')
+        if output not in EXPORT_FORMATS:
+            raise ValidationError({'output': f"Use um de: {', '.join(EXPORT_FORMATS)}."})
+
+        queryset = self.filter_queryset(self.get_queryset())
+        response = StreamingHttpResponse(stream_export(queryset, output), content_type=EXPORT_FORMATS[output])
+        filename = f"chamados_{timezone.localdate():%Y%m%d}.{output}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    def perform_bulk_create(self, validated_data):
+        tasks = super().perform_bulk_create(validated_data, creator_FK=self.request.user)
+        tasks_bulk_saved(tasks)
+        return tasks
+
+    def perform_bulk_update(self, pairs):
+        previous = task_responsibles([instance.pk for instance, _ in pairs])
+        tasks = super().perform_bulk_update(pairs)
+        tasks_bulk_saved(tasks, previous_responsibles=previous)
+        return tasks
\ No newline at end of file
@@ -1,14 +1,56 @@
 from rest_framework import viewsets
-from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
 from rest_framework.viewsets import ModelViewSet
 from ..models import *
 from ..serializers import *
 from rest_framework import permissions
+from ..field_selection import FieldSelection
+from ..models.task import read_statuses
+from .mixins import BulkWriteMixin
+from ..signals import task_statuses_bulk_saved
 
-class TaskStatusView(viewsets.ModelViewSet):
-    queryset = TaskStatus.objects.all()
+class TaskStatusView(BulkWriteMixin, viewsets.ModelViewSet):
+    queryset = TaskStatus.objects.select_related('user_FK').prefetch_related(
+        'user_FK__groups', 'TaskStatusImage_task_status_FK')
     serializer_class = TaskStatusSerializer
     permission_classes = [permissions.DjangoModelPermissions]
+    # Multipart permite enviar o status já com as imagens (campo uploaded_images)
+    parser_classes = (JSONParser, MultiPartParser, FormParser)
+
+    def get_queryset(self):
+        selection = FieldSelection.from_request(self.request)
+        if self.action in ['list', 'retrieve'] and not selection.is_default:
+            # Mesma poda do histórico aninhado em /api/task/
+            return read_statuses(selection).order_by('pk')
+        return super().get_queryset()
+
+    def validate_bulk(self, values, instances=None):
+        # O lote só pode tocar chamados que o usuário enxerga: o chamado
+        # informado e, no PATCH, o chamado atual de cada status
+        task_ids = [[data['task_FK'].pk] if 'task_FK' in data else [] for data in values]
+        for index, instance in enumerate(instances or ()):
+            task_ids[index].append(instance.task_FK_id)
+        visible = set(Task.objects.visible_to(self.request.user)
+                      .filter(pk__in={pk for ids in task_ids for pk in ids}).values_list('pk', flat=True))
+        errors = [{} if visible.issuperset(ids) else {'task_FK': ['Chamado não encontrado.']} for ids in task_ids]
+        if any(errors):
+            raise ValidationError(errors)
+
+    def perform_bulk_create(self, validated_data):
+        # Imagens só chegam pelo create individual (multipart)
+        for data in validated_data:
+            data.pop('uploaded_images', None)
+        statuses = super().perform_bulk_create(validated_data)
+        task_statuses_bulk_saved(statuses, created=True)
+        return statuses
+
+    def perform_bulk_update(self, pairs):
+        # Um status pode mudar de tarefa: a antiga também precisa ser recalculada
+        previous_task_ids = {instance.task_FK_id for instance, _ in pairs}
+        statuses = super().perform_bulk_update(pairs)
+        task_statuses_bulk_saved(statuses, previous_task_ids=previous_task_ids)
+        return statuses
 
 class TaskStatusImageView(viewsets.ModelViewSet):
     queryset = TaskStatusImage.objects.all()
@@ -0,0 +1,7 @@
+#!/bin/sh
+# Comando de inicialização do servidor (no App Service: Configuração >
+# Comando de inicialização = startup.sh). Servidor ASGI: /api/events/ (SSE)
+# não funciona sob WSGI (ver core/views/events.py).
+exec python -m uvicorn config.asgi:application \
+    --host 0.0.0.0 --port "${PORT:-8000}" \
+    --workers "${WEB_CONCURRENCY:-2}" --proxy-headers --forwarded-allow-ips '*'
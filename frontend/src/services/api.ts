@@ -6,6 +6,11 @@ import type {
   TaskStatus,
   TaskPayload,
   TaskStatusPayload,
+  ReportSummary,
+  SyncResponse,
+  CursorPage,
+  SearchResponse,
+  EquipmentScan,
 } from '../types/api'
 
 const apiClient = axios.create({
@@ -54,15 +59,64 @@ export default {
   },
 
   // Funções de Task (CRUD)
-  getTasks: (config?: AxiosRequestConfig) => apiClient.get('/task/', config),
+  // Paginado: devolve uma página e o link `next` (ver getAllTasks)
+  getTasks: (config?: AxiosRequestConfig) => apiClient.get<CursorPage<Task>>('/task/', config),
+  // Segue `next` até a última página
+  getAllTasks: async (config?: AxiosRequestConfig): Promise<Task[]> => {
+    const tasks: Task[] = []
+    let { data } = await apiClient.get<CursorPage<Task>>('/task/', {
+      ...config,
+      params: { page_size: 200, ...config?.params },
+    })
+    tasks.push(...data.results)
+    while (data.next) {
+      ;({ data } = await apiClient.get<CursorPage<Task>>(data.next))
+      tasks.push(...data.results)
+    }
+    return tasks
+  },
   getTask: (id: number) => apiClient.get<Task>(`/task/${id}/`),
   createTask: (taskData: TaskPayload) => apiClient.post<Task>('/task/', taskData),
   updateTask: (id: number, taskData: TaskPayload) => apiClient.put<Task>(`/task/${id}/`, taskData),
   deleteTask: (id: number) => apiClient.delete(`/task/${id}/`),
 
+  // Sincronização incremental: com cursor só as mudanças. Sem cursor (ou com um cursor
+  // vencido) vem reset; com snapshot=false ele traz só o cursor novo, sem a lista inteira
+  sync: (cursor?: string | null, snapshot = true) =>
+    apiClient.get<SyncResponse>('/sync/', {
+      params: { ...(cursor ? { cursor } : {}), ...(snapshot ? {} : { snapshot: false }) },
+    }),
+
+  // Eventos em tempo real (SSE). O EventSource não envia headers: em vez do token, a URL leva
+  // um ticket curto e de uso único. O HEAD confirma antes que o servidor suporta SSE
+  // (sob WSGI responde 503): senão, null.
+  openEvents: async (): Promise<EventSource | null> => {
+    if (typeof EventSource === 'undefined') return null
+    try {
+      await apiClient.head('/events/')
+      const { data } = await apiClient.post<{ ticket: string }>('/events/ticket/')
+      const url = new URL('events/', apiClient.defaults.baseURL)
+      url.searchParams.set('ticket', data.ticket)
+      return new EventSource(url)
+    } catch {
+      return null
+    }
+  },
+
+  // Busca textual no servidor (prefixo, sem diferenciar acentos)
+  search: (q: string, config?: AxiosRequestConfig) =>
+    apiClient.get<SearchResponse>('/search/', { ...config, params: { q, ...config?.params } }),
+
+  // Relatórios calculados no backend
+  getReportSummary: (config?: AxiosRequestConfig) =>
+    apiClient.get<ReportSummary>('/reports/summary/', config),
+
   // Funções para preencher formulários
   getUsers: () => apiClient.get<CustomUser[]>('/custom-user/'),
   getEquipments: () => apiClient.get<Equipment[]>('/equipment/'),
+  // Leitura do QR: equipamento + chamados em aberto numa chamada
+  scanEquipment: (ref: string | number) =>
+    apiClient.get<EquipmentScan>(`/equipment/scan/${encodeURIComponent(ref)}/`),
 
   // Função para criar TaskStatus com fluxo de upload de imagem em duas etapas
   createTaskStatus: (payload: TaskStatusPayload) => {
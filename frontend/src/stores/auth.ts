@@ -1,5 +1,6 @@
 import { ref, computed } from 'vue'
 import type { CustomUser } from '@/types/api' // Importe o tipo CustomUser
+import { resetTaskSync } from './tasks'
 
 const token = ref<string | null>(localStorage.getItem('authToken'))
 // Ref para guardar os dados do usuário
@@ -18,6 +19,7 @@ export function clearToken() {
   // Limpa o usuário também
   user.value = null
   localStorage.removeItem('authUser')
+  resetTaskSync()
 }
 
 // Função para definir o usuário
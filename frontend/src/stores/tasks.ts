@@ -0,0 +1,29 @@
+import api from '@/services/api'
+import type { Task } from '@/types/api'
+
+// Cópia local das tarefas, mantida entre as montagens do Dashboard.
+// Cada atualização pede ao backend só o que mudou desde o último cursor; a carga
+// inicial (ou depois de um cursor vencido) vem paginada de /task/.
+const tasksById = new Map<number, Task>()
+let cursor: string | null = null
+
+export async function syncTasks(): Promise<Task[]> {
+  const { data } = await api.sync(cursor, false)
+  if (data.reset) {
+    // Cópia nova: segue as páginas de /task/. O cursor foi tirado antes, então o
+    // que mudar enquanto isso chega no próximo sync.
+    tasksById.clear()
+    const tasks = await api.getAllTasks()
+    tasks.forEach((task) => tasksById.set(task.id, task))
+  }
+  data.tasks.forEach((task) => tasksById.set(task.id, task))
+  data.deleted.task.forEach((id) => tasksById.delete(id))
+  cursor = data.cursor
+  return [...tasksById.values()]
+}
+
+// Chamado no logout: a cópia pertence ao usuário que estava logado
+export function resetTaskSync() {
+  tasksById.clear()
+  cursor = null
+}
@@ -34,6 +34,8 @@ export interface Task {
   suggested_date: string | null;
   urgency_level: string;
   creation_date: string;
+  current_status: TaskStatusValue;
+  last_status_date: string;
   creator_FK: CustomUser | null;
   equipments_FK: Equipment[];
   responsibles_FK: CustomUser[];
@@ -62,6 +64,8 @@ export interface TaskStatusPayload {
 export interface TaskStatusImage {
   id: number;
   image: string; // O backend envia a URL da imagem
+  thumbnail: string | null; // Variantes geradas em background (null enquanto processa)
+  medium: string | null;
   task_status_FK: number;
 }
 
@@ -75,4 +79,73 @@ export interface TaskStatus {
   // user_FK: CustomUser | null;
   user_detail: CustomUser | null;
   images: TaskStatusImage[]; // O campo 'images' que definimos no serializer
-}
\ No newline at end of file
+}
+
+// Resposta de /reports/summary/
+export interface ReportSummary {
+  total: number;
+  open: number;
+  concluded: number;
+  cancelled: number;
+  by_urgency: Record<'LOW' | 'MEDIUM' | 'HIGH' | 'EXTRA_HIGH', number>;
+}
+
+export interface Notification {
+  id: number;
+  text: string;
+  task_FK: number;
+  user_FK: number | null;
+  creation_date: string;
+  notification_read: boolean;
+  updated_at: string;
+}
+
+// Página de /task/ (paginação por cursor): `next` é a URL da próxima página, ou null
+export interface CursorPage<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}
+
+// Resposta de /sync/: só o que mudou desde o cursor enviado
+export interface SyncResponse {
+  cursor: string;
+  reset: boolean; // true = substituir a cópia local (com snapshot=false, recarregar pelas páginas de /task/)
+  tasks: Task[];
+  task_statuses: TaskStatus[];
+  equipments: Equipment[];
+  notifications: Notification[];
+  deleted: Record<'task' | 'task_status' | 'equipment' | 'notification', number[]>;
+}
+
+export interface SearchResult {
+  type: 'task' | 'task_status' | 'equipment';
+  id: number;
+  task_FK: number | null; // chamado ao qual o resultado pertence (null para equipamentos)
+  title: string;
+  snippet: string;
+  rank: number; // bm25: menor = mais relevante
+}
+
+export interface SearchResponse {
+  query: string;
+  results: SearchResult[];
+}
+
+// Resposta de /equipment/scan/<código ou id>/ (leitura do QR em campo)
+export interface EquipmentScan {
+  id: number;
+  name: string;
+  code: string;
+  description: string;
+  environment_FK: Environment | null;
+  category_FK: Category | null;
+  open_tasks: {
+    id: number;
+    name: string;
+    urgency_level: string;
+    status: TaskStatusValue;
+    status_date: string;
+  }[];
+}
+